@@ -1,4 +1,4 @@
-from .models import TimeseriesField
+from .models import BinaryTimeseriesField, TimeseriesField
 from .timeseries import Timeseries
 
-__all__ = ["Timeseries", "TimeseriesField"]
+__all__ = ["BinaryTimeseriesField", "Timeseries", "TimeseriesField"]
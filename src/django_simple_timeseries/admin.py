@@ -0,0 +1,193 @@
+import hashlib
+
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import caches
+from django.db import connections
+from django.utils.html import format_html, format_html_join
+
+from django_simple_timeseries.concurrency import STORED_VALUE, stored_value
+from django_simple_timeseries.timeseries import AggregatingTimeseries, QuantileTimeseries
+
+__all__ = ["SparklineAdminMixin", "SparklineColumn", "render_sparkline"]
+
+CACHE_KEY_PREFIX = "django_simple_timeseries.sparkline"
+
+
+def decimate(values, points):
+    """Reduces `values` to at most `points` values, averaging each run of buckets.
+
+    A run holding only gaps is a gap in the result.
+    """
+    if len(values) <= points:
+        return list(values)
+    ret = []
+    for i in range(points):
+        run = [
+            v
+            for v in values[i * len(values) // points : (i + 1) * len(values) // points]
+            if v is not None
+        ]
+        ret.append(sum(run) / len(run) if run else None)
+    return ret
+
+
+def render_sparkline(series, points=60, width=120, height=24):
+    """Returns a static inline SVG sparkline of `series`, drawing at most `points` values.
+
+    Unlike `TimeseriesWidget`, the SVG holds no script and scales its own
+    coordinates, so a page can hold many of them cheaply. Gaps break the line. An
+    `AggregatingTimeseries` or a `QuantileTimeseries` is drawn by the mean of
+    each bucket.
+    """
+    if isinstance(series, (AggregatingTimeseries, QuantileTimeseries)):
+        series = series.to_timeseries("mean")
+    values = decimate(series.data_points, points)
+    present = [v for v in values if v is not None]
+    lines = []
+    if present:
+        low, high = min(present), max(present)
+        step = width / max(len(values) - 1, 1)
+        line = []
+        for i, v in enumerate(values):
+            if v is None:
+                line = []
+                continue
+            y = height / 2 if high == low else height - (v - low) / (high - low) * height
+            if not line:
+                lines.append(line)
+            line.append(f"{i * step:.1f},{y:.1f}")
+    return format_html(
+        '<svg xmlns="http://www.w3.org/2000/svg" class="timeseries-sparkline" width="{}" '
+        'height="{}" viewBox="0 0 {} {}">{}</svg>',
+        width,
+        height,
+        width,
+        height,
+        format_html_join(
+            "",
+            '<polyline fill="none" stroke="currentColor" stroke-width="1" points="{}"/>',
+            ((" ".join(line),) for line in lines),
+        ),
+    )
+
+
+class SparklineColumn:
+    """A `list_display` column rendering a timeseries field as a sparkline.
+
+    ```py
+    @admin.register(Appliance)
+    class ApplianceAdmin(SparklineAdminMixin, admin.ModelAdmin):
+        list_display = ["name", SparklineColumn("temperature")]
+    ```
+
+    Used with `SparklineAdminMixin`, the sparklines of a changelist page are
+    rendered together; otherwise each row's series is rendered on its own.
+
+    Arguments:
+        field_name: The name of a `TimeseriesField`, `BinaryTimeseriesField` or
+            `MultiTimeseriesField`.
+        description: The column header; defaults to the field name.
+        channel: For a `MultiTimeseriesField`, the channel to draw.
+        points, width, height: As for `render_sparkline`.
+    """
+
+    def __init__(self, field_name, description=None, channel=None, points=60, width=120, height=24):
+        self.field_name = field_name
+        self.short_description = description or field_name.replace("_", " ")
+        self.channel = channel
+        self.points = points
+        self.width = width
+        self.height = height
+        self.__name__ = f"{field_name}_sparkline"
+
+    def render(self, series):
+        if self.channel is not None:
+            series = series.channel(self.channel)
+        return render_sparkline(series, self.points, self.width, self.height)
+
+    def cache_key(self, stored):
+        if isinstance(stored, str):
+            stored = stored.encode()
+        digest = hashlib.sha256(bytes(stored or b"")).hexdigest()
+        return (
+            f"{CACHE_KEY_PREFIX}:{digest}:{self.channel}:{self.points}:{self.width}:{self.height}"
+        )
+
+    def __call__(self, obj):
+        rendered = getattr(obj, "_sparklines", {})
+        if self in rendered:
+            return rendered[self]
+        return self.render(getattr(obj, self.field_name))
+
+
+class SparklineChangeList(ChangeList):
+    def sparkline_columns(self):
+        return [column for column in self.list_display if isinstance(column, SparklineColumn)]
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # The series are fetched separately, for the page only, by `get_results`.
+        fields = {column.field_name for column in self.sparkline_columns()}
+        return super().get_queryset(request, exclude_parameters).defer(*fields)
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.model_admin.render_sparklines(self.result_list, self.sparkline_columns())
+
+
+class SparklineAdminMixin:
+    """`ModelAdmin` mixin rendering the `SparklineColumn`s of a changelist page in one batch.
+
+    The changelist query leaves the timeseries columns out. Each page then
+    fetches the stored values of its sparklines' columns in one query, and only
+    decodes and renders the series whose stored value isn't in the cache
+    `sparkline_cache` already. Renders are cached for `sparkline_cache_timeout`
+    seconds, keyed by a digest of the stored value, so a series is re-rendered
+    when it changes.
+    """
+
+    sparkline_cache = "default"
+    sparkline_cache_timeout = 300
+
+    def get_changelist(self, request, **kwargs):
+        return SparklineChangeList
+
+    def render_sparklines(self, objs, columns):
+        """Renders `columns` for the instances `objs`, storing the results on them."""
+        objs = list(objs)
+        if not objs or not columns:
+            return
+        cache = caches[self.sparkline_cache]
+        queryset = self.model._base_manager.using(objs[0]._state.db)
+        connection = connections[queryset.db]
+        fields = [
+            self.model._meta.get_field(name)
+            for name in dict.fromkeys(column.field_name for column in columns)
+        ]
+        # The stored value of each field, for the whole page in one query.
+        aliases = {field.name: f"{STORED_VALUE}_{i}" for i, field in enumerate(fields)}
+        rows = (
+            queryset.filter(pk__in=[obj.pk for obj in objs])
+            .annotate(**{aliases[field.name]: stored_value(field) for field in fields})
+            .values("pk", *aliases.values())
+        )
+        stored = {row["pk"]: row for row in rows}
+        keys = {
+            (obj, column): column.cache_key(stored[obj.pk][aliases[column.field_name]])
+            for obj in objs
+            if obj.pk in stored
+            for column in columns
+        }
+        cached = cache.get_many(set(keys.values()))
+        decoded = {}
+        missing = {}
+        for obj in objs:
+            obj._sparklines = {}
+        for (obj, column), key in keys.items():
+            if key not in cached:
+                if (obj.pk, column.field_name) not in decoded:
+                    field = self.model._meta.get_field(column.field_name)
+                    value = stored[obj.pk][aliases[field.name]]
+                    decoded[obj.pk, field.name] = field.from_db_value(value, None, connection)
+                cached[key] = missing[key] = column.render(decoded[obj.pk, column.field_name])
+            obj._sparklines[column] = cached[key]
+        cache.set_many(missing, self.sparkline_cache_timeout)
@@ -0,0 +1,144 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.db.models import Max, Min
+
+from django_simple_timeseries.concurrency import STORED_VALUE, stored_value
+from django_simple_timeseries.models import TimeseriesFieldMixin
+
+__all__ = [
+    "iter_batches",
+    "iter_decoded",
+    "map_batches",
+    "pk_ranges",
+    "timeseries_field_names",
+]
+
+
+def timeseries_field_names(model):
+    """Returns the names of the model's concrete timeseries fields, in declaration order."""
+    return [f.name for f in model._meta.concrete_fields if isinstance(f, TimeseriesFieldMixin)]
+
+
+def pk_ranges(queryset, parts):
+    """Splits the integer primary keys of `queryset` into up to `parts` contiguous ranges.
+
+    Returns a list of inclusive `(lo, hi)` tuples, which is empty when the queryset
+    is. Ranges are equally wide, not equally populated.
+    """
+    bounds = queryset.aggregate(lo=Min("pk"), hi=Max("pk"))
+    lo, hi = bounds["lo"], bounds["hi"]
+    if lo is None:
+        return []
+    if not isinstance(lo, int):
+        raise TypeError(f"Can only split integer primary keys, not {type(lo).__name__}")
+    width = max((hi - lo + parts) // parts, 1)
+    return [(start, min(start + width - 1, hi)) for start in range(lo, hi + 1, width)]
+
+
+def iter_batches(queryset, field_names, batch_size):
+    """Yields lists of up to `batch_size` `(pk, *values)` tuples, in primary key order.
+
+    Each batch is a separate query for the primary keys following the previous
+    batch, so no cursor is held open while the caller writes to the table.
+    """
+    queryset = queryset.order_by("pk").values_list("pk", *field_names)
+    batch = list(queryset[:batch_size])
+    while batch:
+        yield batch
+        if len(batch) < batch_size:
+            return
+        batch = list(queryset.filter(pk__gt=batch[-1][0])[:batch_size])
+
+
+def map_batches(fn, batches, workers=1, *args):
+    """Yields `fn(batch, *args)` for each batch, in order, using up to `workers` processes.
+
+    With more than one worker, at most `2 * workers` batches are in flight at a
+    time, so batches are read no faster than they are processed. `fn` must be a
+    module-level function, and batches and results must be picklable.
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield fn(batch, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(fn, batch, *args))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def decode_rows(rows, model_label, field_names):
+    """Process pool entry point: decodes rows of stored values of `field_names`.
+
+    Returns a list holding the list of series of each row.
+    """
+    if not apps.ready:
+        django.setup()
+    model = apps.get_model(model_label)
+    fields = [model._meta.get_field(name) for name in field_names]
+    return [
+        [field.from_db_value(value, None, None) for field, value in zip(fields, row, strict=True)]
+        for row in rows
+    ]
+
+
+def iter_decoded(queryset, field_names=None, workers=None, chunk_size=2000):
+    """Yields the instances of `queryset`, in order, decoding their series in parallel.
+
+    The instances are fetched `chunk_size` at a time, without letting the database
+    driver or Django decode their timeseries columns: the stored values of
+    `field_names` (default: every timeseries field) are sent to a pool of
+    `workers` processes (default: one per CPU), which decode each chunk into
+    `Timeseries` while the next ones are fetched. The instances come out with
+    the decoded series set, as if they had been loaded normally.
+
+    Pickling a decoded series back from a worker costs a fraction of decoding
+    it, so this pays off for large querysets of long series; with `workers=1`,
+    series are decoded in this process.
+    """
+    model = queryset.model
+    if field_names is None:
+        field_names = timeseries_field_names(model)
+    fields = [model._meta.get_field(name) for name in field_names]
+    aliases = [f"{STORED_VALUE}_{i}" for i in range(len(fields))]
+    instances = queryset.defer(*field_names).annotate(
+        **{alias: stored_value(field) for alias, field in zip(aliases, fields, strict=True)}
+    )
+    # The instances of each chunk in flight, waiting for their series.
+    pending = deque()
+
+    def chunks():
+        chunk = []
+        for obj in instances.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                pending.append(chunk)
+                yield stored_values(chunk)
+                chunk = []
+        if chunk:
+            pending.append(chunk)
+            yield stored_values(chunk)
+
+    def stored_values(chunk):
+        rows = []
+        for obj in chunk:
+            # Drivers may return binary columns as `memoryview`s, which can't be pickled.
+            row = [obj.__dict__.pop(alias) for alias in aliases]
+            rows.append([bytes(v) if isinstance(v, memoryview) else v for v in row])
+        return rows
+
+    workers = os.cpu_count() if workers is None else workers
+    for decoded in map_batches(decode_rows, chunks(), workers, model._meta.label, field_names):
+        for obj, series in zip(pending.popleft(), decoded, strict=True):
+            for field, value in zip(fields, series, strict=True):
+                setattr(obj, field.attname, value)
+            yield obj
@@ -0,0 +1,148 @@
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import signals
+
+from django_simple_timeseries.models import TimeseriesFieldMixin
+from django_simple_timeseries.timeseries import Timeseries
+
+__all__ = ["TimeseriesCache"]
+
+# The caches of each `(model, field_name)`, which the library's writers keep up to date.
+_registry = {}
+
+
+def registered_caches(model, field_name):
+    return _registry.get((model, field_name), [])
+
+
+def invalidate_cached(model, field_name, pks):
+    """Drops the cached series of the rows `pks` from every cache of the field."""
+    for timeseries_cache in registered_caches(model, field_name):
+        timeseries_cache.invalidate_many(pks)
+
+
+class TimeseriesCache:
+    """A read-through, write-through cache of one timeseries field's series, by primary key.
+
+    For the few series read on almost every request, `get()` returns the series
+    from a Django cache when it can, skipping both the query and the JSON decode:
+    series are cached in their packed `Timeseries.to_bytes` form. Create one per
+    field, when the model is defined:
+
+    ```py
+    temperature_cache = TimeseriesCache(Appliance, "temperature")
+
+    temperature_cache.get(appliance_id)
+    ```
+
+    Saving an instance writes its series to the cache once the transaction
+    commits, and deleting it drops it. `add_and_save` writes the series it
+    saved, and drops it if another writer saved the row first, as does
+    `compact_timeseries` for the rows it writes. Other writes that bypass
+    `save()`, such as `QuerySet.update()`, must call `invalidate()`. Series whose
+    values aren't numbers can't be packed, and are never cached.
+
+    Arguments:
+        model: The model.
+        field_name: The name of a `TimeseriesField` or `BinaryTimeseriesField`.
+        cache: The alias of the Django cache to use.
+        timeout: Seconds before a cached series expires, as for `cache.set`.
+    """
+
+    def __init__(self, model, field_name, cache="default", timeout=300):
+        self.model = model
+        self.field = model._meta.get_field(field_name)
+        if not isinstance(self.field, TimeseriesFieldMixin):
+            raise ValueError(f"{model.__name__}.{field_name} is not a timeseries field")
+        self.cache = caches[cache]
+        self.timeout = timeout
+        self.key_prefix = f"django_simple_timeseries.series:{model._meta.label}:{field_name}"
+        _registry.setdefault((model, field_name), []).append(self)
+        signals.post_save.connect(self._saved, sender=model, weak=False)
+        signals.post_delete.connect(self._deleted, sender=model, weak=False)
+
+    def disconnect(self):
+        """Stops keeping the cache up to date; the cached series are left as they are."""
+        _registry[(self.model, self.field.name)].remove(self)
+        signals.post_save.disconnect(self._saved, sender=self.model)
+        signals.post_delete.disconnect(self._deleted, sender=self.model)
+
+    def key(self, pk):
+        return f"{self.key_prefix}:{pk}"
+
+    def get(self, pk):
+        """Returns the series of the row `pk`, from the cache if it holds it.
+
+        Raises the model's `DoesNotExist` if there is no such row.
+        """
+        ret = self.get_many([pk])
+        if pk not in ret:
+            raise self.model.DoesNotExist(f"{self.model.__name__} matching query does not exist.")
+        return ret[pk]
+
+    def get_many(self, pks):
+        """Returns a `{pk: series}` dict, querying the rows missing from the cache at once.
+
+        Rows that don't exist are left out.
+        """
+        keys = {pk: self.key(pk) for pk in pks}
+        cached = self.cache.get_many(keys.values())
+        ret = {}
+        for pk, key in keys.items():
+            if key in cached:
+                try:
+                    ret[pk] = Timeseries.from_bytes(cached[key])
+                except ValueError:
+                    pass
+        missing = [pk for pk in keys if pk not in ret]
+        if missing:
+            rows = self.model._base_manager.filter(pk__in=missing).values_list(
+                "pk", self.field.name
+            )
+            loaded = dict(rows)
+            self.set_many(loaded)
+            ret.update(loaded)
+        return ret
+
+    def set_many(self, series_by_pk):
+        """Caches `{pk: series}`; series that can't be packed are dropped from the cache."""
+        self._store({pk: self._pack(series) for pk, series in series_by_pk.items()})
+
+    def set(self, pk, series):
+        self.set_many({pk: series})
+
+    def set_on_commit(self, pk, series, using=None):
+        """Caches `series`, as it is now, once the current transaction commits."""
+        packed = {pk: self._pack(series)}
+        transaction.on_commit(lambda: self._store(packed), using=using)
+
+    def invalidate_many(self, pks):
+        """Drops the cached series of the rows `pks`."""
+        if pks:
+            self.cache.delete_many([self.key(pk) for pk in pks])
+
+    def invalidate(self, pk):
+        self.invalidate_many([pk])
+
+    @staticmethod
+    def _pack(series):
+        try:
+            return series.to_bytes()
+        except ValueError:
+            return None
+
+    def _store(self, packed_by_pk):
+        self.cache.set_many(
+            {self.key(pk): packed for pk, packed in packed_by_pk.items() if packed is not None},
+            self.timeout,
+        )
+        self.invalidate_many([pk for pk, packed in packed_by_pk.items() if packed is None])
+
+    def _saved(self, sender, instance, update_fields=None, using=None, **kwargs):
+        if update_fields is not None and self.field.name not in update_fields:
+            return
+        self.set_on_commit(instance.pk, getattr(instance, self.field.attname), using)
+
+    def _deleted(self, sender, instance, using=None, **kwargs):
+        pk = instance.pk
+        transaction.on_commit(lambda: self.invalidate(pk), using=using)
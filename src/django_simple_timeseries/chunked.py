@@ -0,0 +1,218 @@
+import datetime
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from django_simple_timeseries.timeseries import Timeseries
+
+__all__ = ["AbstractTimeseriesChunk", "ChunkedTimeseries", "ChunkedTimeseriesField"]
+
+
+class AbstractTimeseriesChunk(models.Model):
+    """Base model for the companion table of a `ChunkedTimeseriesField`.
+
+    Each row holds up to `chunk_points` consecutive buckets of one series. Buckets
+    are numbered from the epoch, so chunk `n` always covers the same time range
+    regardless of when the series started.
+
+    Subclasses must add a `ForeignKey` to the owning model, and should make
+    `(owner, chunk)` unique so that lookups of a series' chunks are indexed:
+
+    ```py
+    class TemperatureChunk(AbstractTimeseriesChunk):
+        appliance = models.ForeignKey(
+            Appliance, on_delete=models.CASCADE, related_name="temperature_chunks"
+        )
+
+        class Meta:
+            unique_together = [("appliance", "chunk")]
+    ```
+    """
+
+    chunk = models.BigIntegerField()
+    data = models.JSONField(default=list)
+
+    class Meta:
+        abstract = True
+
+
+class ChunkedTimeseriesField:
+    """A `TimeseriesField`-like attribute storing its series in a companion chunk table.
+
+    Unlike `TimeseriesField`, this is not a database column: the series lives in
+    rows of an `AbstractTimeseriesChunk` subclass, reached through `related_name`.
+    Recording a sample only rewrites the current chunk, and chunks that fall out
+    of the window are deleted wholesale, so the cost of a write doesn't grow with
+    `max_points`. Accessing the attribute on an instance returns a
+    `ChunkedTimeseries`, which reads and writes the chunk table directly.
+
+    It is a plain descriptor, not a model field: it doesn't appear in
+    `Model._meta`, can't be passed to the model constructor or `create()`,
+    doesn't take part in migrations, serialization or `ModelForm`s, and changing
+    its arguments doesn't need a migration. Samples can only be recorded once the
+    owning instance has been saved.
+
+    Arguments:
+        related_name: The `related_name` of the chunk model's `ForeignKey`.
+        resolution_seconds: The width of each bucket, in seconds.
+        max_points: Maximum number of buckets to retain.
+        chunk_points: Number of buckets stored in each chunk row.
+    """
+
+    def __init__(self, related_name, *, resolution_seconds=60, max_points=60 * 24, chunk_points=60):
+        self.related_name = related_name
+        self.resolution_seconds = resolution_seconds
+        self.max_points = max_points
+        self.chunk_points = chunk_points
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return ChunkedTimeseries(
+            getattr(instance, self.related_name),
+            resolution_seconds=self.resolution_seconds,
+            max_points=self.max_points,
+            chunk_points=self.chunk_points,
+        )
+
+
+class ChunkedTimeseries:
+    """A timeseries whose buckets are stored in chunk rows, accessed through `chunks`.
+
+    Usually obtained from a `ChunkedTimeseriesField`. Every method queries the
+    database; nothing is cached on the object.
+
+    Arguments:
+        chunks: The related manager of the series' chunk rows.
+        resolution_seconds: The width of each bucket, in seconds.
+        max_points: Maximum number of buckets to retain.
+        chunk_points: Number of buckets stored in each chunk row.
+    """
+
+    def __init__(self, chunks, resolution_seconds=60, max_points=60 * 24, chunk_points=60):
+        self.chunks = chunks
+        self.resolution = datetime.timedelta(seconds=resolution_seconds)
+        self.max_points = max_points
+        self.chunk_points = chunk_points
+
+    def _bucket(self, dt):
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=datetime.UTC)
+        return int(dt.timestamp()) // int(self.resolution.total_seconds())
+
+    def _bucket_time(self, bucket):
+        return datetime.datetime.fromtimestamp(
+            bucket * int(self.resolution.total_seconds()), datetime.UTC
+        )
+
+    def _latest_chunk(self):
+        return self.chunks.order_by("-chunk").first()
+
+    def _last_bucket(self, chunk):
+        return chunk.chunk * self.chunk_points + len(chunk.data) - 1
+
+    def add(self, value, when=None):
+        """Records `value` in the bucket containing time `when` (default: now).
+
+        Only the chunk holding that bucket is written. When a new chunk is
+        started, chunks that are entirely outside the window are deleted.
+
+        The write is a transaction that locks the chunk row, creating it if
+        needed, so concurrent writers to the same series take turns rather than
+        losing each other's samples.
+
+        Returns one of `Timeseries.RESULT_REPLACED`, `RESULT_ADDED`,
+        `RESULT_SHIFTED` (older chunks were dropped, or this is the first
+        sample, as with `Timeseries.add`), or `RESULT_TRUNCATED` (the sample is
+        beyond the window of all previous values).
+
+        Raises `ValueError` if `when` is older than the most recent sample.
+        """
+        bucket = self._bucket(when or timezone.now())
+        chunk_number, offset = divmod(bucket, self.chunk_points)
+
+        with transaction.atomic(using=self.chunks.db):
+            # `select_for_update()` returns a plain queryset, which doesn't set the
+            # owner on the rows it creates the way the related manager does.
+            owner = {self.chunks.field.name: self.chunks.instance}
+            chunk, created = self.chunks.select_for_update().get_or_create(
+                chunk=chunk_number, **owner, defaults={"data": []}
+            )
+            if chunk.data:
+                last_bucket = self._last_bucket(chunk)
+            else:
+                previous = self.chunks.filter(chunk__lt=chunk_number).order_by("-chunk").first()
+                last_bucket = None if previous is None else self._last_bucket(previous)
+            later = self.chunks.filter(chunk__gt=chunk_number).order_by("-chunk").first()
+            if later is not None:
+                last_bucket = self._last_bucket(later)
+
+            if last_bucket is None:
+                result = Timeseries.RESULT_SHIFTED
+            elif bucket < last_bucket:
+                raise ValueError(
+                    f"Sample would go back in time: from {self._bucket_time(last_bucket)} "
+                    f"to {self._bucket_time(bucket)}"
+                )
+            elif bucket == last_bucket:
+                result = Timeseries.RESULT_REPLACED
+            elif bucket - last_bucket > self.max_points:
+                result = Timeseries.RESULT_TRUNCATED
+            else:
+                result = Timeseries.RESULT_ADDED
+
+            if created:
+                oldest_chunk = (bucket - self.max_points + 1) // self.chunk_points
+                deleted, _ = self.chunks.filter(chunk__lt=oldest_chunk).delete()
+                if deleted and result == Timeseries.RESULT_ADDED:
+                    result = Timeseries.RESULT_SHIFTED
+
+            if len(chunk.data) <= offset:
+                chunk.data.extend([None] * (offset + 1 - len(chunk.data)))
+            chunk.data[offset] = value
+            chunk.save(update_fields=["data"])
+        return result
+
+    def to_timeseries(self, start=None, end=None):
+        """Returns the series, or the part of it between `start` and `end`, as a `Timeseries`.
+
+        Only the chunks overlapping the requested range are fetched. Leading gaps
+        are dropped, so the returned series starts at its first recorded value.
+        """
+        series = Timeseries(
+            max_points=self.max_points, resolution_seconds=int(self.resolution.total_seconds())
+        )
+        latest = self._latest_chunk()
+        if latest is None:
+            return series
+        last_bucket = self._last_bucket(latest)
+        lo = last_bucket - self.max_points + 1
+        hi = last_bucket
+        if start is not None:
+            lo = max(lo, self._bucket(start))
+        if end is not None:
+            hi = min(hi, self._bucket(end))
+        if lo > hi:
+            return series
+
+        data_points = [None] * (hi - lo + 1)
+        rows = self.chunks.filter(
+            chunk__gte=lo // self.chunk_points, chunk__lte=hi // self.chunk_points
+        ).values_list("chunk", "data")
+        for chunk_number, data in rows:
+            first = chunk_number * self.chunk_points
+            for i in range(max(lo - first, 0), min(len(data), hi - first + 1)):
+                data_points[first + i - lo] = data[i]
+
+        skip = 0
+        while skip < len(data_points) and data_points[skip] is None:
+            skip += 1
+        if skip == len(data_points):
+            return series
+        series.start_time = self._bucket_time(lo + skip)
+        series.data_points = data_points[skip:]
+        return series
+
+    def iter_points(self, start=None, end=None):
+        """Yields `(datetime, value)` tuples for the series, as `Timeseries.iter_points` does."""
+        return self.to_timeseries(start=start, end=end).iter_points()
@@ -0,0 +1,109 @@
+import copy
+import logging
+
+from django.db.models import BinaryField, TextField
+from django.db.models.functions import Cast
+
+from django_simple_timeseries.caching import registered_caches
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ConcurrentUpdateError", "add_and_save", "stored_value"]
+
+STORED_VALUE = "stored_value"
+
+
+class ConcurrentUpdateError(Exception):
+    """Raised by `add_and_save` when every attempt lost a race with another writer."""
+
+
+def stored_value(field):
+    """Returns an expression for a timeseries column, exactly as the database stores it.
+
+    Comparing the decoded value isn't enough to tell whether a row changed: on
+    SQLite and MariaDB a JSON column is compared as text, so a row that wasn't
+    written by Django's encoder (for example, by `ExpireSeries`, or by hand) never
+    equals its own decoded value. Comparing the stored text (or bytes, for a
+    `BinaryTimeseriesField`) does work for every row.
+    """
+    return Cast(field.name, BinaryField() if isinstance(field, BinaryField) else TextField())
+
+
+def load_stored(queryset, pk, field):
+    """Returns the series stored in a row, and a filter only matching that stored value."""
+    value, stored = (
+        queryset.annotate(**{STORED_VALUE: stored_value(field)})
+        .values_list(field.name, STORED_VALUE)
+        .get(pk=pk)
+    )
+    if stored is None:
+        return value, {f"{STORED_VALUE}__isnull": True}
+    return value, {STORED_VALUE: stored}
+
+
+def add_and_save(instance, field_name, value, when=None, max_attempts=5):
+    """Records `value` in a saved instance's `TimeseriesField` without holding row locks.
+
+    This is an optimistic alternative to wrapping `add()` and `save()` in
+    `select_for_update()`. The sample is added to a copy of the series, and the
+    new series is written with a single `UPDATE` that only matches the row if the
+    stored series is still exactly the one that was loaded. If another writer got
+    there first, the series is reloaded from the database and the sample is
+    applied again, up to `max_attempts` times.
+
+    The first attempt matches the row by the instance's series, as Django would
+    encode it. A row stored in any other form (different formatting or key order,
+    or a malformed value that was replaced with an empty series) is reloaded
+    along with its stored text, and matched by that text instead; this doesn't
+    count as a conflicting attempt.
+
+    Only `field_name` and its summary columns are written; other fields of
+    `instance` are left untouched in the database. On success, the instance
+    attributes are updated to the new values, and the field's `TimeseriesCache`s
+    to the new series once the transaction commits. A conflict drops the row from
+    them.
+
+    Returns the `Timeseries.RESULT_*` value of the successful `add`.
+
+    Raises `ConcurrentUpdateError` if every attempt conflicted, and `ValueError`
+    as `Timeseries.add` does, for example if `when` is older than the latest
+    sample written by a concurrent writer.
+    """
+    if instance.pk is None:
+        raise ValueError("add_and_save requires a saved instance")
+    model = type(instance)
+    queryset = model._base_manager.using(instance._state.db or "default")
+    field = model._meta.get_field(field_name)
+
+    expected = getattr(instance, field_name)
+    match = {field_name: expected}
+    attempts = 0
+    while attempts < max_attempts:
+        series = copy.deepcopy(expected)
+        result = series.add(value, when=when)
+        values = {field_name: series, **field.summary_values(series)}
+        updated = (
+            queryset.alias(**{STORED_VALUE: stored_value(field)})
+            .filter(pk=instance.pk, **match)
+            .update(**values)
+        )
+        if updated:
+            for name, new_value in values.items():
+                setattr(instance, name, new_value)
+            for timeseries_cache in registered_caches(model, field_name):
+                timeseries_cache.set_on_commit(instance.pk, series, queryset.db)
+            field.send_buckets_finalized(instance, series, queryset.db)
+            return result
+        matched_by_value = field_name in match
+        current, match = load_stored(queryset, instance.pk, field)
+        if not (matched_by_value and current == expected):
+            attempts += 1
+            for timeseries_cache in registered_caches(model, field_name):
+                timeseries_cache.invalidate(instance.pk)
+            logger.debug(f"Conflict saving {model.__name__}.{field_name}, attempt {attempts}")
+        expected = current
+        setattr(instance, field_name, current)
+
+    raise ConcurrentUpdateError(
+        f"Gave up saving {model.__name__}.{field_name} after {max_attempts} conflicting attempts"
+    )
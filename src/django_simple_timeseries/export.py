@@ -0,0 +1,73 @@
+import csv
+import struct
+
+from django_simple_timeseries.timeseries import Timeseries
+
+__all__ = ["BinaryExportWriter", "CsvExportWriter", "iter_binary_export"]
+
+# A binary export is this magic, followed by one record per series: a `RECORD_HEADER`
+# giving the lengths of the UTF-8 primary key, the UTF-8 field name and the series in
+# `Timeseries.to_bytes` form, followed by those three values.
+#
+# Each record keeps a series' values contiguous, so a reader decodes them in bulk. The
+# file is deliberately not columnar across rows (one block per field holding every
+# row's values): that would mean buffering the whole table before writing anything,
+# whereas records are written as rows are fetched, in constant memory.
+EXPORT_MAGIC = b"tsx1"
+RECORD_HEADER = struct.Struct("<HHI")
+
+
+class CsvExportWriter:
+    """Writes series as `pk,field,time,value` rows to the text file `f`, one row per bucket."""
+
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+
+    def write_header(self):
+        self.writer.writerow(["pk", "field", "time", "value"])
+
+    def write(self, pk, field_name, series):
+        self.writer.writerows(
+            (pk, field_name, ts.isoformat(), "" if v is None else v)
+            for ts, v in series.iter_points()
+        )
+
+
+class BinaryExportWriter:
+    """Writes series as packed records to the binary file `f`; see `iter_binary_export`.
+
+    `write` raises `ValueError`, without writing anything, for a series holding
+    values other than numbers and `None`.
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def write_header(self):
+        self.f.write(EXPORT_MAGIC)
+
+    def write(self, pk, field_name, series):
+        pk = str(pk).encode()
+        field_name = field_name.encode()
+        packed = series.to_bytes()
+        self.f.write(RECORD_HEADER.pack(len(pk), len(field_name), len(packed)))
+        self.f.write(pk)
+        self.f.write(field_name)
+        self.f.write(packed)
+
+
+def iter_binary_export(f):
+    """Yields `(pk, field_name, series)` for each record of a binary export file.
+
+    Primary keys are returned as strings. Raises `ValueError` if `f` is not a
+    binary export.
+    """
+    if f.read(len(EXPORT_MAGIC)) != EXPORT_MAGIC:
+        raise ValueError("Not a binary timeseries export")
+    while header := f.read(RECORD_HEADER.size):
+        if len(header) != RECORD_HEADER.size:
+            raise ValueError("Truncated binary timeseries export")
+        pk_len, field_len, series_len = RECORD_HEADER.unpack(header)
+        pk = f.read(pk_len).decode()
+        field_name = f.read(field_len).decode()
+        yield pk, field_name, Timeseries.from_bytes(f.read(series_len))
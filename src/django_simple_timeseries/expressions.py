@@ -0,0 +1,244 @@
+from django.db import NotSupportedError
+from django.db.models import (
+    BooleanField,
+    DateTimeField,
+    FloatField,
+    Func,
+    IntegerField,
+    JSONField,
+    Transform,
+)
+
+__all__ = [
+    "ExpireSeries",
+    "SeriesEndTime",
+    "SeriesHasExpiredBuckets",
+    "SeriesIsExpired",
+    "SeriesLast",
+    "SeriesLength",
+    "SeriesStartTime",
+    "SeriesValueAt",
+]
+
+# SQL fragments for reading the document stored by `TimeseriesField`, per database
+# vendor. `{x}` is the JSON column (or expression), `{e}` an epoch-seconds integer, `{i}`
+# an array index, and `{value}` the new start time of an emptied series. Stored start
+# times may have any UTC offset; computed ones are written in UTC.
+VENDOR_SQL = {
+    "sqlite": {
+        "start": "CAST(strftime('%%s', json_extract({x}, '$.start')) AS INTEGER)",
+        "len": "json_array_length({x}, '$.data')",
+        "res": "json_extract({x}, '$.res')",
+        "max": "json_extract({x}, '$.max')",
+        "greatest": "MAX",
+        "last": "json_extract({x}, '$.data[#-1]')",
+        "at": "json_extract({x}, '$.data[' || {i} || ']')",
+        "div": "/",
+        "datetime": "datetime({e}, 'unixepoch')",
+        "isoformat": "strftime('%%Y-%%m-%%dT%%H:%%M:%%S+00:00', {e}, 'unixepoch')",
+        "empty": "json_set({x}, '$.data', json('[]'), '$.start', {value})",
+    },
+    "postgresql": {
+        "start": "EXTRACT(EPOCH FROM ({x} ->> 'start')::timestamptz)::bigint",
+        "len": "jsonb_array_length({x} -> 'data')",
+        "res": "({x} ->> 'res')::bigint",
+        "max": "({x} ->> 'max')::bigint",
+        "greatest": "GREATEST",
+        "last": "({x} -> 'data' ->> -1)::double precision",
+        "at": "({x} -> 'data' ->> ({i})::integer)::double precision",
+        "div": "/",
+        "datetime": "to_timestamp({e})",
+        "isoformat": (
+            "to_char(to_timestamp({e}) AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS\"+00:00\"')"
+        ),
+        "empty": "jsonb_set(jsonb_set({x}, '{data}', '[]'::jsonb), '{start}', to_jsonb({value}))",
+    },
+    "mysql": {
+        # MySQL has no ISO 8601 parser: the date and time are read from the first 19
+        # characters, and converted from the UTC offset that follows them, if any.
+        "start": (
+            "TIMESTAMPDIFF(SECOND, CAST('1970-01-01' AS DATETIME), CONVERT_TZ("
+            "CAST(LEFT(JSON_UNQUOTE(JSON_EXTRACT({x}, '$.start')), 19) AS DATETIME), "
+            "COALESCE(NULLIF(SUBSTRING(JSON_UNQUOTE(JSON_EXTRACT({x}, '$.start')), 20), ''), "
+            "'+00:00'), '+00:00'))"
+        ),
+        "len": "JSON_LENGTH({x}, '$.data')",
+        "res": "CAST(JSON_EXTRACT({x}, '$.res') AS SIGNED)",
+        "max": "CAST(JSON_EXTRACT({x}, '$.max') AS SIGNED)",
+        "greatest": "GREATEST",
+        "last": "JSON_VALUE({x}, '$.data[last]' RETURNING DOUBLE)",
+        # JSON_VALUE only takes a literal path; a JSON null is unquoted as 'null'.
+        "at": (
+            "CAST(NULLIF(JSON_UNQUOTE(JSON_EXTRACT({x}, CONCAT('$.data[', {i}, ']'))), 'null') "
+            "AS DOUBLE)"
+        ),
+        "div": "DIV",
+        "datetime": "TIMESTAMPADD(SECOND, {e}, CAST('1970-01-01' AS DATETIME))",
+        "isoformat": (
+            "DATE_FORMAT(TIMESTAMPADD(SECOND, {e}, CAST('1970-01-01' AS DATETIME)), "
+            "'%%Y-%%m-%%dT%%H:%%i:%%s+00:00')"
+        ),
+        "empty": "JSON_SET({x}, '$.data', JSON_ARRAY(), '$.start', {value})",
+    },
+}
+
+
+class SeriesExpression(Func):
+    """Base class for expressions computed in SQL from a `TimeseriesField` column.
+
+    These read the stored JSON document directly, so the series is never
+    fetched or decoded. They are supported on SQLite, PostgreSQL and MySQL, and
+    raise `NotSupportedError` on other databases. `BinaryTimeseriesField`
+    columns are not supported.
+
+    Subclasses define `vendor_sql(sql)`, returning their SQL built from the
+    database's `VENDOR_SQL` fragments.
+    """
+
+    arity = 1
+
+    def end_epoch(self, sql):
+        return f"({sql['start']} + {sql['greatest']}({sql['len']} - 1, 0) * {sql['res']})"
+
+    def as_sql(self, compiler, connection, **extra_context):
+        vendor_sql = VENDOR_SQL.get(connection.vendor)
+        if vendor_sql is None:
+            raise NotSupportedError(
+                f"{self.__class__.__name__} is not supported on {connection.vendor}"
+            )
+        x, params = compiler.compile(self.source_expressions[0])
+        sql = self.vendor_sql(vendor_sql)
+        return sql.replace("{x}", x), tuple(params) * sql.count("{x}")
+
+
+class SeriesTransform(SeriesExpression, Transform):
+    """Base class for the summaries of a series registered as `TimeseriesField` transforms."""
+
+
+class SeriesLength(SeriesTransform):
+    """The number of buckets in a series, like `len(series)`.
+
+    Registered as the `len` transform: `Appliance.objects.filter(temperature__len__gt=0)`.
+    """
+
+    lookup_name = "len"
+    output_field = IntegerField()
+
+    def vendor_sql(self, sql):
+        return sql["len"]
+
+
+class SeriesLast(SeriesTransform):
+    """The value of the last bucket of a series, like `series[-1]`; `NULL` when empty.
+
+    Registered as the `last` transform:
+    `Appliance.objects.order_by("-temperature__last")`. Values are read as numbers.
+    """
+
+    lookup_name = "last"
+    output_field = FloatField()
+
+    def vendor_sql(self, sql):
+        return sql["last"]
+
+
+class SeriesStartTime(SeriesTransform):
+    """The datetime of the first bucket of a series, like `series.start_time`.
+
+    Registered as the `start_time` transform.
+    """
+
+    lookup_name = "start_time"
+    output_field = DateTimeField()
+
+    def vendor_sql(self, sql):
+        return sql["datetime"].replace("{e}", sql["start"])
+
+
+class SeriesEndTime(SeriesTransform):
+    """The datetime of the last bucket of a series, like `series.end_time`.
+
+    Registered as the `end_time` transform:
+    `Appliance.objects.filter(temperature__end_time__lt=an_hour_ago)`.
+    """
+
+    lookup_name = "end_time"
+    output_field = DateTimeField()
+
+    def vendor_sql(self, sql):
+        return sql["datetime"].replace("{e}", self.end_epoch(sql))
+
+
+class SeriesValueAt(SeriesExpression):
+    """The value of the bucket of a series containing the time `when`.
+
+    `NULL` if `when` is outside the series' window or its bucket has no value.
+    Used as an annotation, this reads one value per row in a single query:
+    `Appliance.objects.annotate(at_noon=SeriesValueAt("temperature", noon))`.
+    Values are read as numbers.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, expression, when, **extra):
+        self.when_epoch = int(when.timestamp())
+        super().__init__(expression, **extra)
+
+    def vendor_sql(self, sql):
+        # `when` is checked to be at or after the start first, so that the division
+        # rounds down on every database.
+        index = f"(({self.when_epoch} - {sql['start']}) {sql['div']} {sql['res']})"
+        return (
+            f"(CASE WHEN {sql['start']} <= {self.when_epoch} AND {index} < {sql['len']} "
+            f"THEN {sql['at'].replace('{i}', index)} END)"
+        )
+
+
+class SeriesStaleness(SeriesExpression):
+    """Base class for conditions comparing a series' window to the time `when`."""
+
+    output_field = BooleanField()
+
+    def __init__(self, expression, when, **extra):
+        self.when_epoch = int(when.timestamp())
+        super().__init__(expression, **extra)
+
+    def expires_at(self, epoch_sql, sql):
+        # A bucket leaves the window once a sample `max` buckets later could be added.
+        return f"({epoch_sql} + {sql['max']} * {sql['res']})"
+
+
+class SeriesIsExpired(SeriesStaleness):
+    """True for a non-empty series all of whose buckets have left the window at `when`.
+
+    `Timeseries.trim(when)` would leave such a series empty.
+    """
+
+    def vendor_sql(self, sql):
+        expires_at = self.expires_at(self.end_epoch(sql), sql)
+        return f"({sql['len']} > 0 AND {expires_at} <= {self.when_epoch})"
+
+
+class SeriesHasExpiredBuckets(SeriesStaleness):
+    """True for a non-empty series whose oldest bucket has left the window at `when`.
+
+    `Timeseries.trim(when)` would drop at least one bucket from such a series.
+    """
+
+    def vendor_sql(self, sql):
+        expires_at = self.expires_at(sql["start"], sql)
+        return f"({sql['len']} > 0 AND {expires_at} <= {self.when_epoch})"
+
+
+class ExpireSeries(SeriesExpression):
+    """The series emptied, with its start advanced past its last bucket.
+
+    Used as an `update()` value for series matching `SeriesIsExpired`, this
+    stores the same value as `Timeseries.trim` would.
+    """
+
+    output_field = JSONField()
+
+    def vendor_sql(self, sql):
+        next_epoch = f"({sql['start']} + {sql['len']} * {sql['res']})"
+        return sql["empty"].replace("{value}", sql["isoformat"].replace("{e}", next_epoch))
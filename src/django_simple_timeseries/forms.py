@@ -4,7 +4,8 @@ from string import Template
 from django.forms import Field, Widget
 from django.utils.translation import gettext_lazy as _
 
-from django_simple_timeseries.timeseries import Timeseries
+from django_simple_timeseries.instrumentation import instrumented, result_size
+from django_simple_timeseries.timeseries import MultiTimeseries, Timeseries
 
 __all__ = ("TimeseriesFormField", "TimeseriesWidget")
 
@@ -43,9 +44,21 @@ SPARKLINE_SVG_TEMPLATE = Template(
 
 
 class TimeseriesWidget(Widget):
-    """Read-only widget rendering a `Timeseries` as an inline SVG sparkline."""
+    """Read-only widget rendering a `Timeseries` as an inline SVG sparkline.
 
+    A `MultiTimeseries` is rendered as one sparkline per channel.
+    """
+
+    @instrumented("render", size=result_size)
     def render(self, name, value, attrs=None, renderer=None):
+        if isinstance(value, MultiTimeseries):
+            return "".join(
+                self.render_series(f"{name}-{channel}", value.channel(channel))
+                for channel in value.channels
+            )
+        return self.render_series(name, value)
+
+    def render_series(self, name, value):
         if not isinstance(value, Timeseries):
             return "<div>No timeseries data.</div>"
         _minval, _maxval, points = value.get_normalized_points()
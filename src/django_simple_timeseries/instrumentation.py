@@ -0,0 +1,119 @@
+import functools
+import json
+import threading
+import time
+
+from django_simple_timeseries import signals
+
+__all__ = ["disable", "enable", "get_stats", "is_enabled", "reset_stats"]
+
+_enabled = False
+_lock = threading.Lock()
+_stats = {}
+
+
+def enable():
+    """Starts recording timings and payload sizes of the instrumented operations.
+
+    The instrumented operations are `TimeseriesField` and `BinaryTimeseriesField`
+    decoding (`from_db_value`) and encoding (`get_prep_value`), `Timeseries.add`,
+    and `TimeseriesWidget.render`. While enabled, each call is added to the
+    totals returned by `get_stats`, and the `signals.measured` signal is sent.
+    While disabled, which is the default, each call only costs a flag check.
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stops recording; totals recorded so far are kept until `reset_stats`."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def get_stats():
+    """Returns the totals recorded while enabled, as a dict.
+
+    Keys are `(model_label, field_name, operation)` tuples, for example
+    `("myapp.Appliance", "temperature", "decode")`. Operations not tied to a
+    field (`add` and `render`) have the class name as `model_label` and `None` as
+    `field_name`. Values are dicts with the number of `calls`, their total
+    `seconds`, and the total payload `bytes` (`0` for operations without one).
+    """
+    with _lock:
+        return {key: dict(totals) for key, totals in _stats.items()}
+
+
+def reset_stats():
+    """Discards all recorded totals."""
+    with _lock:
+        _stats.clear()
+
+
+def payload_size(value):
+    """Returns the size in bytes of an encoded or decoded payload, or `None`."""
+    if isinstance(value, bytes | bytearray):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, dict | list):
+        return len(json.dumps(value).encode())
+    return None
+
+
+def argument_size(args, ret):
+    return payload_size(args[0])
+
+
+def result_size(args, ret):
+    return payload_size(ret)
+
+
+def record(sender, field_name, operation, seconds, size):
+    label = sender._meta.label if hasattr(sender, "_meta") else sender.__name__
+    with _lock:
+        totals = _stats.setdefault(
+            (label, field_name, operation), {"calls": 0, "seconds": 0.0, "bytes": 0}
+        )
+        totals["calls"] += 1
+        totals["seconds"] += seconds
+        totals["bytes"] += size or 0
+    signals.measured.send(
+        sender=sender, field_name=field_name, operation=operation, seconds=seconds, size=size
+    )
+
+
+def instrumented(operation, size=None):
+    """Decorates a method so that its calls are recorded while instrumentation is enabled.
+
+    `size` is called with the call's arguments (after `self`) and its return
+    value, and returns the payload size in bytes. Methods of model fields are
+    recorded against the field's model and name; other methods against their
+    class.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if not _enabled:
+                return fn(self, *args, **kwargs)
+            started = time.perf_counter()
+            ret = fn(self, *args, **kwargs)
+            seconds = time.perf_counter() - started
+            model = getattr(self, "model", None)
+            if model is not None:
+                sender, field_name = model, self.name
+            else:
+                sender, field_name = type(self), None
+            record(sender, field_name, operation, seconds, size(args, ret) if size else None)
+            return ret
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,160 @@
+import time
+from collections import deque
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import F, JSONField
+from django.utils import timezone
+
+from django_simple_timeseries.bulk import iter_batches, map_batches, timeseries_field_names
+from django_simple_timeseries.caching import invalidate_cached
+from django_simple_timeseries.concurrency import STORED_VALUE, stored_value
+from django_simple_timeseries.expressions import (
+    VENDOR_SQL,
+    ExpireSeries,
+    SeriesHasExpiredBuckets,
+    SeriesIsExpired,
+)
+
+
+def trim_batch(rows, when):
+    """Trims a batch of `(pk, series)` rows to the window at `when`; returns the changed rows."""
+    ret = []
+    for pk, series in rows:
+        if series.trim(when):
+            ret.append((pk, series))
+    return ret
+
+
+class Command(BaseCommand):
+    help = (
+        "Advances every series of a model to the current time, dropping buckets that "
+        "have left their window and emptying series that have expired entirely."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="The model to compact, as app_label.ModelName.")
+        parser.add_argument(
+            "--field",
+            action="append",
+            dest="fields",
+            help="A timeseries field to compact. May be repeated; defaults to all of them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows updated per query.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes trimming series in parallel.",
+        )
+        parser.add_argument(
+            "--no-database-expressions",
+            action="store_false",
+            dest="use_expressions",
+            help="Load and trim every series in Python, even where the database could do it.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e)) from e
+        field_names = timeseries_field_names(model)
+        if options["fields"]:
+            unknown = set(options["fields"]) - set(field_names)
+            if unknown:
+                raise CommandError(f"Not timeseries fields of {model.__name__}: {sorted(unknown)}")
+            field_names = options["fields"]
+
+        queryset = model._base_manager.all()
+        vendor = connections[queryset.db].vendor
+        now = timezone.now()
+        for field_name in field_names:
+            started = time.monotonic()
+            field = model._meta.get_field(field_name)
+            use_expressions = (
+                options["use_expressions"] and isinstance(field, JSONField) and vendor in VENDOR_SQL
+            )
+            emptied = 0
+            if use_expressions:
+                emptied = self.empty_expired(queryset, field, now, options["batch_size"])
+                stale = queryset.filter(SeriesHasExpiredBuckets(F(field_name), now))
+            else:
+                stale = queryset
+            trimmed, skipped = self.trim_stale(stale, field, now, options)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"{model.__name__}.{field_name}: emptied {emptied} expired series in the "
+                f"database, trimmed {trimmed} series in {elapsed:.1f}s"
+            )
+            if skipped:
+                self.stdout.write(
+                    f"{model.__name__}.{field_name}: skipped {skipped} series written to "
+                    "while compacting; run the command again to compact them"
+                )
+
+    def empty_expired(self, queryset, field, now, batch_size):
+        """Empties fully expired series with `UPDATE`s, without loading them."""
+        field_name = field.name
+        expired = queryset.filter(SeriesIsExpired(F(field_name), now))
+        # An emptied series has no values to summarize.
+        summaries = dict.fromkeys(field.summary_fields.values())
+        emptied = 0
+        for batch in iter_batches(expired, [], batch_size):
+            pks = [pk for (pk,) in batch]
+            # Re-checking the condition leaves alone any series written to in the meantime.
+            emptied += expired.filter(pk__in=pks).update(
+                **{field_name: ExpireSeries(F(field_name))}, **summaries
+            )
+            invalidate_cached(queryset.model, field_name, pks)
+        return emptied
+
+    def trim_stale(self, queryset, field, now, options):
+        """Loads, trims and saves the series of `queryset` with `bulk_update`.
+
+        Returns the number of series trimmed, and the number skipped because they
+        were written to after being loaded.
+        """
+        field_name = field.name
+        trimmed = 0
+        skipped = 0
+        rows = queryset.model._base_manager.using(queryset.db)
+        # The stored value of each loaded row, one dict per batch in flight. They stay
+        # in this process; only the decoded series are sent to the workers.
+        loaded = deque()
+
+        def load():
+            annotated = queryset.annotate(**{STORED_VALUE: stored_value(field)})
+            for batch in iter_batches(annotated, [field_name, STORED_VALUE], options["batch_size"]):
+                loaded.append({pk: stored for pk, _, stored in batch})
+                yield [(pk, series) for pk, series, _ in batch]
+
+        for batch in map_batches(trim_batch, load(), options["workers"], now):
+            stored = loaded.popleft()
+            if not batch:
+                continue
+            with transaction.atomic(using=queryset.db):
+                # Locking the rows and re-reading their stored values makes the write
+                # conditional on the series not having changed since they were loaded.
+                current = dict(
+                    rows.select_for_update()
+                    .filter(pk__in=[pk for pk, _ in batch])
+                    .annotate(**{STORED_VALUE: stored_value(field)})
+                    .values_list("pk", STORED_VALUE)
+                )
+                objs = [
+                    queryset.model(pk=pk, **{field_name: series}, **field.summary_values(series))
+                    for pk, series in batch
+                    if current.get(pk) == stored[pk]
+                ]
+                rows.bulk_update(objs, [field_name, *field.summary_fields.values()])
+            invalidate_cached(queryset.model, field_name, [obj.pk for obj in objs])
+            trimmed += len(objs)
+            skipped += len(batch) - len(objs)
+        return trimmed, skipped
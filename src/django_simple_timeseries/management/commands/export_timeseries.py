@@ -0,0 +1,145 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from django_simple_timeseries.bulk import pk_ranges, timeseries_field_names
+from django_simple_timeseries.export import BinaryExportWriter, CsvExportWriter
+
+WRITERS = {
+    "csv": CsvExportWriter,
+    "binary": BinaryExportWriter,
+}
+
+
+def export_series(model, field_names, writer, chunk_size, pk_range=None):
+    """Streams every series of `field_names` in `model` to `writer`; returns the count."""
+    queryset = model._base_manager.order_by("pk")
+    if pk_range is not None:
+        queryset = queryset.filter(pk__range=pk_range)
+    exported = 0
+    for pk, *values in queryset.values_list("pk", *field_names).iterator(chunk_size=chunk_size):
+        for field_name, series in zip(field_names, values, strict=True):
+            try:
+                writer.write(pk, field_name, series)
+            except ValueError as e:
+                raise CommandError(
+                    f"Cannot export {model.__name__}.{field_name} in row {pk}: {e}"
+                ) from e
+            exported += 1
+    return exported
+
+
+def export_part(model_label, field_names, fmt, path, chunk_size, pk_range):
+    """Process pool entry point: exports one primary key range to its own file.
+
+    The file is removed if the export fails, rather than left truncated.
+    """
+    if not apps.ready:
+        django.setup()
+    model = apps.get_model(model_label)
+    f = open(path, "w", newline="") if fmt == "csv" else open(path, "wb")
+    try:
+        with f:
+            writer = WRITERS[fmt](f)
+            writer.write_header()
+            return export_series(model, field_names, writer, chunk_size, pk_range)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams the timeseries columns of a model to a CSV or binary file, "
+        "holding only one chunk of rows in memory at a time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="The model to export, as app_label.ModelName.")
+        parser.add_argument(
+            "--field",
+            action="append",
+            dest="fields",
+            help="A timeseries field to export. May be repeated; defaults to all of them.",
+        )
+        parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+        parser.add_argument(
+            "-o",
+            "--output",
+            help="The file to write. Defaults to stdout for CSV; required for binary.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of rows fetched from the database at a time.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Export this many primary key ranges in parallel processes, each to "
+                "its own OUTPUT.N file."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e)) from e
+        field_names = timeseries_field_names(model)
+        if options["fields"]:
+            unknown = set(options["fields"]) - set(field_names)
+            if unknown:
+                raise CommandError(f"Not timeseries fields of {model.__name__}: {sorted(unknown)}")
+            field_names = options["fields"]
+        if not field_names:
+            raise CommandError(f"{model.__name__} has no timeseries fields")
+
+        fmt = options["format"]
+        output = options["output"]
+        if output is None and (fmt != "csv" or options["workers"] > 1):
+            raise CommandError("--output is required for binary or parallel exports")
+
+        started = time.monotonic()
+        if options["workers"] > 1:
+            exported = self.export_parallel(model, field_names, fmt, output, options)
+        elif output is None:
+            writer = CsvExportWriter(self.stdout)
+            writer.write_header()
+            exported = export_series(model, field_names, writer, options["chunk_size"])
+        else:
+            exported = export_part(
+                model._meta.label, field_names, fmt, output, options["chunk_size"], None
+            )
+        elapsed = time.monotonic() - started
+        self.stderr.write(f"Exported {exported} series in {elapsed:.1f}s", style_func=None)
+
+    def export_parallel(self, model, field_names, fmt, output, options):
+        try:
+            ranges = pk_ranges(model._base_manager.all(), options["workers"])
+        except TypeError as e:
+            raise CommandError(f"--workers: {e}") from e
+        # Child processes must open their own connections rather than share ours.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=options["workers"]) as pool:
+            futures = [
+                pool.submit(
+                    export_part,
+                    model._meta.label,
+                    field_names,
+                    fmt,
+                    f"{output}.{i}",
+                    options["chunk_size"],
+                    pk_range,
+                )
+                for i, pk_range in enumerate(ranges)
+            ]
+            return sum(future.result() for future in futures)
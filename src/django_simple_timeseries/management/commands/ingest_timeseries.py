@@ -0,0 +1,175 @@
+import datetime
+import math
+import sys
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from django_simple_timeseries.caching import invalidate_cached
+from django_simple_timeseries.models import TimeseriesFieldMixin
+
+
+def parse_value(s):
+    try:
+        return int(s)
+    except ValueError:
+        value = float(s)
+    if not math.isfinite(value):
+        raise ValueError(f"Not a finite number: {s!r}")
+    return value
+
+
+def add_samples(series, samples):
+    """Records `(when, value)` samples in `series`, oldest first.
+
+    Returns the number of samples rejected for being older than the latest one
+    already recorded.
+    """
+    rejected = 0
+    for when, value in sorted(samples, key=lambda sample: sample[0]):
+        try:
+            series.add(value, when=when)
+        except ValueError:
+            rejected += 1
+    return rejected
+
+
+class Command(BaseCommand):
+    help = (
+        "Records samples read from files or stdin, one '<app_label.Model>/<pk>/<field> "
+        "<value> <epoch seconds>' line each, writing each batch of rows at once."
+    )
+
+    stealth_options = ("stdin",)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "files",
+            nargs="*",
+            help="Files to read, in order; '-' or none reads stdin.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows loaded and written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        if self.batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        self.fields = {}
+        # `{(model, field_name): {pk: [(when, value), ...]}}`, for the current batch.
+        self.pending = defaultdict(lambda: defaultdict(list))
+        self.pending_rows = 0
+        self.counts = dict.fromkeys(("samples", "rows", "invalid", "missing", "rejected"), 0)
+
+        started = time.monotonic()
+        for name in options["files"] or ["-"]:
+            if name == "-":
+                self.ingest(options.get("stdin", sys.stdin), "stdin")
+            else:
+                try:
+                    with open(name) as f:
+                        self.ingest(f, name)
+                except OSError as e:
+                    raise CommandError(f"Cannot read {name}: {e}") from e
+        self.flush()
+        elapsed = time.monotonic() - started
+
+        counts = self.counts
+        self.stdout.write(
+            f"Recorded {counts['samples']} samples with {counts['rows']} row updates in "
+            f"{elapsed:.1f}s ({counts['samples'] / max(elapsed, 1e-6):.0f} samples/s)"
+        )
+        if counts["invalid"] or counts["missing"] or counts["rejected"]:
+            self.stdout.write(
+                f"Skipped {counts['invalid']} invalid lines, {counts['missing']} samples of "
+                f"rows that don't exist, and {counts['rejected']} samples older than their "
+                "series' latest"
+            )
+
+    def ingest(self, f, name):
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                model, field_name, pk, value, when = self.parse(line)
+            except ValueError as e:
+                self.counts["invalid"] += 1
+                self.stderr.write(f"{name}:{lineno}: {e}")
+                continue
+            if pk not in self.pending.get((model, field_name), ()):
+                # The batch is written when a row that doesn't fit in it comes up.
+                if self.pending_rows >= self.batch_size:
+                    self.flush()
+                self.pending_rows += 1
+            self.pending[model, field_name][pk].append((when, value))
+
+    def parse(self, line):
+        """Returns `(model, field_name, pk, value, when)` for one line."""
+        try:
+            key, value, epoch = line.split()
+            label, pk, field_name = key.split("/")
+        except ValueError:
+            raise ValueError(f"Expected '<model>/<pk>/<field> <value> <epoch>': {line!r}") from None
+        model, field = self.get_field(label, field_name)
+        try:
+            pk = model._meta.pk.to_python(pk)
+        except ValidationError as e:
+            raise ValueError(f"Invalid primary key {pk!r}: {e.messages[0]}") from None
+        try:
+            when = datetime.datetime.fromtimestamp(float(epoch), datetime.UTC)
+        except (OverflowError, OSError):
+            raise ValueError(f"Invalid time: {epoch!r}") from None
+        return model, field.name, pk, parse_value(value), when
+
+    def get_field(self, label, field_name):
+        key = (label, field_name)
+        if key not in self.fields:
+            try:
+                model = apps.get_model(label)
+                field = model._meta.get_field(field_name)
+            except (LookupError, FieldDoesNotExist) as e:
+                raise ValueError(str(e)) from None
+            if not isinstance(field, TimeseriesFieldMixin):
+                raise ValueError(f"{label}.{field_name} is not a timeseries field")
+            self.fields[key] = (model, field)
+        return self.fields[key]
+
+    def flush(self):
+        """Records the pending samples, locking and rewriting each model's rows at once."""
+        for (model, field_name), samples in self.pending.items():
+            field = model._meta.get_field(field_name)
+            rows = model._base_manager.all()
+            with transaction.atomic(using=rows.db):
+                loaded = (
+                    rows.select_for_update().filter(pk__in=samples).values_list("pk", field_name)
+                )
+                objs = []
+                for pk, series in loaded:
+                    rejected = add_samples(series, samples[pk])
+                    self.counts["samples"] += len(samples[pk]) - rejected
+                    self.counts["rejected"] += rejected
+                    objs.append(
+                        model(pk=pk, **{field_name: series}, **field.summary_values(series))
+                    )
+                rows.bulk_update(
+                    objs, [field_name, *field.summary_fields.values()], batch_size=self.batch_size
+                )
+                for obj in objs:
+                    field.send_buckets_finalized(obj, getattr(obj, field_name), rows.db)
+            invalidate_cached(model, field_name, [obj.pk for obj in objs])
+            written = {obj.pk for obj in objs}
+            self.counts["missing"] += sum(
+                len(row_samples) for pk, row_samples in samples.items() if pk not in written
+            )
+            self.counts["rows"] += len(objs)
+        self.pending.clear()
+        self.pending_rows = 0
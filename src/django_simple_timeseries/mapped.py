@@ -0,0 +1,348 @@
+import array
+import csv
+import datetime
+import math
+import mmap
+import struct
+import sys
+
+from django.utils import timezone
+
+from django_simple_timeseries.timeseries import BINARY_HEADER, Timeseries
+
+__all__ = ["MappedTimeseries"]
+
+# Mapped files start with the same header as `Timeseries.to_bytes`, followed by the
+# index of the oldest slot, a gap bitmap of `max_points` bits, and `max_points` value
+# slots. The slots are used as a ring, so dropping old values never moves data.
+MAPPED_MAGIC = b"tm"
+MAPPED_VERSION = 1
+MAPPED_HEAD = struct.Struct("<I")
+VALUE = struct.Struct("<d")
+
+# Number of values decoded at a time when streaming through a file.
+BLOCK_SIZE = 4096
+
+
+class MappedTimeseries:
+    """A `Timeseries` stored in a memory-mapped file, for series too large to hold in memory.
+
+    The file has a fixed size, determined by `max_points`, and values are stored
+    as doubles. Recording a sample touches a few bytes of the file, and reads
+    (`__getitem__`, `iter_points`, `stats`, `export_csv`) only map in the part of
+    the file they need, so neither depends on the series fitting in memory.
+
+    Create a new file with `create` or `from_timeseries`, and open an existing
+    one by constructing a `MappedTimeseries` with its path. Instances are context
+    managers that close the file on exit.
+
+    Arguments:
+        path: The path of an existing file created by `create`.
+        readonly: Whether to map the file read-only.
+    """
+
+    RESULT_ADDED = Timeseries.RESULT_ADDED
+    RESULT_REPLACED = Timeseries.RESULT_REPLACED
+    RESULT_TRUNCATED = Timeseries.RESULT_TRUNCATED
+    RESULT_SHIFTED = Timeseries.RESULT_SHIFTED
+
+    def __init__(self, path, readonly=False):
+        self.path = path
+        self._file = open(path, "rb" if readonly else "r+b")
+        self._map = None
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+            )
+            self._read_header()
+        except (ValueError, struct.error) as e:
+            if self._map is not None:
+                self._map.close()
+            self._file.close()
+            raise ValueError(f"Invalid mapped timeseries {path}: {e}") from e
+
+    @classmethod
+    def _layout(cls, max_points):
+        bitmap_offset = BINARY_HEADER.size + MAPPED_HEAD.size
+        values_offset = bitmap_offset + (max_points + 7) // 8
+        values_offset += -values_offset % VALUE.size
+        return bitmap_offset, values_offset, values_offset + max_points * VALUE.size
+
+    @classmethod
+    def create(cls, path, start_time=None, max_points=20 * 24, resolution_seconds=300):
+        """Creates an empty mapped series at `path`, overwriting any existing file."""
+        if max_points < 1:
+            raise ValueError("max_points must be at least 1")
+        start_time = start_time or timezone.now()
+        _, _, size = cls._layout(max_points)
+        with open(path, "wb") as f:
+            f.truncate(size)
+            f.write(
+                BINARY_HEADER.pack(
+                    MAPPED_MAGIC,
+                    MAPPED_VERSION,
+                    b"d",
+                    int(start_time.timestamp()),
+                    resolution_seconds,
+                    max_points,
+                    0,
+                )
+            )
+        return cls(path)
+
+    @classmethod
+    def from_timeseries(cls, path, series):
+        """Creates a mapped series at `path` holding a copy of `series`."""
+        for v in series.data_points:
+            cls._check_value(v)
+        mapped = cls.create(
+            path,
+            start_time=series.start_time,
+            max_points=max(series.max_points, len(series)),
+            resolution_seconds=int(series.resolution.total_seconds()),
+        )
+        for i, v in enumerate(series.data_points):
+            mapped._write_slot(i, v)
+        mapped._count = len(series)
+        mapped._write_header()
+        return mapped
+
+    def _read_header(self):
+        magic, version, typecode, start, resolution, max_points, count = BINARY_HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAPPED_MAGIC:
+            raise ValueError(f"bad magic {magic!r}")
+        if version != MAPPED_VERSION or typecode != b"d":
+            raise ValueError(f"unsupported version {version!r}")
+        self._start = start
+        self._resolution = resolution
+        self._max_points = max_points
+        self._count = count
+        (self._head,) = MAPPED_HEAD.unpack_from(self._map, BINARY_HEADER.size)
+        self._bitmap_offset, self._values_offset, size = self._layout(max_points)
+        if len(self._map) != size:
+            raise ValueError(f"file is {len(self._map)} bytes, expected {size}")
+
+    def _write_header(self):
+        BINARY_HEADER.pack_into(
+            self._map,
+            0,
+            MAPPED_MAGIC,
+            MAPPED_VERSION,
+            b"d",
+            self._start,
+            self._resolution,
+            self._max_points,
+            self._count,
+        )
+        MAPPED_HEAD.pack_into(self._map, BINARY_HEADER.size, self._head)
+
+    @staticmethod
+    def _check_value(value):
+        if value is not None and (not isinstance(value, int | float) or isinstance(value, bool)):
+            raise ValueError(f"Cannot store value of type {type(value).__name__}")
+
+    def _write_slot(self, i, value):
+        """Writes `value` at logical index `i`, which may be past the current end."""
+        slot = (self._head + i) % self._max_points
+        byte = self._bitmap_offset + slot // 8
+        bit = 1 << (slot % 8)
+        if value is None:
+            self._map[byte] |= bit
+            value = 0
+        else:
+            self._map[byte] &= ~bit & 0xFF
+        VALUE.pack_into(self._map, self._values_offset + slot * VALUE.size, value)
+
+    def _read_range(self, start, stop):
+        """Returns the values at logical indexes `start` to `stop` as a list."""
+        ret = []
+        while start < stop:
+            slot = (self._head + start) % self._max_points
+            n = min(stop - start, self._max_points - slot)
+            values = array.array("d")
+            offset = self._values_offset + slot * VALUE.size
+            values.frombytes(self._map[offset : offset + n * VALUE.size])
+            if sys.byteorder != "little":
+                values.byteswap()
+            values = values.tolist()
+            first_byte = self._bitmap_offset + slot // 8
+            last_byte = self._bitmap_offset + (slot + n - 1) // 8
+            gaps = int.from_bytes(self._map[first_byte : last_byte + 1], "little") >> (slot % 8)
+            gaps &= (1 << n) - 1
+            while gaps:
+                lowest = gaps & -gaps
+                values[lowest.bit_length() - 1] = None
+                gaps ^= lowest
+            ret.extend(values)
+            start += n
+        return ret
+
+    def close(self):
+        """Flushes and closes the underlying file."""
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def flush(self):
+        """Flushes pending writes to disk."""
+        self._map.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._count)
+            if step == 1:
+                return self._read_range(start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("MappedTimeseries index out of range")
+        return self._read_range(idx, idx + 1)[0]
+
+    @property
+    def start_time(self):
+        """The datetime of the first bucket."""
+        return datetime.datetime.fromtimestamp(self._start, datetime.UTC)
+
+    @property
+    def resolution(self):
+        return datetime.timedelta(seconds=self._resolution)
+
+    @property
+    def max_points(self):
+        return self._max_points
+
+    @property
+    def end_time(self):
+        """Returns the datetime of the last bucket."""
+        return self.start_time + self.resolution * max(self._count - 1, 0)
+
+    def normalize(self, dt):
+        """Rounds `dt` down to the start of its bucket, as `Timeseries.normalize` does."""
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=datetime.UTC)
+        ts = int(dt.timestamp())
+        return datetime.datetime.fromtimestamp(ts - (ts % self._resolution), datetime.UTC)
+
+    def add(self, value, when=None):
+        """Records `value` in the bucket containing time `when` (default: now).
+
+        Follows the same rules, and returns the same results, as `Timeseries.add`.
+        Dropping old values only advances the ring, so the cost of a sample does not
+        depend on `max_points`.
+
+        Raises `ValueError` if `value` is not a number or `None`, or if `when` is
+        older than the most recent sample.
+        """
+        self._check_value(value)
+        when = self.normalize(when or timezone.now())
+        if self._count == 0:
+            distance_in_samples = 0
+        else:
+            distance_in_samples = math.floor((when - self.end_time) / self.resolution)
+
+        if distance_in_samples < 0:
+            raise ValueError(f"Sample would go back in time: from {self.end_time} to {when}")
+        elif distance_in_samples == 0:
+            if self._count:
+                self._write_slot(self._count - 1, value)
+                return self.RESULT_REPLACED
+            result = self.RESULT_SHIFTED
+        elif distance_in_samples > self._max_points:
+            result = self.RESULT_TRUNCATED
+        else:
+            for i in range(self._count, self._count + distance_in_samples - 1):
+                self._write_slot(i, None)
+            self._write_slot(self._count + distance_in_samples - 1, value)
+            trim_samples = max(self._count + distance_in_samples - self._max_points, 0)
+            self._head = (self._head + trim_samples) % self._max_points
+            self._start += trim_samples * self._resolution
+            self._count += distance_in_samples - trim_samples
+            self._write_header()
+            return self.RESULT_SHIFTED if trim_samples else self.RESULT_ADDED
+
+        # Start over with `value` as the only sample.
+        self._head = 0
+        self._count = 1
+        self._start = int(when.timestamp())
+        self._write_slot(0, value)
+        self._write_header()
+        return result
+
+    def iter_points(self, start=None, end=None):
+        """Yields `(datetime, value)` tuples, optionally limited to `start` through `end`.
+
+        Values are read from the file a block at a time.
+        """
+        lo, hi = self._index_range(start, end)
+        for block_start in range(lo, hi, BLOCK_SIZE):
+            values = self._read_range(block_start, min(block_start + BLOCK_SIZE, hi))
+            for i, v in enumerate(values, block_start):
+                yield (self.start_time + i * self.resolution, v)
+
+    def _index_range(self, start, end):
+        lo, hi = 0, self._count
+        if start is not None:
+            lo = max(lo, math.ceil((start - self.start_time) / self.resolution))
+        if end is not None:
+            hi = min(hi, math.floor((end - self.start_time) / self.resolution) + 1)
+        return lo, max(lo, hi)
+
+    def stats(self, start=None, end=None):
+        """Returns the same summary as `Timeseries.stats`, optionally for `start` through `end`.
+
+        Values are read from the file a block at a time.
+        """
+        count = 0
+        total = 0
+        minval = None
+        maxval = None
+        lo, hi = self._index_range(start, end)
+        for block_start in range(lo, hi, BLOCK_SIZE):
+            values = [
+                v
+                for v in self._read_range(block_start, min(block_start + BLOCK_SIZE, hi))
+                if v is not None
+            ]
+            if not values:
+                continue
+            count += len(values)
+            total += math.fsum(values)
+            minval = min(values) if minval is None else min(minval, min(values))
+            maxval = max(values) if maxval is None else max(maxval, max(values))
+        return {
+            "count": count,
+            "min": minval,
+            "max": maxval,
+            "mean": total / count if count else None,
+        }
+
+    def export_csv(self, f, start=None, end=None):
+        """Writes `time,value` rows to the text file `f`, streaming from the mapped file.
+
+        Times are ISO 8601 and gaps are written as empty values.
+        """
+        writer = csv.writer(f)
+        writer.writerow(["time", "value"])
+        for ts, v in self.iter_points(start=start, end=end):
+            writer.writerow([ts.isoformat(), "" if v is None else repr(v)])
+
+    def to_timeseries(self):
+        """Reads the whole file into a regular `Timeseries`."""
+        return Timeseries(
+            start_time=self.start_time,
+            data_points=self._read_range(0, self._count),
+            max_points=self._max_points,
+            resolution_seconds=self._resolution,
+        )
@@ -1,16 +1,181 @@
+import json
 import logging
+from base64 import b64decode, b64encode
 
-from django.db.models import JSONField
+from django.core import checks
+from django.db.models import BinaryField, Field, JSONField, signals
 
+from django_simple_timeseries.expressions import (
+    SeriesEndTime,
+    SeriesLast,
+    SeriesLength,
+    SeriesStartTime,
+)
 from django_simple_timeseries.forms import TimeseriesFormField
-from django_simple_timeseries.timeseries import Timeseries
+from django_simple_timeseries.instrumentation import argument_size, instrumented, result_size
+from django_simple_timeseries.signals import buckets_finalized
+from django_simple_timeseries.timeseries import (
+    AggregatingTimeseries,
+    MultiTimeseries,
+    QuantileTimeseries,
+    Timeseries,
+)
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["TimeseriesField"]
+__all__ = ["BinaryTimeseriesField", "MultiTimeseriesField", "TimeseriesField"]
 
 
-class TimeseriesField(JSONField):
+class TimeseriesFieldMixin:
+    """Configuration and defaults shared by the timeseries model fields."""
+
+    # The summaries that can be kept in companion columns, by argument name.
+    SUMMARY_ARGUMENTS = {
+        "last_value": "last_value_field",
+        "last_time": "last_time_field",
+        "min": "min_field",
+        "max": "max_field",
+    }
+
+    # The configuration only affects new values, so changing it never alters the column.
+    non_db_attrs = (
+        *Field.non_db_attrs,
+        "resolution_seconds",
+        "max_points",
+        *SUMMARY_ARGUMENTS.values(),
+    )
+
+    def __init__(
+        self,
+        *args,
+        resolution_seconds=60,
+        max_points=60 * 24,
+        last_value_field=None,
+        last_time_field=None,
+        min_field=None,
+        max_field=None,
+        **kwargs,
+    ):
+        self.resolution_seconds = resolution_seconds
+        self.max_points = max_points
+        self.last_value_field = last_value_field
+        self.last_time_field = last_time_field
+        self.min_field = min_field
+        self.max_field = max_field
+        kwargs.setdefault("default", self.new_default_timeseries)
+        super().__init__(*args, **kwargs)
+
+    def new_default_timeseries(self):
+        return Timeseries(resolution_seconds=self.resolution_seconds, max_points=self.max_points)
+
+    @property
+    def summary_fields(self):
+        """The configured companion columns, as a `{summary: field_name}` dict."""
+        ret = {}
+        for summary, argument in self.SUMMARY_ARGUMENTS.items():
+            if getattr(self, argument) is not None:
+                ret[summary] = getattr(self, argument)
+        return ret
+
+    def summary_values(self, series):
+        """Returns the values of the companion columns for `series`, by field name.
+
+        The last value and time are those of the latest bucket holding a value (its
+        mean, in an `AggregatingTimeseries` or a `QuantileTimeseries`); all
+        summaries are `None` for a series without values.
+        """
+        summary_fields = self.summary_fields
+        if not summary_fields:
+            return {}
+        stats = series.stats()
+        if isinstance(series, (AggregatingTimeseries, QuantileTimeseries)):
+            series = series.to_timeseries("mean")
+        last_time, last_value = next(
+            ((ts, v) for ts, v in reversed(list(series.iter_points())) if v is not None),
+            (None, None),
+        )
+        summaries = {
+            "last_value": last_value,
+            "last_time": last_time,
+            "min": stats["min"],
+            "max": stats["max"],
+        }
+        return {name: summaries[summary] for summary, name in summary_fields.items()}
+
+    def update_summary_fields(self, sender, instance, raw, **kwargs):
+        # Connected to the `pre_save` signal rather than done in `pre_save()`, which
+        # runs too late for companion columns declared before this field.
+        if raw:
+            return
+        for name, value in self.summary_values(getattr(instance, self.attname)).items():
+            setattr(instance, name, value)
+
+    def send_buckets_finalized(self, instance, series, using=None):
+        """Sends `buckets_finalized` for the buckets `series` has finalized, and clears them.
+
+        Called once `series` is written to `instance`'s row.
+        """
+        buckets = getattr(series, "finalized_buckets", None)
+        if buckets:
+            series.finalized_buckets = []
+            buckets_finalized.send(
+                sender=self.model,
+                instance=instance,
+                field_name=self.name,
+                buckets=buckets,
+                using=using,
+            )
+
+    def send_saved_buckets_finalized(
+        self, sender, instance, raw, using, update_fields=None, **kwargs
+    ):
+        if raw or (update_fields is not None and self.name not in update_fields):
+            return
+        self.send_buckets_finalized(instance, getattr(instance, self.attname), using)
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if cls._meta.abstract:
+            return
+        if self.summary_fields:
+            signals.pre_save.connect(self.update_summary_fields, sender=cls)
+        signals.post_save.connect(self.send_saved_buckets_finalized, sender=cls)
+
+    def check(self, **kwargs):
+        return [*super().check(**kwargs), *self._check_summary_fields()]
+
+    def _check_summary_fields(self):
+        errors = []
+        concrete = {f.name for f in self.model._meta.concrete_fields}
+        for argument in self.SUMMARY_ARGUMENTS.values():
+            name = getattr(self, argument)
+            if name is not None and (name not in concrete or name == self.name):
+                errors.append(
+                    checks.Error(
+                        f"'{argument}' refers to '{name}', which is not another concrete "
+                        f"field of {self.model.__name__}.",
+                        obj=self,
+                        id="django_simple_timeseries.E001",
+                    )
+                )
+        return errors
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["resolution_seconds"] = self.resolution_seconds
+        kwargs["max_points"] = self.max_points
+        for argument in self.SUMMARY_ARGUMENTS.values():
+            if getattr(self, argument) is not None:
+                kwargs[argument] = getattr(self, argument)
+        if kwargs.get("default") == self.new_default_timeseries:
+            del kwargs["default"]
+        return name, path, args, kwargs
+
+    def formfield(self, **kwargs):
+        return TimeseriesFormField(**kwargs)
+
+
+class TimeseriesField(TimeseriesFieldMixin, JSONField):
     """A field storing a `Timeseries`, backed by a `JSONField` column.
 
     The model attribute is always a `Timeseries` instance: new instances get a
@@ -18,29 +183,75 @@ class TimeseriesField(JSONField):
     back into `Timeseries` objects. A malformed database value is logged and
     replaced with a fresh series rather than raised.
 
+    The `len`, `last`, `start_time` and `end_time` transforms compute a series'
+    summary in SQL, without fetching it, on SQLite, PostgreSQL and MySQL. They
+    can be used in `filter()`, `annotate()` and `order_by()`:
+    `Appliance.objects.filter(temperature__len__gt=0).order_by("-temperature__last")`.
+
+    Summaries of the series can be kept in ordinary columns of the model, which
+    can be indexed, by naming them in the `*_field` arguments. They are updated
+    whenever the instance is saved, and by the library's bulk writers
+    (`add_and_save`, `compact_timeseries` and the migration operations). A
+    `save(update_fields=...)` must list them to write them.
+
+    With `aggregate=True`, new series are `AggregatingTimeseries`, which keep the
+    count, sum, minimum and maximum of every sample recorded in each bucket
+    rather than the latest. With `quantiles=True`, they are `QuantileTimeseries`,
+    which keep a quantile sketch of each bucket's samples. The `last` transform
+    and `SeriesValueAt` read numbers, so they don't apply to either.
+
     Arguments:
         resolution_seconds: The width of each bucket, in seconds.
         max_points: Maximum number of buckets to retain; older values are
             dropped as newer samples are recorded.
+        aggregate: Whether new series aggregate the samples of each bucket.
+        quantiles: Whether new series keep a quantile sketch of each bucket.
+        last_value_field: The name of a field kept equal to the latest value
+            recorded, or `None` if there is none.
+        last_time_field: The name of a `DateTimeField` kept equal to the time of
+            the bucket of the latest value.
+        min_field: The name of a field kept equal to the smallest value.
+        max_field: The name of a field kept equal to the largest value.
     """
 
-    def __init__(self, *args, resolution_seconds=60, max_points=60 * 24, **kwargs):
-        self.resolution_seconds = resolution_seconds
-        self.max_points = max_points
-        kwargs.setdefault("default", self.new_default_timeseries)
+    non_db_attrs = (*TimeseriesFieldMixin.non_db_attrs, "aggregate", "quantiles")
+
+    def __init__(self, *args, aggregate=False, quantiles=False, **kwargs):
+        self.aggregate = aggregate
+        self.quantiles = quantiles
         super().__init__(*args, **kwargs)
 
     def new_default_timeseries(self):
-        return Timeseries(resolution_seconds=self.resolution_seconds, max_points=self.max_points)
+        cls = Timeseries
+        if self.aggregate:
+            cls = AggregatingTimeseries
+        elif self.quantiles:
+            cls = QuantileTimeseries
+        return cls(resolution_seconds=self.resolution_seconds, max_points=self.max_points)
+
+    def check(self, **kwargs):
+        return [*super().check(**kwargs), *self._check_series_kind()]
+
+    def _check_series_kind(self):
+        if self.aggregate and self.quantiles:
+            return [
+                checks.Error(
+                    "'aggregate' and 'quantiles' can't both be set.",
+                    obj=self,
+                    id="django_simple_timeseries.E003",
+                )
+            ]
+        return []
 
     def deconstruct(self):
         name, path, args, kwargs = super().deconstruct()
-        kwargs["resolution_seconds"] = self.resolution_seconds
-        kwargs["max_points"] = self.max_points
-        if kwargs.get("default") == self.new_default_timeseries:
-            del kwargs["default"]
+        if self.aggregate:
+            kwargs["aggregate"] = True
+        if self.quantiles:
+            kwargs["quantiles"] = True
         return name, path, args, kwargs
 
+    @instrumented("decode", size=argument_size)
     def from_db_value(self, value, expression, connection):
         """
         Converts a value as returned by the database to a Python object. It is the
@@ -55,6 +266,7 @@ class TimeseriesField(JSONField):
             logger.warning(f"Database value invalid, returning empty timeseries: {e}")
             return self.new_default_timeseries()
 
+    @instrumented("encode", size=result_size)
     def get_prep_value(self, value):
         """
         value is the current value of the model’s attribute, and the method should return data
@@ -81,9 +293,165 @@ class TimeseriesField(JSONField):
             logger.warning(f"Database value invalid, returning empty timeseries: {e}")
             return self.new_default_timeseries()
 
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return self.get_prep_value(value)
+
+
+TimeseriesField.register_lookup(SeriesLength)
+TimeseriesField.register_lookup(SeriesLast)
+TimeseriesField.register_lookup(SeriesStartTime)
+TimeseriesField.register_lookup(SeriesEndTime)
+
+
+class BinaryTimeseriesField(TimeseriesFieldMixin, BinaryField):
+    """A field storing a `Timeseries` in a binary (`bytea`/`BLOB`) column.
+
+    Behaves like `TimeseriesField`, but stores the packed form produced by
+    `Timeseries.to_bytes`, which is smaller than JSON and decodes without parsing
+    each value. Values must be numbers or `None`. Serializers (`dumpdata` and
+    friends) represent the value as base64, as with any `BinaryField`.
+
+    Use the `CopyTimeseriesField` migration operation to move existing data from
+    a `TimeseriesField` column.
+
+    Arguments:
+        resolution_seconds: The width of each bucket, in seconds.
+        max_points: Maximum number of buckets to retain; older values are
+            dropped as newer samples are recorded.
+        last_value_field, last_time_field, min_field, max_field: Companion
+            columns, as for `TimeseriesField`.
+    """
+
+    @instrumented("decode", size=argument_size)
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return self.new_default_timeseries()
+        try:
+            return Timeseries.from_bytes(value)
+        except ValueError as e:
+            logger.warning(f"Database value invalid, returning empty timeseries: {e}")
+            return self.new_default_timeseries()
+
+    @instrumented("encode", size=result_size)
+    def get_prep_value(self, value):
+        if value is None:
+            value = self.new_default_timeseries()
+        elif not isinstance(value, Timeseries):
+            raise TypeError(f"Unsupported value type: {type(value)!r}; expected Timeseries")
+        return super().get_prep_value(value.to_bytes())
+
+    def to_python(self, value):
+        if isinstance(value, Timeseries):
+            return value
+        elif not value:
+            return None
+        try:
+            if isinstance(value, str):
+                value = b64decode(value.encode("ascii"))
+            return Timeseries.from_bytes(value)
+        except ValueError as e:
+            logger.warning(f"Database value invalid, returning empty timeseries: {e}")
+            return self.new_default_timeseries()
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return b64encode(self.get_prep_value(value)).decode("ascii")
+
+
+class MultiTimeseriesField(JSONField):
+    """A field storing a `MultiTimeseries`, backed by a `JSONField` column.
+
+    Stores several channels recorded at the same cadence in one column, with a
+    single start time and configuration, instead of one `TimeseriesField` per
+    channel. Like `TimeseriesField`, the model attribute is always a
+    `MultiTimeseries`, and a malformed database value is logged and replaced with
+    a fresh series.
+
+    Stored series keep the channels they were created with; changing `channels`
+    only affects new values. The `TimeseriesField` transforms, summary columns
+    and management commands don't apply to this field.
+
+    Arguments:
+        channels: The names of the channels.
+        resolution_seconds: The width of each bucket, in seconds.
+        max_points: Maximum number of buckets to retain; older values are
+            dropped as newer samples are recorded.
+    """
+
+    # The configuration only affects new values, so changing it never alters the column.
+    non_db_attrs = (*Field.non_db_attrs, "channels", "resolution_seconds", "max_points")
+
+    def __init__(self, *args, channels=(), resolution_seconds=60, max_points=60 * 24, **kwargs):
+        self.channels = list(channels)
+        self.resolution_seconds = resolution_seconds
+        self.max_points = max_points
+        kwargs.setdefault("default", self.new_default_timeseries)
+        super().__init__(*args, **kwargs)
+
+    def new_default_timeseries(self):
+        return MultiTimeseries(
+            self.channels,
+            resolution_seconds=self.resolution_seconds,
+            max_points=self.max_points,
+        )
+
+    def check(self, **kwargs):
+        errors = super().check(**kwargs)
+        if not self.channels:
+            errors.append(
+                checks.Error(
+                    "MultiTimeseriesField requires at least one channel.",
+                    obj=self,
+                    id="django_simple_timeseries.E002",
+                )
+            )
+        return errors
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["channels"] = self.channels
+        kwargs["resolution_seconds"] = self.resolution_seconds
+        kwargs["max_points"] = self.max_points
+        if kwargs.get("default") == self.new_default_timeseries:
+            del kwargs["default"]
+        return name, path, args, kwargs
+
     def formfield(self, **kwargs):
         return TimeseriesFormField(**kwargs)
 
+    @instrumented("decode", size=argument_size)
+    def from_db_value(self, value, expression, connection):
+        json_value = super().from_db_value(value, expression, connection)
+        if json_value is None:
+            return self.new_default_timeseries()
+        try:
+            return MultiTimeseries.from_object(json_value)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Database value invalid, returning empty timeseries: {e}")
+            return self.new_default_timeseries()
+
+    @instrumented("encode", size=result_size)
+    def get_prep_value(self, value):
+        if value is None:
+            value = self.new_default_timeseries()
+        elif not isinstance(value, MultiTimeseries):
+            raise TypeError(f"Unsupported value type: {type(value)!r}; expected MultiTimeseries")
+        return super().get_prep_value(value.to_object())
+
+    def to_python(self, value):
+        if isinstance(value, MultiTimeseries):
+            return value
+        elif not value:
+            return None
+        try:
+            if isinstance(value, str):
+                value = json.loads(value)
+            return MultiTimeseries.from_object(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Database value invalid, returning empty timeseries: {e}")
+            return self.new_default_timeseries()
+
     def value_to_string(self, obj):
         value = self.value_from_object(obj)
         return self.get_prep_value(value)
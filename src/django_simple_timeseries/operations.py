@@ -0,0 +1,196 @@
+import logging
+import time
+
+from django.db.migrations.operations.base import Operation
+from django.db.migrations.operations.fields import AlterField, FieldOperation
+
+from django_simple_timeseries.bulk import iter_batches, map_batches
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["CopyTimeseriesField", "RebucketTimeseriesField"]
+
+
+def copy_field_values(model, from_field, to_field, using, batch_size):
+    """Copies every row's `from_field` series into `to_field`, in batches of `batch_size`."""
+    queryset = model._base_manager.using(using).only("pk", from_field).order_by("pk")
+    field = model._meta.get_field(to_field)
+    update_fields = [to_field, *field.summary_fields.values()]
+    batch = []
+    copied = 0
+    for obj in queryset.iterator(chunk_size=batch_size):
+        series = getattr(obj, from_field)
+        setattr(obj, to_field, series)
+        for name, value in field.summary_values(series).items():
+            setattr(obj, name, value)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model._base_manager.using(using).bulk_update(batch, update_fields)
+            copied += len(batch)
+            batch = []
+    if batch:
+        model._base_manager.using(using).bulk_update(batch, update_fields)
+        copied += len(batch)
+    return copied
+
+
+class CopyTimeseriesField(Operation):
+    """Migration operation copying the series in one timeseries field into another.
+
+    The two fields may be of different types, which makes this the data step
+    when moving a column between `TimeseriesField` and `BinaryTimeseriesField`:
+    add the new field, copy into it, then remove the old one.
+
+    ```py
+    operations = [
+        migrations.AddField("appliance", "temperature_bin", BinaryTimeseriesField()),
+        CopyTimeseriesField("appliance", "temperature", "temperature_bin"),
+        migrations.RemoveField("appliance", "temperature"),
+        migrations.RenameField("appliance", "temperature_bin", "temperature"),
+    ]
+    ```
+
+    Reversing the migration copies the values back.
+
+    Arguments:
+        model_name: The name of the model, as in other migration operations.
+        from_field: The name of the field to copy from.
+        to_field: The name of the field to copy into.
+        batch_size: Number of rows read and updated per query.
+    """
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, from_field, to_field, batch_size=1000):
+        self.model_name = model_name
+        self.from_field = from_field
+        self.to_field = to_field
+        self.batch_size = batch_size
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _copy(self, app_label, schema_editor, state, from_field, to_field):
+        model = state.apps.get_model(app_label, self.model_name)
+        using = schema_editor.connection.alias
+        if not self.allow_migrate_model(using, model):
+            return
+        copied = copy_field_values(model, from_field, to_field, using, self.batch_size)
+        logger.info(f"Copied {copied} series from {model.__name__}.{from_field} to {to_field}")
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._copy(app_label, schema_editor, to_state, self.from_field, self.to_field)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._copy(app_label, schema_editor, from_state, self.to_field, self.from_field)
+
+    def describe(self):
+        return f"Copy timeseries {self.model_name}.{self.from_field} to {self.to_field}"
+
+    @property
+    def migration_name_fragment(self):
+        return f"copy_{self.model_name.lower()}_{self.from_field}_{self.to_field}"
+
+
+def rebucket_batch(rows, resolution_seconds, max_points):
+    """Re-buckets a batch of `(pk, series)` rows; returns only the rows that changed."""
+    ret = []
+    for pk, series in rows:
+        if (
+            int(series.resolution.total_seconds()) != resolution_seconds
+            or series.max_points != max_points
+        ):
+            ret.append((pk, series.resample(resolution_seconds, max_points)))
+    return ret
+
+
+class RebucketTimeseriesField(AlterField):
+    """Migration operation changing a timeseries field, and converting its stored series.
+
+    Changing `resolution_seconds` or `max_points` on a timeseries field only
+    affects new defaults; series already in the table keep the settings they
+    were saved with. Use this operation in place of the `AlterField` that
+    makemigrations generates, to also re-bucket them with `Timeseries.resample`:
+
+    ```py
+    operations = [
+        RebucketTimeseriesField(
+            "appliance", "temperature", TimeseriesField(resolution_seconds=300), workers=4
+        ),
+    ]
+    ```
+
+    Rows are read in primary key order, `batch_size` at a time, re-bucketed in a
+    pool of `workers` processes, and written back with `bulk_update`. Progress and
+    throughput are logged to the `django_simple_timeseries.operations` logger.
+    Reversing the migration restores the previous field and re-buckets to its
+    configuration, which loses any detail dropped on the way forward.
+
+    Arguments:
+        model_name: The name of the model, as in other migration operations.
+        name: The name of the timeseries field.
+        field: The field with its new configuration, as for `AlterField`.
+        batch_size: Number of rows read and updated per query.
+        workers: Number of processes re-bucketing in parallel; `1` does the work
+            in the migrating process.
+    """
+
+    reduces_to_sql = False
+
+    def __init__(self, model_name, name, field, batch_size=1000, workers=1):
+        self.batch_size = batch_size
+        self.workers = workers
+        super().__init__(model_name, name, field)
+
+    # `AlterField` only deconstructs its own arguments.
+    deconstruct = Operation.deconstruct
+
+    def reduce(self, operation, app_label):
+        # Unlike `AlterField`, this can't be merged into a neighbouring operation on
+        # the same field without losing the data conversion.
+        return FieldOperation.reduce(self, operation, app_label)
+
+    def _rebucket(self, app_label, schema_editor, state):
+        model = state.apps.get_model(app_label, self.model_name)
+        using = schema_editor.connection.alias
+        if not self.allow_migrate_model(using, model):
+            return
+        field = model._meta.get_field(self.name)
+        queryset = model._base_manager.using(using)
+        total = queryset.count()
+        started = time.monotonic()
+        done = 0
+        changed = 0
+        batches = iter_batches(queryset, [self.name], self.batch_size)
+        results = map_batches(
+            rebucket_batch, batches, self.workers, field.resolution_seconds, field.max_points
+        )
+        for rows in results:
+            queryset.bulk_update(
+                [
+                    model(pk=pk, **{self.name: series}, **field.summary_values(series))
+                    for pk, series in rows
+                ],
+                [self.name, *field.summary_fields.values()],
+            )
+            done = min(done + self.batch_size, total)
+            changed += len(rows)
+            elapsed = time.monotonic() - started
+            logger.info(
+                f"Re-bucketed {model.__name__}.{self.name}: {done}/{total} rows, "
+                f"{changed} changed, {done / elapsed if elapsed else 0:.0f} rows/s"
+            )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        # `AlterField.database_backwards` calls this with the states swapped, so
+        # `to_state` holds the configuration to convert to in both directions.
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+        self._rebucket(app_label, schema_editor, to_state)
+
+    def describe(self):
+        return f"Alter field {self.name} on {self.model_name} and re-bucket its series"
+
+    @property
+    def migration_name_fragment(self):
+        return f"rebucket_{self.model_name.lower()}_{self.name}"
@@ -0,0 +1,111 @@
+from collections import deque
+
+__all__ = ["Rolling", "ewm"]
+
+
+def with_values(series, data_points):
+    """Returns a series like `series`, with its values replaced by `data_points`."""
+    return type(series)(
+        start_time=series.start_time,
+        data_points=data_points,
+        max_points=series.max_points,
+        resolution_seconds=int(series.resolution.total_seconds()),
+    )
+
+
+class Rolling:
+    """Moving-window aggregates of a series, as returned by `Timeseries.rolling`.
+
+    Each method returns a new series with the same buckets, whose value in each
+    bucket aggregates the values of the `window` buckets ending at it. Gaps are
+    left out of the aggregates; a bucket whose window holds fewer than
+    `min_periods` values is a gap in the result. Every aggregate is computed in a
+    single pass over the series.
+    """
+
+    def __init__(self, series, window, min_periods=1):
+        if window < 1:
+            raise ValueError(f"window must be at least 1, not {window}")
+        self.series = series
+        self.window = window
+        self.min_periods = max(min_periods, 1)
+
+    def _running_sums(self):
+        # Yields the sum and number of values in each window, adding the value
+        # entering the window and subtracting the one leaving it.
+        values = self.series.data_points
+        total = 0
+        count = 0
+        for i, v in enumerate(values):
+            if v is not None:
+                total += v
+                count += 1
+            if i >= self.window and values[i - self.window] is not None:
+                total -= values[i - self.window]
+                count -= 1
+            yield total, count
+
+    def sum(self):
+        return with_values(
+            self.series,
+            [total if count >= self.min_periods else None for total, count in self._running_sums()],
+        )
+
+    def mean(self):
+        return with_values(
+            self.series,
+            [
+                total / count if count >= self.min_periods else None
+                for total, count in self._running_sums()
+            ],
+        )
+
+    def _extreme(self, better):
+        # A monotonic deque of the indices of the window's values, in which each
+        # value is `better` than those after it, so the first is the window's extreme.
+        values = self.series.data_points
+        candidates = deque()
+        count = 0
+        ret = []
+        for i, v in enumerate(values):
+            if v is not None:
+                while candidates and not better(values[candidates[-1]], v):
+                    candidates.pop()
+                candidates.append(i)
+                count += 1
+            if i >= self.window:
+                if candidates and candidates[0] == i - self.window:
+                    candidates.popleft()
+                if values[i - self.window] is not None:
+                    count -= 1
+            ret.append(values[candidates[0]] if count >= self.min_periods else None)
+        return with_values(self.series, ret)
+
+    def min(self):
+        return self._extreme(lambda a, b: a < b)
+
+    def max(self):
+        return self._extreme(lambda a, b: a > b)
+
+
+def ewm(series, alpha):
+    """Returns the exponentially weighted moving average of `series`; see `Timeseries.ewm`."""
+    if not 0 < alpha <= 1:
+        raise ValueError(f"alpha must be in (0, 1], not {alpha}")
+    ret = []
+    average = None
+    last = None
+    for i, v in enumerate(series.data_points):
+        if v is None:
+            ret.append(None)
+            continue
+        if average is None:
+            average = v
+        else:
+            # The previous average decays once per bucket since it was computed, so
+            # a value following a gap weighs more than one following a sample.
+            decayed = (1 - alpha) ** (i - last)
+            average = (decayed * average + alpha * v) / (decayed + alpha)
+        last = i
+        ret.append(average)
+    return with_values(series, ret)
@@ -0,0 +1,179 @@
+import os
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from django_simple_timeseries.models import TimeseriesField
+from django_simple_timeseries.timeseries import Timeseries
+
+__all__ = ["AbstractTimeseriesShard", "ShardedTimeseries", "ShardedTimeseriesField", "sum_series"]
+
+
+def sum_series(series, max_points, resolution_seconds):
+    """Returns the bucket-wise sum of `series`, as a new `Timeseries`.
+
+    A bucket is a gap in the result only if it is a gap, or missing, in every
+    series. The result keeps the `max_points` buckets ending at the latest one.
+    """
+    ret = Timeseries(max_points=max_points, resolution_seconds=resolution_seconds)
+    for other in series:
+        if not other.data_points:
+            continue
+        if not ret.data_points:
+            ret.start_time = other.start_time
+            ret.data_points = list(other.data_points)
+            continue
+        ret, other = ret.align(other)
+        ret.data_points = [
+            w if v is None else v if w is None else v + w
+            for v, w in zip(ret.data_points, other.data_points, strict=True)
+        ]
+    ret.max_points = max_points
+    if ret.data_points:
+        ret.trim(when=ret.end_time)
+    return ret
+
+
+class AbstractTimeseriesShard(models.Model):
+    """Base model for the companion table of a `ShardedTimeseriesField`.
+
+    Each row holds the counts recorded by one group of writers, in its own
+    series. Subclasses must add a `ForeignKey` to the owning model, and should
+    make `(owner, shard)` unique:
+
+    ```py
+    class RequestCountShard(AbstractTimeseriesShard):
+        site = models.ForeignKey(Site, on_delete=models.CASCADE, related_name="request_shards")
+
+        class Meta:
+            unique_together = [("site", "shard")]
+    ```
+    """
+
+    shard = models.PositiveSmallIntegerField()
+    series = TimeseriesField()
+
+    class Meta:
+        abstract = True
+
+
+class ShardedTimeseriesField:
+    """A counter series attribute whose writes are spread over several shard rows.
+
+    For the few series that every process writes to, such as a global count of
+    requests per minute, locking a single row serializes all the writers. Here,
+    each process increments its own shard: one of `shards` rows of an
+    `AbstractTimeseriesShard` subclass, reached through `related_name`, so that
+    writers only contend with the other writers of their shard. Reads sum the
+    shards bucket by bucket, and `compact()` folds them back into one row.
+
+    Like `ChunkedTimeseriesField`, it is a plain descriptor rather than a model
+    field: accessing it on a saved instance returns a `ShardedTimeseries`.
+
+    Arguments:
+        related_name: The `related_name` of the shard model's `ForeignKey`.
+        shards: The number of shard rows writers are spread over.
+        resolution_seconds: The width of each bucket, in seconds.
+        max_points: Maximum number of buckets to retain.
+    """
+
+    def __init__(self, related_name, *, shards=8, resolution_seconds=60, max_points=60 * 24):
+        self.related_name = related_name
+        self.shards = shards
+        self.resolution_seconds = resolution_seconds
+        self.max_points = max_points
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return ShardedTimeseries(
+            getattr(instance, self.related_name),
+            shard_count=self.shards,
+            resolution_seconds=self.resolution_seconds,
+            max_points=self.max_points,
+        )
+
+
+class ShardedTimeseries:
+    """A counter series stored as the bucket-wise sum of shard rows, accessed through `shards`.
+
+    Usually obtained from a `ShardedTimeseriesField`. Every method queries the
+    database; nothing is cached on the object.
+
+    Arguments:
+        shards: The related manager of the series' shard rows.
+        shard_count: The number of shard rows writers are spread over.
+        resolution_seconds: The width of each bucket, in seconds.
+        max_points: Maximum number of buckets to retain.
+    """
+
+    def __init__(self, shards, shard_count=8, resolution_seconds=60, max_points=60 * 24):
+        self.shards = shards
+        self.shard_count = shard_count
+        self.resolution_seconds = resolution_seconds
+        self.max_points = max_points
+
+    def process_shard(self):
+        """Returns the shard written by this process."""
+        return os.getpid() % self.shard_count
+
+    def increment(self, value=1, when=None, shard=None):
+        """Adds `value` to the bucket containing time `when` (default: now).
+
+        The write goes to `shard` (default: this process's shard), in a
+        transaction that locks only that shard's row, creating it if needed.
+
+        Returns one of the `Timeseries.RESULT_*` values, as `Timeseries.add` does.
+
+        Raises `ValueError` if `when` is older than the shard's latest sample.
+        """
+        when = when or timezone.now()
+        shard = self.process_shard() if shard is None else shard
+        with transaction.atomic(using=self.shards.db):
+            # As in `ChunkedTimeseries.add`, the owner is passed explicitly.
+            owner = {self.shards.field.name: self.shards.instance}
+            row, _ = self.shards.select_for_update().get_or_create(
+                shard=shard,
+                **owner,
+                defaults={
+                    "series": Timeseries(
+                        max_points=self.max_points, resolution_seconds=self.resolution_seconds
+                    )
+                },
+            )
+            series = row.series
+            if series.has_a_current_sample(when) and series.data_points[-1] is not None:
+                value += series.data_points[-1]
+            result = series.add(value, when=when)
+            row.save(update_fields=["series"])
+        return result
+
+    def to_timeseries(self):
+        """Returns the bucket-wise sum of the shards, as a `Timeseries`, in one query."""
+        return sum_series(
+            self.shards.values_list("series", flat=True), self.max_points, self.resolution_seconds
+        )
+
+    def iter_points(self):
+        """Yields `(datetime, value)` tuples for the series, as `Timeseries.iter_points` does."""
+        return self.to_timeseries().iter_points()
+
+    def compact(self):
+        """Folds every shard into the lowest one, deleting the others.
+
+        Run it periodically, so that reads sum few rows. The shards are locked
+        while they are folded; writers recreate their shards as needed.
+
+        Returns the number of shard rows deleted.
+        """
+        with transaction.atomic(using=self.shards.db):
+            rows = list(self.shards.select_for_update().order_by("shard"))
+            if len(rows) < 2:
+                return 0
+            first, *rest = rows
+            first.series = sum_series(
+                [row.series for row in rows], self.max_points, self.resolution_seconds
+            )
+            first.save(update_fields=["series"])
+            deleted, _ = self.shards.filter(pk__in=[row.pk for row in rest]).delete()
+        return deleted
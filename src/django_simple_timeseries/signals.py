@@ -0,0 +1,17 @@
+from django.dispatch import Signal
+
+__all__ = ["buckets_finalized", "measured"]
+
+# Sent after each instrumented operation while instrumentation is enabled; see
+# `django_simple_timeseries.instrumentation`. The sender is the model class (or
+# `Timeseries`/`TimeseriesWidget` for operations not tied to a field), with keyword
+# arguments `field_name`, `operation`, `seconds` and `size` (bytes, or `None`).
+measured = Signal()
+
+# Sent when a saved series has finalized buckets: buckets that can't change any more,
+# because a sample was recorded in a later one. It is sent once per write, right after
+# it and in its transaction if there is one, by `save()`, `add_and_save` and
+# `ingest_timeseries`; bucket values are as stored in `data_points`. The sender is the
+# model class, with keyword arguments `instance`, `field_name`, `buckets` (a list of
+# `(datetime, value)` tuples, oldest first) and `using`.
+buckets_finalized = Signal()
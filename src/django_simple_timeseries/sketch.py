@@ -0,0 +1,217 @@
+import math
+
+__all__ = ["QuantileSketch", "merged"]
+
+
+class QuantileSketch:
+    """A mergeable sketch of a distribution, answering quantile queries (a DDSketch).
+
+    Each value is counted in a bin whose bounds grow geometrically, so that any
+    quantile is returned within `relative_accuracy` of the true value, relative
+    to it. A sketch holds at most `MAX_BINS` bins of positive and of negative
+    values, however many values it records, which bounds its size and the time
+    taken to merge or query it: past that, the bins nearest zero are folded
+    together, losing accuracy for the lowest quantiles only.
+
+    Arguments:
+        relative_accuracy: The relative error of quantiles, in `(0, 1)`.
+    """
+
+    MAX_BINS = 1024
+    # Values closer to zero than this are counted as zero.
+    MIN_VALUE = 1e-9
+
+    KEY_COUNT = "n"
+    KEY_SUM = "sum"
+    KEY_MIN = "min"
+    KEY_MAX = "max"
+    KEY_ZERO = "zero"
+    KEY_POSITIVE = "pos"
+    KEY_NEGATIVE = "neg"
+
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be in (0, 1), not {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        self.zero_count = 0
+        self.positive = {}
+        self.negative = {}
+
+    def __eq__(self, other):
+        if not isinstance(other, QuantileSketch):
+            return False
+        return (
+            self.relative_accuracy == other.relative_accuracy
+            and self.to_object() == other.to_object()
+        )
+
+    def __repr__(self):
+        return f"<QuantileSketch count={self.count} min={self.min} max={self.max}>"
+
+    @classmethod
+    def from_object(cls, o, relative_accuracy=0.01):
+        """Builds a sketch from a dict previously produced by `to_object`.
+
+        Raises `ValueError` if the object is not a serialized sketch.
+        """
+        if not isinstance(o, dict):
+            raise ValueError(f"Expected a dict, got {type(o).__name__}")
+        ret = cls(relative_accuracy)
+        try:
+            ret.count = o[cls.KEY_COUNT]
+            ret.sum = o[cls.KEY_SUM]
+            ret.min = o[cls.KEY_MIN]
+            ret.max = o[cls.KEY_MAX]
+            ret.zero_count = o[cls.KEY_ZERO]
+            ret.positive = cls._unpack_bins(o[cls.KEY_POSITIVE])
+            ret.negative = cls._unpack_bins(o[cls.KEY_NEGATIVE])
+        except KeyError as e:
+            raise ValueError(f"Missing key: {e}") from e
+        if ret.count != ret.zero_count + sum(ret.positive.values()) + sum(ret.negative.values()):
+            raise ValueError("Sketch bins don't add up to its count")
+        return ret
+
+    @staticmethod
+    def _unpack_bins(packed):
+        # `[offset, count, count, ...]`: the counts of consecutive bins from `offset`.
+        if not isinstance(packed, list) or any(not isinstance(c, int) for c in packed):
+            raise ValueError(f"Invalid sketch bins: {packed!r}")
+        if not packed:
+            return {}
+        offset = packed[0]
+        return {offset + i: c for i, c in enumerate(packed[1:]) if c}
+
+    @staticmethod
+    def _pack_bins(bins):
+        if not bins:
+            return []
+        low = min(bins)
+        return [low, *(bins.get(key, 0) for key in range(low, max(bins) + 1))]
+
+    def to_object(self):
+        """Returns this sketch as a plain, JSON-serializable dict.
+
+        `relative_accuracy` is left out; the series holding the sketch records it.
+        """
+        return {
+            self.KEY_COUNT: self.count,
+            self.KEY_SUM: self.sum,
+            self.KEY_MIN: self.min,
+            self.KEY_MAX: self.max,
+            self.KEY_ZERO: self.zero_count,
+            self.KEY_POSITIVE: self._pack_bins(self.positive),
+            self.KEY_NEGATIVE: self._pack_bins(self.negative),
+        }
+
+    def copy(self):
+        ret = QuantileSketch(self.relative_accuracy)
+        ret.merge(self)
+        return ret
+
+    def _key(self, magnitude):
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key):
+        # The value of bin `key` whose relative error to every value in it is lowest.
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def _collapse(self, bins):
+        # Folds the bins nearest zero into the lowest bin kept.
+        lowest = max(bins) - self.MAX_BINS + 1
+        if min(bins) < lowest:
+            folded = sum(c for key, c in bins.items() if key < lowest)
+            for key in [key for key in bins if key < lowest]:
+                del bins[key]
+            bins[lowest] = bins.get(lowest, 0) + folded
+
+    def add(self, value, count=1):
+        """Records `value`, `count` times."""
+        if abs(value) < self.MIN_VALUE:
+            self.zero_count += count
+        else:
+            bins = self.positive if value > 0 else self.negative
+            key = self._key(abs(value))
+            if key in bins:
+                bins[key] += count
+            else:
+                bins[key] = count
+                self._collapse(bins)
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """Adds every value recorded in the sketch `other` to this one.
+
+        Raises `ValueError` if the sketches don't have the same accuracy.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                f"Cannot merge sketches of relative accuracy {other.relative_accuracy} "
+                f"and {self.relative_accuracy}"
+            )
+        if not other.count:
+            return
+        for bins, other_bins in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, c in other_bins.items():
+                bins[key] = bins.get(key, 0) + c
+            if bins:
+                self._collapse(bins)
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q):
+        """Returns the value at quantile `q`, in `[0, 1]`; `None` if the sketch is empty."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], not {q}")
+        if not self.count:
+            return None
+        if q in (0, 1):
+            # Exact, as the sketch keeps the extremes.
+            return self.max if q else self.min
+        rank = q * (self.count - 1)
+        seen = 0
+        ret = None
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                ret = -self._value(key)
+                break
+        else:
+            seen += self.zero_count
+            if seen > rank:
+                ret = 0
+            else:
+                for key in sorted(self.positive):
+                    seen += self.positive[key]
+                    if seen > rank:
+                        ret = self._value(key)
+                        break
+        return min(max(ret, self.min), self.max)
+
+
+def merged(sketches, relative_accuracy=0.01):
+    """Returns a new sketch of every value recorded in `sketches`.
+
+    An empty `sketches` gives an empty sketch of `relative_accuracy`.
+    """
+    ret = None
+    for sketch in sketches:
+        if ret is None:
+            ret = QuantileSketch(sketch.relative_accuracy)
+        ret.merge(sketch)
+    return ret if ret is not None else QuantileSketch(relative_accuracy)
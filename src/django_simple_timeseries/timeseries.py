@@ -1,14 +1,45 @@
+import array
 import datetime
 import json
 import math
+import numbers
+import operator
+import struct
+import sys
 
 from django.utils import timezone
 
+from django_simple_timeseries import rolling
+from django_simple_timeseries.instrumentation import instrumented
+from django_simple_timeseries.sketch import QuantileSketch, merged
+
 
 def parse_isodate(s):
     return datetime.datetime.fromisoformat(s)
 
 
+# Header of the binary form: magic, version, value typecode, start time (epoch seconds),
+# resolution seconds, max points, number of points. In the dense layout (version 1), it
+# is followed by a gap bitmap of `ceil(count / 8)` bytes (bit set = `None`), then `count`
+# little-endian 8-byte values. In the run-length layout (version 2), it is followed by
+# the number of runs, a gap bitmap of `ceil(runs / 8)` bytes, the 4-byte length of each
+# run, then one 8-byte value per run that isn't a gap.
+BINARY_HEADER = struct.Struct("<2sBcqIII")
+BINARY_RUNS_HEADER = struct.Struct("<I")
+BINARY_MAGIC = b"ts"
+
+
+def _unpickle_timeseries(cls, start_time, data_points, max_points, resolution_seconds):
+    if isinstance(data_points, bytes):
+        data_points = Timeseries.from_bytes(data_points).data_points
+    return cls(
+        start_time=start_time,
+        data_points=data_points,
+        max_points=max_points,
+        resolution_seconds=resolution_seconds,
+    )
+
+
 class Timeseries:
     """A compact, fixed-resolution timeseries.
 
@@ -20,6 +51,11 @@ class Timeseries:
     Only `start_time` is stored; the timestamp of every other bucket is derived
     from it, which is what keeps the serialized form small.
 
+    `finalized_buckets` lists the `(datetime, value)` buckets that `add` has moved
+    past since the series was created or loaded: their value can't change any
+    more. A `TimeseriesField` reports them with the `buckets_finalized` signal
+    when the series is saved, and clears the list.
+
     Arguments:
         start_time: The datetime of the first bucket. Defaults to the current time.
         data_points: Initial vector of values. Defaults to an empty series.
@@ -28,6 +64,11 @@ class Timeseries:
     """
 
     VERSION = 1
+    BINARY_VERSION = 1
+    # The "kind" of series recorded by `to_object`, for the subclasses whose buckets
+    # aren't plain values.
+    KIND = None
+    BINARY_RUNS_VERSION = 2
 
     RESULT_ADDED = "added"
     RESULT_REPLACED = "replaced"
@@ -39,6 +80,7 @@ class Timeseries:
     KEY_RESOLUTION_SECONDS = "res"
     KEY_MAX_POINTS = "max"
     KEY_DATA_POINTS = "data"
+    KEY_KIND = "kind"
 
     def __init__(
         self,
@@ -51,12 +93,87 @@ class Timeseries:
         self.data_points = data_points if data_points is not None else []
         self.max_points = max_points
         self.resolution = datetime.timedelta(seconds=resolution_seconds)
+        self.finalized_buckets = []
+
+    @property
+    def data_points(self):
+        """The vector of values, one per bucket; gaps are `None`."""
+        self._own()
+        return self._data_points
+
+    @data_points.setter
+    def data_points(self, data_points):
+        self._data_points = data_points
+        self._shared = False
+
+    def _own(self):
+        # Copies the values shared with a copy of this series, before they are changed.
+        if self._shared:
+            self._data_points = self._copy_values()
+            self._shared = False
+
+    def _copy_values(self):
+        return list(self._data_points)
+
+    def __copy__(self):
+        """Returns a copy sharing this series' values until either series changes.
+
+        The values are copied by whichever series is changed first (or whose
+        `data_points` is read, as the caller may change it), so a snapshot of a
+        series costs nothing until then. `copy.deepcopy()` does the same.
+        """
+        ret = type(self).__new__(type(self))
+        ret.__dict__.update(self.__dict__)
+        ret.finalized_buckets = list(self.finalized_buckets)
+        self._shared = ret._shared = True
+        return ret
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def __reduce__(self):
+        # Pickled in the binary form of `to_bytes` when it round-trips the values
+        # exactly and is smaller: pickle spends 9 bytes on a float and at least 2
+        # on an integer, while runs and gaps pack to almost nothing.
+        types = {type(v) for v in self._data_points} - {type(None)}
+        values = self._data_points
+        if types <= {int} or types <= {float}:
+            try:
+                packed = self.to_bytes()
+            except ValueError:
+                packed = None
+            if packed and len(packed) < len(values) * (9 if float in types else 2):
+                values = packed
+        state = {
+            name: value
+            for name, value in self.__dict__.items()
+            if name
+            not in (
+                "start_time",
+                "_data_points",
+                "_shared",
+                "max_points",
+                "resolution",
+                "finalized_buckets",
+            )
+        }
+        return (
+            _unpickle_timeseries,
+            (
+                type(self),
+                self.start_time,
+                values,
+                self.max_points,
+                int(self.resolution.total_seconds()),
+            ),
+            state or None,
+        )
 
     def __len__(self):
-        return len(self.data_points)
+        return len(self._data_points)
 
     def __getitem__(self, idx):
-        return self.data_points[idx]
+        return self._data_points[idx]
 
     def __eq__(self, other):
         if not isinstance(other, Timeseries):
@@ -67,6 +184,9 @@ class Timeseries:
     def from_object(cls, o):
         """Builds a `Timeseries` from a dict previously produced by `to_object`.
 
+        A dict produced by an `AggregatingTimeseries` or a `QuantileTimeseries`
+        builds one.
+
         Raises `ValueError` if the object is not a supported serialized form.
         """
         if not isinstance(o, dict):
@@ -74,6 +194,14 @@ class Timeseries:
         object_version = o.get(cls.KEY_VERSION)
         if object_version != cls.VERSION:
             raise ValueError(f"Unsupported object version: {repr(object_version)}")
+        kinds = {
+            kind.KIND: kind for kind in (Timeseries, AggregatingTimeseries, QuantileTimeseries)
+        }
+        kind = o.get(cls.KEY_KIND)
+        if kind not in kinds:
+            raise ValueError(f"Unsupported series kind: {repr(kind)}")
+        if not issubclass(cls, kinds[kind]):
+            return kinds[kind].from_object(o)
         try:
             return cls(
                 start_time=parse_isodate(o[cls.KEY_START_TIME]),
@@ -90,6 +218,85 @@ class Timeseries:
         o = json.loads(s)
         return cls.from_object(o)
 
+    @classmethod
+    def from_bytes(cls, b):
+        """Builds a `Timeseries` from bytes previously produced by `to_bytes`.
+
+        Values are decoded in bulk with `array.frombytes`, so the cost is
+        dominated by the copy rather than per-value parsing.
+
+        Raises `ValueError` if `b` is not a supported binary form.
+        """
+        view = memoryview(b)
+        try:
+            magic, version, typecode, start, resolution, max_points, count = (
+                BINARY_HEADER.unpack_from(view)
+            )
+        except struct.error as e:
+            raise ValueError(f"Invalid binary timeseries: {e}") from e
+        if magic != BINARY_MAGIC:
+            raise ValueError(f"Invalid binary timeseries magic: {bytes(magic)!r}")
+        if typecode not in (b"d", b"q"):
+            raise ValueError(f"Unsupported binary typecode: {typecode!r}")
+        if version == cls.BINARY_VERSION:
+            data_points = cls._unpack_dense(view, typecode.decode(), count)
+        elif version == cls.BINARY_RUNS_VERSION:
+            data_points = cls._unpack_runs(view, typecode.decode(), count)
+        else:
+            raise ValueError(f"Unsupported binary version: {version!r}")
+
+        return cls(
+            start_time=datetime.datetime.fromtimestamp(start, datetime.UTC),
+            data_points=data_points,
+            max_points=max_points,
+            resolution_seconds=resolution,
+        )
+
+    @staticmethod
+    def _unpack_values(view, typecode, start, count):
+        end = start + count * 8
+        if len(view) != end:
+            raise ValueError(f"Binary timeseries has {len(view)} bytes, expected {end}")
+        values = array.array(typecode)
+        values.frombytes(view[start:end])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values.tolist()
+
+    @classmethod
+    def _unpack_dense(cls, view, typecode, count):
+        bitmap_start = BINARY_HEADER.size
+        values_start = bitmap_start + (count + 7) // 8
+        data_points = cls._unpack_values(view, typecode, values_start, count)
+        gaps = int.from_bytes(view[bitmap_start:values_start], "little")
+        while gaps:
+            lowest = gaps & -gaps
+            data_points[lowest.bit_length() - 1] = None
+            gaps ^= lowest
+        return data_points
+
+    @classmethod
+    def _unpack_runs(cls, view, typecode, count):
+        try:
+            (runs,) = BINARY_RUNS_HEADER.unpack_from(view, BINARY_HEADER.size)
+        except struct.error as e:
+            raise ValueError(f"Invalid binary timeseries: {e}") from e
+        bitmap_start = BINARY_HEADER.size + BINARY_RUNS_HEADER.size
+        lengths_start = bitmap_start + (runs + 7) // 8
+        values_start = lengths_start + runs * 4
+        gaps = int.from_bytes(view[bitmap_start:lengths_start], "little")
+        lengths = array.array("I")
+        lengths.frombytes(view[lengths_start:values_start])
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        if len(lengths) != runs or sum(lengths) != count:
+            raise ValueError(f"Binary timeseries runs don't add up to {count} points")
+        values = iter(cls._unpack_values(view, typecode, values_start, runs - gaps.bit_count()))
+        data_points = []
+        for i, length in enumerate(lengths):
+            data_points.extend([None if gaps >> i & 1 else next(values)] * length)
+        return data_points
+
     def normalize(self, dt):
         """Rounds `dt` down to the start of its bucket.
 
@@ -105,7 +312,7 @@ class Timeseries:
     @property
     def end_time(self):
         """Returns the datetime of the last bucket."""
-        num_samples = len(self.data_points)
+        num_samples = len(self._data_points)
         if num_samples <= 1:
             return self.start_time
         return self.start_time + self.resolution * (num_samples - 1)
@@ -117,7 +324,7 @@ class Timeseries:
         value rather than record a new one. `when` defaults to the current time.
         """
         when = when or timezone.now()
-        if not len(self.data_points):
+        if not len(self._data_points):
             return False
         return self.end_time == self.normalize(when)
 
@@ -126,7 +333,7 @@ class Timeseries:
         return {
             self.KEY_VERSION: self.VERSION,
             self.KEY_START_TIME: self.start_time.isoformat(timespec="seconds"),
-            self.KEY_DATA_POINTS: self.data_points,
+            self.KEY_DATA_POINTS: self._data_points,
             self.KEY_MAX_POINTS: self.max_points,
             self.KEY_RESOLUTION_SECONDS: int(self.resolution.total_seconds()),
         }
@@ -135,6 +342,90 @@ class Timeseries:
         """Returns this series serialized as a JSON string."""
         return json.dumps(self.to_object(), indent=0)
 
+    def to_bytes(self):
+        """Returns this series in a compact, versioned binary form.
+
+        Values are packed as 8-byte integers if they are all `int`, and as doubles
+        otherwise, with gaps recorded in a bitmap. When it is smaller, as for
+        series that are mostly gaps or hold long runs of a repeated value, runs of
+        identical values are stored once each, along with their length.
+
+        Raises `ValueError` if the series holds values other than numbers and `None`,
+        integers that a double can't represent exactly alongside floats, or a
+        configuration that doesn't fit the header.
+        """
+        typecode = "q"
+        values = []
+        bitmap = bytearray((len(self._data_points) + 7) // 8)
+        for i, v in enumerate(self._data_points):
+            if v is None:
+                bitmap[i >> 3] |= 1 << (i & 7)
+                v = 0
+            elif isinstance(v, float):
+                typecode = "d"
+            elif not isinstance(v, int) or isinstance(v, bool):
+                raise ValueError(f"Cannot pack value of type {type(v).__name__}")
+            values.append(v)
+
+        if typecode == "d":
+            for v in values:
+                if isinstance(v, int) and abs(v) > 2**53:
+                    raise ValueError(f"Cannot pack {v} as a double without losing precision")
+        try:
+            packed = array.array(typecode, values)
+        except OverflowError as e:
+            raise ValueError(f"Cannot pack value: {e}") from e
+        if sys.byteorder != "little":
+            packed.byteswap()
+        packed = packed.tobytes()
+
+        # Runs of buckets that are all gaps, or all hold the same value bit for bit.
+        count = len(self._data_points)
+        words = memoryview(packed).cast("Q")
+        gaps = [v is None for v in self._data_points]
+        run_starts = [
+            i for i in range(count) if i == 0 or gaps[i] != gaps[i - 1] or words[i] != words[i - 1]
+        ]
+        run_gaps = [gaps[i] for i in run_starts]
+        runs = len(run_starts)
+        runs_size = BINARY_RUNS_HEADER.size + (runs + 7) // 8 + runs * 12 - sum(run_gaps) * 8
+        use_runs = runs_size < len(bitmap) + len(packed)
+
+        try:
+            header = BINARY_HEADER.pack(
+                BINARY_MAGIC,
+                self.BINARY_RUNS_VERSION if use_runs else self.BINARY_VERSION,
+                typecode.encode(),
+                int(self.start_time.timestamp()),
+                int(self.resolution.total_seconds()),
+                self.max_points,
+                count,
+            )
+        except struct.error as e:
+            raise ValueError(f"Cannot pack header: {e}") from e
+        if not use_runs:
+            return header + bytes(bitmap) + packed
+
+        run_bitmap = bytearray((runs + 7) // 8)
+        for i, gap in enumerate(run_gaps):
+            if gap:
+                run_bitmap[i >> 3] |= 1 << (i & 7)
+        lengths = array.array(
+            "I",
+            (end - start for start, end in zip(run_starts, [*run_starts[1:], count], strict=True)),
+        )
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        values = b"".join(
+            packed[i * 8 : i * 8 + 8]
+            for i, gap in zip(run_starts, run_gaps, strict=True)
+            if not gap
+        )
+        return (
+            header + BINARY_RUNS_HEADER.pack(runs) + bytes(run_bitmap) + lengths.tobytes() + values
+        )
+
+    @instrumented("add")
     def add(self, value, when=None):
         """Records `value` in the bucket containing time `when` (default: now).
 
@@ -148,49 +439,248 @@ class Timeseries:
 
         Raises `ValueError` if `when` is older than the most recent sample.
         """
+        self._own()
         when = self.normalize(when or timezone.now())
         current_sample_time = self.end_time
         distance_in_samples = math.floor((when - current_sample_time) / self.resolution)
 
-        if len(self.data_points) == 0:
+        if len(self._data_points) == 0:
             # Special case: If there are no samples, `start_time` does not matter at all.
             distance_in_samples = 0
 
         if distance_in_samples < 0:
             raise ValueError(f"Sample would go back in time: from {self.end_time} to {when}")
         elif distance_in_samples == 0:
-            # Replace last value.
-            if len(self.data_points):
-                self.data_points[-1] = value
+            # Update the last bucket.
+            if len(self._data_points):
+                self._data_points[-1] = self._update_bucket(self._data_points[-1], value)
                 return self.RESULT_REPLACED
             else:
                 self.start_time = when
-                self.data_points = [value]
+                self._data_points = [self._start_bucket(value)]
                 return self.RESULT_SHIFTED
         elif distance_in_samples > self.max_points:
+            self._finalize_last_bucket()
             # Optimization: if extending the vector would bypass all samples, just truncate it
             # instead.
-            self.data_points = [value]
+            self._data_points = [self._start_bucket(value)]
             self.start_time = when
             return self.RESULT_TRUNCATED
         else:
+            self._finalize_last_bucket()
             # Extend the vector to add this sample.
             for _ in range(0, distance_in_samples):
-                self.data_points.append(None)
+                self._data_points.append(None)
             trim_samples = 0
-            if len(self.data_points) > self.max_points:
-                trim_samples = len(self.data_points) - self.max_points
-                self.data_points = self.data_points[trim_samples:]
+            if len(self._data_points) > self.max_points:
+                trim_samples = len(self._data_points) - self.max_points
+                self._data_points = self._data_points[trim_samples:]
                 self.start_time += trim_samples * self.resolution
-            self.data_points[-1] = value
+            self._data_points[-1] = self._start_bucket(value)
             return self.RESULT_SHIFTED if trim_samples else self.RESULT_ADDED
 
+    def _finalize_last_bucket(self):
+        if self._data_points[-1] is not None:
+            self.finalized_buckets.append((self.end_time, self._data_points[-1]))
+
+    def _start_bucket(self, value):
+        # The value of a bucket whose first sample is `value`.
+        return value
+
+    def _update_bucket(self, current, value):
+        # The value of a bucket holding `current`, after another sample `value`.
+        return value
+
+    def trim(self, when=None):
+        """Drops buckets that have left the window ending at time `when` (default: now).
+
+        This is what `add` would drop if a sample were recorded at `when`, without
+        recording one. If every bucket is dropped, the series is left empty, with
+        `start_time` just past its former last bucket.
+
+        Returns the number of buckets dropped.
+        """
+        window_start = (
+            self.normalize(when or timezone.now()) - (self.max_points - 1) * self.resolution
+        )
+        if not self._data_points or self.start_time >= window_start:
+            return 0
+        trim_samples = min(
+            math.ceil((window_start - self.start_time) / self.resolution), len(self._data_points)
+        )
+        self.data_points = self._data_points[trim_samples:]
+        self.start_time += trim_samples * self.resolution
+        return trim_samples
+
+    def resample(self, resolution_seconds=None, max_points=None):
+        """Returns a copy of this series re-bucketed to a new resolution and/or size.
+
+        Every recorded value is replayed into the new buckets through `add`, so
+        when several old buckets fall into one new bucket the latest value wins,
+        and the oldest values are dropped if the result exceeds `max_points`.
+        Arguments left as `None` keep this series' setting.
+        """
+        ret = type(self)(
+            start_time=self.start_time,
+            max_points=self.max_points if max_points is None else max_points,
+            resolution_seconds=(
+                int(self.resolution.total_seconds())
+                if resolution_seconds is None
+                else resolution_seconds
+            ),
+        )
+        for ts, v in self.iter_points():
+            if v is not None:
+                ret.add(v, when=ts)
+        return ret
+
     def iter_points(self):
         """Yields `(datetime, value)` tuples, one per bucket; gaps have value `None`."""
-        for i, v in enumerate(self.data_points):
+        for i, v in enumerate(self._data_points):
             ts = self.start_time + (i * self.resolution)
             yield (ts, v)
 
+    def rolling(self, window, min_periods=1):
+        """Returns moving-window aggregates over the last `window` buckets.
+
+        `series.rolling(12).mean()` is the moving average of `series`, as a new
+        series with the same buckets; `sum()`, `min()` and `max()` are also
+        available. Gaps are skipped, and a bucket whose window holds fewer than
+        `min_periods` values is a gap in the result. Each aggregate takes a
+        single pass over the series, however large `window` is.
+        """
+        return rolling.Rolling(self, window, min_periods)
+
+    def ewm(self, alpha):
+        """Returns the exponentially weighted moving average, as a new series.
+
+        Each value is `alpha * value + (1 - alpha) * previous_average`, with `alpha`
+        in `(0, 1]`. Gaps are gaps in the result, and the previous average decays
+        by `1 - alpha` for each bucket it spans, so a value after a gap weighs more.
+        """
+        return rolling.ewm(self, alpha)
+
+    def align(self, other):
+        """Returns copies of this series and `other` covering the same buckets.
+
+        Both copies span from the earlier start to the later end of the two
+        series, padded with gaps, so that their values can be combined index by
+        index. An empty series is all gaps. The copies retain `max_points` of the
+        larger series, or more if their span is longer.
+
+        Raises `ValueError` if the series have different resolutions, or buckets
+        that don't line up.
+        """
+        if self.resolution != other.resolution:
+            raise ValueError(
+                f"Cannot align series of resolutions {self.resolution} and {other.resolution}"
+            )
+        present = [series for series in (self, other) if series.data_points]
+        start = min((series.start_time for series in present), default=self.start_time)
+        end = max((series.end_time for series in present), default=self.start_time)
+        length = (end - start) // self.resolution + 1 if present else 0
+        aligned = []
+        for series in (self, other):
+            before, misalignment = divmod(series.start_time - start, self.resolution)
+            if series.data_points and misalignment:
+                raise ValueError(
+                    f"Buckets starting at {series.start_time} don't line up with {start}"
+                )
+            if not series.data_points:
+                before = length
+            aligned.append(
+                Timeseries(
+                    start_time=start,
+                    data_points=[
+                        *[None] * before,
+                        *series.data_points,
+                        *[None] * (length - before - len(series.data_points)),
+                    ],
+                    max_points=max(self.max_points, other.max_points, length),
+                    resolution_seconds=int(self.resolution.total_seconds()),
+                )
+            )
+        return tuple(aligned)
+
+    def _combine(self, other, op):
+        # Applies `op` to each value and `other`: a number, or the aligned value of
+        # another series. A gap on either side is a gap in the result.
+        if isinstance(other, Timeseries):
+            if self.KIND is not None or other.KIND is not None:
+                raise TypeError("Convert bucket summaries with to_timeseries() first")
+            ret, other = self.align(other)
+            ret.data_points = [
+                None if v is None or w is None else op(v, w)
+                for v, w in zip(ret.data_points, other.data_points, strict=True)
+            ]
+            return ret
+        if not isinstance(other, numbers.Number):
+            return NotImplemented
+        if self.KIND is not None:
+            raise TypeError("Convert bucket summaries with to_timeseries() first")
+        return Timeseries(
+            start_time=self.start_time,
+            data_points=[None if v is None else op(v, other) for v in self._data_points],
+            max_points=self.max_points,
+            resolution_seconds=int(self.resolution.total_seconds()),
+        )
+
+    def __add__(self, other):
+        """Element-wise arithmetic, with a number or another series, as a new series.
+
+        `voltage * current` multiplies the values of each bucket the two series
+        share, after `align()`-ing them; buckets that either series lacks are
+        gaps. `+`, `-`, `*` and `/` are supported, and a number applies to every
+        value. Dividing by zero gives a gap.
+        """
+        return self._combine(other, operator.add)
+
+    def __radd__(self, other):
+        return self._combine(other, operator.add)
+
+    def __sub__(self, other):
+        return self._combine(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._combine(other, lambda v, w: w - v)
+
+    def __mul__(self, other):
+        return self._combine(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._combine(other, operator.mul)
+
+    def __truediv__(self, other):
+        return self._combine(other, lambda v, w: None if w == 0 else v / w)
+
+    def __rtruediv__(self, other):
+        return self._combine(other, lambda v, w: None if v == 0 else w / v)
+
+    def stats(self):
+        """Returns a dict with the `count`, `min`, `max` and `mean` of the recorded values.
+
+        Gaps are ignored. `min`, `max` and `mean` are `None` when there are no values.
+        """
+        count = 0
+        total = 0
+        minval = None
+        maxval = None
+        for v in self._data_points:
+            if v is None:
+                continue
+            count += 1
+            total += v
+            if minval is None or v < minval:
+                minval = v
+            if maxval is None or v > maxval:
+                maxval = v
+        return {
+            "count": count,
+            "min": minval,
+            "max": maxval,
+            "mean": total / count if count else None,
+        }
+
     def get_normalized_points(self):
         """Returns `(minval, maxval, points)`, with values rescaled to the range 0-1.
 
@@ -226,3 +716,404 @@ class Timeseries:
             ret.append((ts, normv))
 
         return minval, maxval, ret
+
+
+class AggregatingTimeseries(Timeseries):
+    """A `Timeseries` summarizing every sample recorded in each bucket.
+
+    Where `Timeseries.add` keeps the latest sample of a bucket, this keeps a
+    `[count, sum, min, max]` accumulator of all of them, updated in constant time
+    per sample, so the mean and peaks of high-frequency metrics are summarized as
+    they are recorded. Gaps are `None`, as in a `Timeseries`.
+
+    `data_points` holds the accumulators. `to_timeseries()` extracts one statistic
+    as a plain `Timeseries`, for the methods that need numbers, such as
+    `rolling()` and `to_bytes()`. `resample()` merges the accumulators of buckets
+    that fall into the same new bucket.
+    """
+
+    KIND = "aggregate"
+    STATISTICS = ("count", "sum", "min", "max", "mean")
+
+    @classmethod
+    def from_object(cls, o):
+        if isinstance(o, dict) and o.get(cls.KEY_KIND) != cls.KIND:
+            raise ValueError(f"Not an aggregating series: {cls.KEY_KIND}={o.get(cls.KEY_KIND)!r}")
+        ret = super().from_object(o)
+        for accumulator in ret.data_points:
+            if accumulator is not None and not (
+                isinstance(accumulator, list) and len(accumulator) == 4
+            ):
+                raise ValueError(f"Invalid bucket accumulator: {accumulator!r}")
+        return ret
+
+    def to_object(self):
+        return {**super().to_object(), self.KEY_KIND: self.KIND}
+
+    def _start_bucket(self, value):
+        if value is None:
+            return None
+        if isinstance(value, list):
+            # An accumulator, replayed by `resample`.
+            return list(value)
+        return [1, value, value, value]
+
+    def _update_bucket(self, current, value):
+        value = self._start_bucket(value)
+        if current is None:
+            return value
+        if value is None:
+            return current
+        count, total, low, high = current
+        return [count + value[0], total + value[1], min(low, value[2]), max(high, value[3])]
+
+    def to_timeseries(self, statistic="mean"):
+        """Returns one statistic of each bucket, as a new `Timeseries`.
+
+        `statistic` is one of `count`, `sum`, `min`, `max` and `mean`.
+        """
+        if statistic not in self.STATISTICS:
+            raise ValueError(f"Unknown statistic {statistic!r}; expected one of {self.STATISTICS}")
+        if statistic == "mean":
+            values = [None if a is None else a[1] / a[0] for a in self.data_points]
+        else:
+            index = self.STATISTICS.index(statistic)
+            values = [None if a is None else a[index] for a in self.data_points]
+        return Timeseries(
+            start_time=self.start_time,
+            data_points=values,
+            max_points=self.max_points,
+            resolution_seconds=int(self.resolution.total_seconds()),
+        )
+
+    def stats(self):
+        """Returns the `count`, `min`, `max` and `mean` of every sample recorded."""
+        count = 0
+        total = 0
+        for accumulator in self.data_points:
+            if accumulator is not None:
+                count += accumulator[0]
+                total += accumulator[1]
+        return {
+            "count": count,
+            "min": self.to_timeseries("min").stats()["min"],
+            "max": self.to_timeseries("max").stats()["max"],
+            "mean": total / count if count else None,
+        }
+
+    def get_normalized_points(self):
+        """As `Timeseries.get_normalized_points`, for the mean of each bucket."""
+        return self.to_timeseries("mean").get_normalized_points()
+
+
+class QuantileTimeseries(Timeseries):
+    """A `Timeseries` keeping a quantile sketch of the samples recorded in each bucket.
+
+    Each bucket holds a `QuantileSketch` of all its samples, so percentiles such
+    as p99 latency can be read for any bucket, window of buckets, or group of
+    series, within `relative_accuracy` of the exact value, without keeping the
+    samples. A bucket's sketch has a bounded size however many samples it
+    records, and the sketches of several buckets or series merge exactly:
+
+    ```py
+    latency = QuantileTimeseries(resolution_seconds=60)
+    latency.add(0.120)
+    latency.quantile(0.99, start=one_hour_ago)
+    merged(s.sketch() for s in all_latencies).quantile(0.99)
+    ```
+
+    `to_timeseries()` extracts one quantile or statistic of each bucket as a
+    plain `Timeseries`. `resample()` merges the sketches of buckets that fall into
+    the same new bucket.
+
+    Arguments:
+        relative_accuracy: The relative error of quantiles, in `(0, 1)`.
+        Others: As for `Timeseries`.
+    """
+
+    KIND = "quantile"
+    KEY_RELATIVE_ACCURACY = "acc"
+    STATISTICS = ("count", "sum", "min", "max", "mean")
+
+    def __init__(self, *args, relative_accuracy=0.01, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.relative_accuracy = relative_accuracy
+
+    @classmethod
+    def from_object(cls, o):
+        if isinstance(o, dict) and o.get(cls.KEY_KIND) != cls.KIND:
+            raise ValueError(f"Not a quantile series: {cls.KEY_KIND}={o.get(cls.KEY_KIND)!r}")
+        ret = super().from_object(o)
+        relative_accuracy = o.get(cls.KEY_RELATIVE_ACCURACY)
+        if not isinstance(relative_accuracy, float):
+            raise ValueError(f"Invalid relative accuracy: {relative_accuracy!r}")
+        ret.relative_accuracy = relative_accuracy
+        ret.data_points = [
+            None if sketch is None else QuantileSketch.from_object(sketch, relative_accuracy)
+            for sketch in ret.data_points
+        ]
+        return ret
+
+    def to_object(self):
+        return {
+            **super().to_object(),
+            self.KEY_DATA_POINTS: [
+                None if sketch is None else sketch.to_object() for sketch in self.data_points
+            ],
+            self.KEY_KIND: self.KIND,
+            self.KEY_RELATIVE_ACCURACY: self.relative_accuracy,
+        }
+
+    def _copy_values(self):
+        # Sketches change in place, so a copy of the series needs its own.
+        return [None if sketch is None else sketch.copy() for sketch in self._data_points]
+
+    def _start_bucket(self, value):
+        if value is None:
+            return None
+        if isinstance(value, QuantileSketch):
+            # A sketch, replayed by `resample`.
+            return value.copy()
+        ret = QuantileSketch(self.relative_accuracy)
+        ret.add(value)
+        return ret
+
+    def _update_bucket(self, current, value):
+        if current is None:
+            return self._start_bucket(value)
+        if isinstance(value, QuantileSketch):
+            current.merge(value)
+        elif value is not None:
+            current.add(value)
+        return current
+
+    def resample(self, resolution_seconds=None, max_points=None):
+        ret = super().resample(resolution_seconds, max_points)
+        ret.relative_accuracy = self.relative_accuracy
+        return ret
+
+    def sketch(self, start=None, end=None):
+        """Returns a new sketch of the samples recorded from `start` to before `end`.
+
+        `start` and `end` are datetimes, and default to the whole series.
+        """
+        return merged(
+            (
+                sketch
+                for ts, sketch in self.iter_points()
+                if sketch is not None
+                and (start is None or ts >= self.normalize(start))
+                and (end is None or ts < end)
+            ),
+            self.relative_accuracy,
+        )
+
+    def quantile(self, q, start=None, end=None):
+        """Returns quantile `q` of the samples recorded from `start` to before `end`.
+
+        `q` is in `[0, 1]`: 0.99 is the 99th percentile. Returns `None` if there are
+        no samples in the window.
+        """
+        return self.sketch(start, end).quantile(q)
+
+    def to_timeseries(self, statistic=0.5):
+        """Returns one statistic of each bucket, as a new `Timeseries`.
+
+        `statistic` is a quantile in `[0, 1]`, or one of `count`, `sum`, `min`,
+        `max` and `mean`.
+        """
+        if isinstance(statistic, str):
+            if statistic not in self.STATISTICS:
+                raise ValueError(
+                    f"Unknown statistic {statistic!r}; expected a quantile or one of "
+                    f"{self.STATISTICS}"
+                )
+            values = [
+                None if sketch is None else getattr(sketch, statistic)
+                for sketch in self.data_points
+            ]
+        else:
+            values = [
+                None if sketch is None else sketch.quantile(statistic)
+                for sketch in self.data_points
+            ]
+        return Timeseries(
+            start_time=self.start_time,
+            data_points=values,
+            max_points=self.max_points,
+            resolution_seconds=int(self.resolution.total_seconds()),
+        )
+
+    def stats(self):
+        """Returns the `count`, `min`, `max` and `mean` of every sample recorded."""
+        sketch = self.sketch()
+        return {"count": sketch.count, "min": sketch.min, "max": sketch.max, "mean": sketch.mean}
+
+    def get_normalized_points(self):
+        """As `Timeseries.get_normalized_points`, for the mean of each bucket."""
+        return self.to_timeseries("mean").get_normalized_points()
+
+
+class MultiTimeseries:
+    """Several aligned series ("channels") sharing one timeline.
+
+    Values are stored as one vector per channel, all covering the same buckets of
+    a single `start_time`, `resolution_seconds` and `max_points`, so recording a
+    sample of every channel does the bucket arithmetic once. It behaves like a
+    `Timeseries` whose values are dicts of channel values:
+
+    ```py
+    readings = MultiTimeseries(["temperature", "humidity"], resolution_seconds=60)
+    readings.add({"temperature": 21.5, "humidity": 0.4})
+    readings.channel("temperature")  # A `Timeseries` of the temperature values.
+    ```
+
+    Arguments:
+        channels: The names of the channels.
+        start_time: The datetime of the first bucket. Defaults to the current time.
+        data_points: Initial `{channel: values}` dict, holding a vector of the same
+            length for every channel. Defaults to an empty series.
+        max_points: Maximum number of buckets to retain.
+        resolution_seconds: The width of each bucket, in seconds.
+    """
+
+    VERSION = 1
+
+    KEY_VERSION = "v"
+    KEY_START_TIME = "start"
+    KEY_RESOLUTION_SECONDS = "res"
+    KEY_MAX_POINTS = "max"
+    KEY_CHANNELS = "channels"
+
+    def __init__(
+        self,
+        channels,
+        start_time=None,
+        data_points=None,
+        max_points=20 * 24,
+        resolution_seconds=300,
+    ):
+        self.channels = tuple(channels)
+        if not self.channels:
+            raise ValueError("A MultiTimeseries needs at least one channel")
+        if data_points is None:
+            data_points = {channel: [] for channel in self.channels}
+        if set(data_points) != set(self.channels):
+            raise ValueError(
+                f"Expected values for channels {self.channels}, got {list(data_points)}"
+            )
+        if len({len(values) for values in data_points.values()}) > 1:
+            raise ValueError("Every channel must hold the same number of values")
+        self.start_time = start_time or timezone.now()
+        self.data_points = data_points
+        self.max_points = max_points
+        self.resolution = datetime.timedelta(seconds=resolution_seconds)
+
+    def __len__(self):
+        return len(self.data_points[self.channels[0]])
+
+    def __getitem__(self, idx):
+        return {channel: values[idx] for channel, values in self.data_points.items()}
+
+    def __eq__(self, other):
+        if not isinstance(other, MultiTimeseries):
+            return False
+        return self.to_object() == other.to_object()
+
+    @classmethod
+    def from_object(cls, o):
+        """Builds a `MultiTimeseries` from a dict previously produced by `to_object`.
+
+        Raises `ValueError` if the object is not a supported serialized form.
+        """
+        if not isinstance(o, dict):
+            raise ValueError(f"Expected a dict, got {type(o).__name__}")
+        object_version = o.get(cls.KEY_VERSION)
+        if object_version != cls.VERSION:
+            raise ValueError(f"Unsupported object version: {repr(object_version)}")
+        try:
+            channels = o[cls.KEY_CHANNELS]
+            if not isinstance(channels, dict):
+                raise ValueError(f"Expected a dict of channels, got {type(channels).__name__}")
+            return cls(
+                channels=list(channels),
+                start_time=parse_isodate(o[cls.KEY_START_TIME]),
+                data_points=channels,
+                max_points=o[cls.KEY_MAX_POINTS],
+                resolution_seconds=o[cls.KEY_RESOLUTION_SECONDS],
+            )
+        except KeyError as e:
+            raise ValueError(f"Missing key: {e}") from e
+
+    def normalize(self, dt):
+        """Rounds `dt` down to the start of its bucket, as `Timeseries.normalize` does."""
+        return Timeseries.normalize(self, dt)
+
+    @property
+    def end_time(self):
+        """Returns the datetime of the last bucket."""
+        return self.start_time + self.resolution * max(len(self) - 1, 0)
+
+    def to_object(self):
+        """Returns this series as a plain, JSON-serializable dict."""
+        return {
+            self.KEY_VERSION: self.VERSION,
+            self.KEY_START_TIME: self.start_time.isoformat(timespec="seconds"),
+            self.KEY_CHANNELS: self.data_points,
+            self.KEY_MAX_POINTS: self.max_points,
+            self.KEY_RESOLUTION_SECONDS: int(self.resolution.total_seconds()),
+        }
+
+    def add(self, values, when=None):
+        """Records a `{channel: value}` dict in the bucket containing time `when`.
+
+        This moves the timeline as `Timeseries.add` does, once for every channel.
+        Channels missing from `values` record a gap, or keep their value if the
+        sample falls in the latest bucket.
+
+        Returns one of the `Timeseries.RESULT_*` values, describing what happened.
+
+        Raises `ValueError` if `values` names an unknown channel, or if `when` is
+        older than the most recent sample.
+        """
+        unknown = set(values) - set(self.channels)
+        if unknown:
+            raise ValueError(f"Unknown channels: {sorted(unknown)}")
+        when = self.normalize(when or timezone.now())
+        count = len(self)
+        distance_in_samples = math.floor((when - self.end_time) / self.resolution) if count else 0
+
+        if distance_in_samples < 0:
+            raise ValueError(f"Sample would go back in time: from {self.end_time} to {when}")
+        elif count and distance_in_samples == 0:
+            for channel, value in values.items():
+                self.data_points[channel][-1] = value
+            return Timeseries.RESULT_REPLACED
+        elif not count or distance_in_samples > self.max_points:
+            self.start_time = when
+            self.data_points = {channel: [values.get(channel)] for channel in self.channels}
+            return Timeseries.RESULT_TRUNCATED if count else Timeseries.RESULT_SHIFTED
+
+        trim_samples = max(count + distance_in_samples - self.max_points, 0)
+        for channel in self.channels:
+            series = self.data_points[channel]
+            series.extend([None] * (distance_in_samples - 1))
+            series.append(values.get(channel))
+            if trim_samples:
+                del series[:trim_samples]
+        self.start_time += trim_samples * self.resolution
+        return Timeseries.RESULT_SHIFTED if trim_samples else Timeseries.RESULT_ADDED
+
+    def iter_points(self):
+        """Yields `(datetime, {channel: value})` tuples, one per bucket."""
+        for i in range(len(self)):
+            yield (self.start_time + i * self.resolution, self[i])
+
+    def channel(self, name):
+        """Returns a copy of one channel's values, as a `Timeseries`."""
+        return Timeseries(
+            start_time=self.start_time,
+            data_points=list(self.data_points[name]),
+            max_points=self.max_points,
+            resolution_seconds=int(self.resolution.total_seconds()),
+        )
@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib import admin
 
+from django_simple_timeseries.admin import SparklineAdminMixin, SparklineColumn
+
 from . import models
 
 
@@ -17,3 +19,8 @@ class BasicModelForm(forms.ModelForm):
 @admin.register(models.BasicModel)
 class BasicModelFormAdmin(admin.ModelAdmin):
     form = BasicModelForm
+
+
+@admin.register(models.BinaryModel)
+class BinaryModelAdmin(SparklineAdminMixin, admin.ModelAdmin):
+    list_display = ["pk", SparklineColumn("ts"), SparklineColumn("legacy", points=2)]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+import django_simple_timeseries.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tests", "0002_chunkedmodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BinaryModel",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ts",
+                    django_simple_timeseries.models.BinaryTimeseriesField(
+                        max_points=3, resolution_seconds=5
+                    ),
+                ),
+                (
+                    "legacy",
+                    django_simple_timeseries.models.TimeseriesField(
+                        max_points=3, resolution_seconds=5
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+import django_simple_timeseries.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tests", "0003_binarymodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryModel",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("latest", models.FloatField(db_index=True, null=True)),
+                (
+                    "ts",
+                    django_simple_timeseries.models.TimeseriesField(
+                        last_time_field="latest_time",
+                        last_value_field="latest",
+                        max_field="high",
+                        max_points=3,
+                        min_field="low",
+                        resolution_seconds=5,
+                    ),
+                ),
+                ("latest_time", models.DateTimeField(null=True)),
+                ("low", models.FloatField(null=True)),
+                ("high", models.FloatField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+import django_simple_timeseries.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tests", "0004_summarymodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MultiModel",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "readings",
+                    django_simple_timeseries.models.MultiTimeseriesField(
+                        channels=["temperature", "humidity"],
+                        max_points=3,
+                        resolution_seconds=5,
+                    ),
+                ),
+            ],
+        ),
+    ]
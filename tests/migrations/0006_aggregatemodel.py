@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:17
+
+from django.db import migrations, models
+
+import django_simple_timeseries.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tests", "0005_multimodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AggregateModel",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ts",
+                    django_simple_timeseries.models.TimeseriesField(
+                        aggregate=True,
+                        last_value_field="latest",
+                        max_field="peak",
+                        max_points=3,
+                        resolution_seconds=5,
+                    ),
+                ),
+                ("latest", models.FloatField(null=True)),
+                ("peak", models.FloatField(null=True)),
+            ],
+        ),
+    ]
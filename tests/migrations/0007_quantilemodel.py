@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:21
+
+from django.db import migrations, models
+
+import django_simple_timeseries.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tests", "0006_aggregatemodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuantileModel",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "ts",
+                    django_simple_timeseries.models.TimeseriesField(
+                        max_field="peak",
+                        max_points=3,
+                        quantiles=True,
+                        resolution_seconds=5,
+                    ),
+                ),
+                ("peak", models.FloatField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import django_simple_timeseries.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0007_quantilemodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShardedModel",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ShardedModelShard",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shard", models.PositiveSmallIntegerField()),
+                (
+                    "series",
+                    django_simple_timeseries.models.TimeseriesField(
+                        default=django_simple_timeseries.models.TimeseriesField.new_default_timeseries,
+                        max_points=1440,
+                        resolution_seconds=60,
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="request_shards",
+                        to="tests.shardedmodel",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("owner", "shard")},
+            },
+        ),
+    ]
@@ -1,8 +1,82 @@
 from django.db import models
 
-from django_simple_timeseries.models import TimeseriesField
+from django_simple_timeseries.chunked import AbstractTimeseriesChunk, ChunkedTimeseriesField
+from django_simple_timeseries.models import (
+    BinaryTimeseriesField,
+    MultiTimeseriesField,
+    TimeseriesField,
+)
+from django_simple_timeseries.sharded import AbstractTimeseriesShard, ShardedTimeseriesField
 
 
 class BasicModel(models.Model):
     ts1 = TimeseriesField()
     ts2 = TimeseriesField(max_points=3, resolution_seconds=5)
+
+
+class ChunkedModel(models.Model):
+    ts = ChunkedTimeseriesField("ts_chunks", max_points=6, resolution_seconds=5, chunk_points=3)
+
+
+class ChunkedModelChunk(AbstractTimeseriesChunk):
+    owner = models.ForeignKey(ChunkedModel, on_delete=models.CASCADE, related_name="ts_chunks")
+
+    class Meta:
+        unique_together = [("owner", "chunk")]
+
+
+class BinaryModel(models.Model):
+    ts = BinaryTimeseriesField(max_points=3, resolution_seconds=5)
+    legacy = TimeseriesField(max_points=3, resolution_seconds=5)
+
+
+class SummaryModel(models.Model):
+    # Declared before the series, whose summaries must still be current when saved.
+    latest = models.FloatField(null=True, db_index=True)
+    ts = TimeseriesField(
+        max_points=3,
+        resolution_seconds=5,
+        last_value_field="latest",
+        last_time_field="latest_time",
+        min_field="low",
+        max_field="high",
+    )
+    latest_time = models.DateTimeField(null=True)
+    low = models.FloatField(null=True)
+    high = models.FloatField(null=True)
+
+
+class MultiModel(models.Model):
+    readings = MultiTimeseriesField(
+        channels=["temperature", "humidity"], max_points=3, resolution_seconds=5
+    )
+
+
+class AggregateModel(models.Model):
+    ts = TimeseriesField(
+        aggregate=True,
+        max_points=3,
+        resolution_seconds=5,
+        last_value_field="latest",
+        max_field="peak",
+    )
+    latest = models.FloatField(null=True)
+    peak = models.FloatField(null=True)
+
+
+class QuantileModel(models.Model):
+    ts = TimeseriesField(quantiles=True, max_points=3, resolution_seconds=5, max_field="peak")
+    peak = models.FloatField(null=True)
+
+
+class ShardedModel(models.Model):
+    requests = ShardedTimeseriesField(
+        "request_shards", shards=4, max_points=3, resolution_seconds=5
+    )
+
+
+class ShardedModelShard(AbstractTimeseriesShard):
+    owner = models.ForeignKey(ShardedModel, on_delete=models.CASCADE, related_name="request_shards")
+
+    class Meta:
+        unique_together = [("owner", "shard")]
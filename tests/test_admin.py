@@ -0,0 +1,64 @@
+from datetime import UTC, datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from django_simple_timeseries.admin import SparklineColumn, decimate, render_sparkline
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import BinaryModel
+
+
+class SparklineTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def series(self, *values):
+        return Timeseries(start_time=self.now, data_points=list(values), resolution_seconds=5)
+
+    def test_decimate(self):
+        self.assertEqual([1, None, 3], decimate([1, None, 3], 5))
+        self.assertEqual([1.5, None, 5.0], decimate([1, 2, None, None, 4, 6], 3))
+
+    def test_render_sparkline(self):
+        svg = render_sparkline(self.series(1.0, 3.0, None, 2.0), width=30, height=10)
+        self.assertIn('points="0.0,10.0 10.0,0.0"', svg)
+        self.assertIn('points="30.0,5.0"', svg)
+        self.assertNotIn("polyline", render_sparkline(self.series()))
+        self.assertIn('points="0.0,12.0"', render_sparkline(self.series(4)))
+
+    def test_column_without_batch(self):
+        o = BinaryModel(ts=self.series(1.0, 2.0))
+        self.assertEqual(render_sparkline(o.ts), SparklineColumn("ts")(o))
+
+    def changelist(self):
+        response = self.client.get("/admin/tests/binarymodel/")
+        self.assertEqual(200, response.status_code)
+        return response.content.decode()
+
+    def test_changelist(self):
+        User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.login(username="admin", password="password")
+        o = BinaryModel.objects.create(ts=self.series(1.0, 2.0), legacy=self.series(5.0))
+        with self.assertNumQueries(6):
+            # Session, user, count, filtered count, page, and the page's series.
+            html = self.changelist()
+        self.assertIn(str(render_sparkline(o.ts)), html)
+        self.assertIn(str(render_sparkline(o.legacy, points=2)), html)
+
+        for _ in range(4):
+            BinaryModel.objects.create(ts=self.series(3.0, 1.0, 4.0))
+        with mock.patch.object(Timeseries, "from_bytes", wraps=Timeseries.from_bytes) as decode:
+            with self.assertNumQueries(6):
+                html = self.changelist()
+        # Only the new series are decoded; one render serves the four identical ones.
+        self.assertEqual(1, decode.call_count)
+        self.assertEqual(4, html.count(str(render_sparkline(self.series(3.0, 1.0, 4.0)))))
+
+        o.ts = self.series(2.0, 1.0)
+        o.save()
+        self.assertIn(str(render_sparkline(o.ts)), self.changelist())
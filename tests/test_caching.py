@@ -0,0 +1,106 @@
+import io
+from datetime import UTC, datetime, timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from django_simple_timeseries.caching import TimeseriesCache
+from django_simple_timeseries.concurrency import add_and_save
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import BasicModel
+
+
+class TimeseriesCacheTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.cache = TimeseriesCache(BasicModel, "ts2")
+        self.addCleanup(self.cache.disconnect)
+        self.obj = BasicModel.objects.create()
+
+    def series(self, *values):
+        return Timeseries(
+            start_time=self.now, data_points=list(values), max_points=3, resolution_seconds=5
+        )
+
+    def test_read_through(self):
+        self.obj.ts2 = self.series(1.0)
+        BasicModel.objects.filter(pk=self.obj.pk).update(ts2=self.obj.ts2)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.obj.ts2, self.cache.get(self.obj.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.obj.ts2, self.cache.get(self.obj.pk))
+        with self.assertRaises(BasicModel.DoesNotExist):
+            self.cache.get(self.obj.pk + 1)
+
+    def test_get_many(self):
+        other = BasicModel.objects.create(ts2=self.series(2.0))
+        self.cache.get(self.obj.pk)
+        with self.assertNumQueries(1):
+            series = self.cache.get_many([self.obj.pk, other.pk, other.pk + 1])
+        self.assertEqual({self.obj.pk, other.pk}, set(series))
+        self.assertEqual(other.ts2, series[other.pk])
+
+    def test_write_through_on_commit(self):
+        self.cache.get(self.obj.pk)
+        self.obj.ts2 = self.series(1.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.obj.save()
+            # Changed after saving, so not what the cache should hold.
+            self.obj.ts2.add(2.0, when=self.now + timedelta(seconds=5))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.series(1.0), self.cache.get(self.obj.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BasicModel.objects.get(pk=self.obj.pk).save(update_fields=["ts1"])
+        with self.assertNumQueries(0):
+            self.cache.get(self.obj.pk)
+
+    def test_delete_invalidates(self):
+        self.cache.get(self.obj.pk)
+        pk = self.obj.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.obj.delete()
+        with self.assertRaises(BasicModel.DoesNotExist):
+            self.cache.get(pk)
+
+    def test_add_and_save(self):
+        stale = BasicModel.objects.get(pk=self.obj.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            add_and_save(self.obj, "ts2", 1.0, when=self.now)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.series(1.0), self.cache.get(self.obj.pk))
+
+        # A conflicting writer drops the row from the cache until its write commits.
+        with self.captureOnCommitCallbacks() as callbacks:
+            add_and_save(stale, "ts2", 2.0, when=self.now + timedelta(seconds=5))
+        self.assertIsNone(cache.get(self.cache.key(self.obj.pk)))
+        for callback in callbacks:
+            callback()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.series(1.0, 2.0), self.cache.get(self.obj.pk))
+
+    def test_compact_invalidates(self):
+        self.obj.ts2 = self.series(1.0)
+        self.obj.save()
+        self.cache.get(self.obj.pk)
+        call_command("compact_timeseries", "tests.BasicModel", "--field=ts2", stdout=io.StringIO())
+        self.obj.refresh_from_db()
+        self.assertEqual([], self.obj.ts2.data_points)
+        self.assertEqual(self.obj.ts2, self.cache.get(self.obj.pk))
+
+    def test_unpackable_series(self):
+        self.obj.ts2 = self.series("on")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.obj.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(["on"], self.cache.get(self.obj.pk).data_points)
+        with self.assertNumQueries(1):
+            self.cache.get(self.obj.pk)
+
+    def test_not_a_timeseries_field(self):
+        with self.assertRaises(ValueError):
+            TimeseriesCache(BasicModel, "id")
@@ -0,0 +1,102 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import ChunkedModel, ChunkedModelChunk
+
+
+class ChunkedTimeseriesTests(TestCase):
+    def setUp(self):
+        # Bucket 0 of a chunk: 2021-04-03T00:00:00 is a multiple of 5 * 3 seconds.
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.obj = ChunkedModel.objects.create()
+
+    def at(self, bucket):
+        return self.now + timedelta(seconds=5 * bucket)
+
+    def test_empty(self):
+        series = self.obj.ts.to_timeseries()
+        self.assertEqual([], series.data_points)
+        self.assertEqual(6, series.max_points)
+        self.assertEqual(5, series.resolution.seconds)
+
+    def test_add_and_read(self):
+        ts = self.obj.ts
+        self.assertEqual(Timeseries.RESULT_SHIFTED, ts.add(1.0, when=self.at(0)))
+        self.assertEqual(Timeseries.RESULT_REPLACED, ts.add(1.5, when=self.at(0)))
+        self.assertEqual(Timeseries.RESULT_ADDED, ts.add(2.0, when=self.at(1)))
+        self.assertEqual(Timeseries.RESULT_ADDED, ts.add(4.0, when=self.at(3)))
+        self.assertEqual(2, ChunkedModelChunk.objects.filter(owner=self.obj).count())
+
+        series = ts.to_timeseries()
+        self.assertEqual(self.at(0), series.start_time)
+        self.assertEqual([1.5, 2.0, None, 4.0], series.data_points)
+        self.assertEqual(
+            [(self.at(0), 1.5), (self.at(1), 2.0), (self.at(2), None), (self.at(3), 4.0)],
+            list(ts.iter_points()),
+        )
+
+    def test_old_chunks_are_dropped(self):
+        ts = self.obj.ts
+        for bucket in range(6):
+            ts.add(float(bucket), when=self.at(bucket))
+        self.assertEqual(Timeseries.RESULT_SHIFTED, ts.add(9.0, when=self.at(9)))
+        # Buckets 0-2 (the first chunk) are all outside the window of buckets 4-9.
+        first_chunk = int(self.now.timestamp()) // 5 // 3
+        self.assertEqual(
+            [first_chunk + 1, first_chunk + 3],
+            sorted(self.obj.ts_chunks.values_list("chunk", flat=True)),
+        )
+        series = ts.to_timeseries()
+        self.assertEqual(self.at(4), series.start_time)
+        self.assertEqual([4.0, 5.0, None, None, None, 9.0], series.data_points)
+
+    def test_far_sample_truncates(self):
+        ts = self.obj.ts
+        ts.add(1.0, when=self.at(0))
+        self.assertEqual(Timeseries.RESULT_TRUNCATED, ts.add(2.0, when=self.at(30)))
+        self.assertEqual(1, self.obj.ts_chunks.count())
+        self.assertEqual([2.0], ts.to_timeseries().data_points)
+
+    def test_range_read(self):
+        ts = self.obj.ts
+        for bucket in range(6):
+            ts.add(float(bucket), when=self.at(bucket))
+        series = ts.to_timeseries(start=self.at(2), end=self.at(4))
+        self.assertEqual(self.at(2), series.start_time)
+        self.assertEqual([2.0, 3.0, 4.0], series.data_points)
+
+    def test_back_in_time(self):
+        ts = self.obj.ts
+        ts.add(1.0, when=self.at(4))
+        with self.assertRaises(ValueError):
+            ts.add(2.0, when=self.at(3))
+        with self.assertRaises(ValueError):
+            ts.add(2.0, when=self.at(1))
+        # The earlier chunk created for the rejected sample is rolled back.
+        self.assertEqual(1, self.obj.ts_chunks.count())
+
+    def test_concurrent_new_chunk(self):
+        """A writer that loses the race to create a chunk adds its sample to the winner's."""
+        ts = self.obj.ts
+        ts.add(1.0, when=self.at(0))
+        chunk = int(self.now.timestamp()) // 5 // 3 + 1
+        get = QuerySet.get
+        calls = []
+
+        def get_before_other_writer(queryset, *args, **kwargs):
+            # The first lookup misses, and another writer creates the chunk before ours.
+            calls.append(kwargs)
+            if len(calls) == 1:
+                ChunkedModelChunk.objects.create(owner=self.obj, chunk=chunk, data=[3.0])
+                raise ChunkedModelChunk.DoesNotExist
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "get", get_before_other_writer):
+            self.assertEqual(Timeseries.RESULT_ADDED, ts.add(4.0, when=self.at(4)))
+        self.assertEqual(2, len(calls))
+        self.assertEqual([1.0, None, None, 3.0, 4.0], ts.to_timeseries().data_points)
@@ -0,0 +1,176 @@
+import io
+from datetime import UTC, datetime, timedelta, timezone
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+from freezegun import freeze_time
+
+from django_simple_timeseries.expressions import (
+    ExpireSeries,
+    SeriesHasExpiredBuckets,
+    SeriesIsExpired,
+)
+from django_simple_timeseries.management.commands import compact_timeseries
+from django_simple_timeseries.management.commands.compact_timeseries import trim_batch
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import BasicModel, BinaryModel, SummaryModel
+
+
+class CompactTestMixin:
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+
+    def series(self, *offsets):
+        ts = Timeseries(max_points=3, resolution_seconds=5)
+        for offset in offsets:
+            ts.add(float(offset), when=self.now + timedelta(seconds=offset))
+        return ts
+
+
+class SeriesExpressionTests(CompactTestMixin, TestCase):
+    def test_staleness_matches_trim(self):
+        """The SQL conditions agree with what `Timeseries.trim` would do, at every offset."""
+        o = BasicModel.objects.create(ts2=self.series(0, 5))
+        BasicModel.objects.create(ts2=self.series())
+        for seconds in range(0, 30):
+            when = self.now + timedelta(seconds=seconds)
+            trimmed = self.series(0, 5)
+            dropped = trimmed.trim(when)
+            self.assertEqual(
+                [o.pk] if dropped else [],
+                list(
+                    BasicModel.objects.filter(SeriesHasExpiredBuckets(F("ts2"), when)).values_list(
+                        "pk", flat=True
+                    )
+                ),
+                msg=seconds,
+            )
+            self.assertEqual(
+                [o.pk] if dropped == 2 else [],
+                list(
+                    BasicModel.objects.filter(SeriesIsExpired(F("ts2"), when)).values_list(
+                        "pk", flat=True
+                    )
+                ),
+                msg=seconds,
+            )
+
+    def test_start_time_offset(self):
+        """Start times stored with a UTC offset other than +00:00 are read correctly."""
+        ts = self.series(0, 5)
+        ts.start_time = ts.start_time.astimezone(timezone(timedelta(hours=5, minutes=30)))
+        BasicModel.objects.create(ts2=ts)
+        self.assertFalse(
+            BasicModel.objects.filter(
+                SeriesIsExpired(F("ts2"), self.now + timedelta(seconds=19))
+            ).exists()
+        )
+        self.assertTrue(
+            BasicModel.objects.filter(
+                SeriesIsExpired(F("ts2"), self.now + timedelta(seconds=20))
+            ).exists()
+        )
+
+    def test_expire_series_matches_trim(self):
+        o = BasicModel.objects.create(ts2=self.series(0, 5))
+        BasicModel.objects.update(ts2=ExpireSeries(F("ts2")))
+        expected = self.series(0, 5)
+        expected.trim(self.now + timedelta(days=1))
+        o.refresh_from_db()
+        self.assertEqual(expected, o.ts2)
+        self.assertEqual(self.now + timedelta(seconds=10), o.ts2.start_time)
+
+
+@freeze_time("2021-04-03T00:00:20")
+class CompactTimeseriesCommandTests(CompactTestMixin, TestCase):
+    def test_compact(self):
+        expired = BasicModel.objects.create(ts2=self.series(0, 5))
+        stale = BasicModel.objects.create(ts2=self.series(0, 5, 10))
+        current = BasicModel.objects.create(ts2=self.series(10, 15, 20))
+        for use_expressions in (True, False):
+            for o, ts in ((expired, self.series(0, 5)), (stale, self.series(0, 5, 10))):
+                o.ts2 = ts
+                o.save()
+            args = [] if use_expressions else ["--no-database-expressions"]
+            out = io.StringIO()
+            call_command("compact_timeseries", "tests.BasicModel", "--field=ts2", *args, stdout=out)
+            if use_expressions:
+                self.assertIn(
+                    "emptied 1 expired series in the database, trimmed 1 series", out.getvalue()
+                )
+            else:
+                self.assertIn(
+                    "emptied 0 expired series in the database, trimmed 2 series", out.getvalue()
+                )
+
+            for o in (expired, stale, current):
+                o.refresh_from_db()
+            self.assertEqual([], expired.ts2.data_points)
+            self.assertEqual(self.now + timedelta(seconds=10), expired.ts2.start_time)
+            self.assertEqual([10.0], stale.ts2.data_points)
+            self.assertEqual(self.now + timedelta(seconds=10), stale.ts2.start_time)
+            self.assertEqual(self.series(10, 15, 20), current.ts2)
+
+    def test_binary_field(self):
+        ts = self.series(0, 5, 10)
+        o = BinaryModel.objects.create(ts=ts, legacy=ts)
+        call_command("compact_timeseries", "tests.BinaryModel", stdout=io.StringIO())
+        o.refresh_from_db()
+        self.assertEqual([10.0], o.ts.data_points)
+        self.assertEqual([10.0], o.legacy.data_points)
+
+    def test_updates_summaries(self):
+        expired = SummaryModel.objects.create(ts=self.series(0, 5))
+        stale = SummaryModel.objects.create(ts=self.series(0, 5, 10))
+        call_command("compact_timeseries", "tests.SummaryModel", stdout=io.StringIO())
+        expired.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual((None, None, None), (expired.latest, expired.low, expired.high))
+        self.assertEqual((10.0, 10.0, 10.0), (stale.latest, stale.low, stale.high))
+
+    def test_skips_series_written_while_compacting(self):
+        """A series written to between being loaded and saved is left as written."""
+        o = BasicModel.objects.create(ts2=self.series(0, 5, 10))
+
+        def trim_and_write(rows, when):
+            ret = trim_batch(rows, when)
+            BasicModel.objects.filter(pk=o.pk).update(ts2=self.series(0, 5, 10, 15))
+            return ret
+
+        out = io.StringIO()
+        with mock.patch.object(compact_timeseries, "trim_batch", trim_and_write):
+            call_command(
+                "compact_timeseries",
+                "tests.BasicModel",
+                "--field=ts2",
+                "--no-database-expressions",
+                stdout=out,
+            )
+        self.assertIn("trimmed 0 series", out.getvalue())
+        self.assertIn("skipped 1 series", out.getvalue())
+        o.refresh_from_db()
+        self.assertEqual(self.series(0, 5, 10, 15), o.ts2)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            call_command("compact_timeseries", "tests.BasicModel", "--field=id")
+
+
+class CompactTimeseriesWorkersTests(CompactTestMixin, TestCase):
+    # Not frozen in time: freezegun doesn't carry over into worker processes.
+    def test_workers(self):
+        objs = [BinaryModel.objects.create(ts=self.series(0, 5)) for _ in range(5)]
+        call_command(
+            "compact_timeseries",
+            "tests.BinaryModel",
+            "--workers=2",
+            "--batch-size=2",
+            stdout=io.StringIO(),
+        )
+        for o in objs:
+            o.refresh_from_db()
+            self.assertEqual([], o.ts.data_points)
+            self.assertEqual([], o.legacy.data_points)
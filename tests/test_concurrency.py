@@ -0,0 +1,101 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+
+from django_simple_timeseries import signals
+from django_simple_timeseries.concurrency import ConcurrentUpdateError, add_and_save
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import BasicModel, SummaryModel
+
+
+class AddAndSaveTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.obj = BasicModel.objects.create()
+
+    def test_add_and_save(self):
+        result = add_and_save(self.obj, "ts2", 1.0, when=self.now)
+        self.assertEqual(Timeseries.RESULT_SHIFTED, result)
+        self.assertEqual([1.0], self.obj.ts2.data_points)
+        self.assertEqual([1.0], BasicModel.objects.get(pk=self.obj.pk).ts2.data_points)
+
+    def test_sends_buckets_finalized(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs["buckets"])
+
+        signals.buckets_finalized.connect(receiver, sender=BasicModel)
+        self.addCleanup(signals.buckets_finalized.disconnect, receiver, sender=BasicModel)
+        add_and_save(self.obj, "ts2", 1.0, when=self.now)
+        add_and_save(self.obj, "ts2", 2.0, when=self.now + timedelta(seconds=5))
+        self.assertEqual([[(self.now, 1.0)]], received)
+
+    def test_updates_summaries(self):
+        o = SummaryModel.objects.create()
+        add_and_save(o, "ts", 1.5, when=self.now)
+        self.assertEqual(1.5, o.latest)
+        o = SummaryModel.objects.get(pk=o.pk)
+        self.assertEqual((1.5, self.now, 1.5, 1.5), (o.latest, o.latest_time, o.low, o.high))
+
+    def test_retries_on_conflict(self):
+        """A writer holding a stale series reloads it instead of clobbering the other write."""
+        stale = BasicModel.objects.get(pk=self.obj.pk)
+        add_and_save(self.obj, "ts2", 1.0, when=self.now)
+
+        result = add_and_save(stale, "ts2", 2.0, when=self.now + timedelta(seconds=5))
+        self.assertEqual(Timeseries.RESULT_ADDED, result)
+        self.assertEqual([1.0, 2.0], stale.ts2.data_points)
+        self.assertEqual([1.0, 2.0], BasicModel.objects.get(pk=self.obj.pk).ts2.data_points)
+
+    def test_only_writes_the_given_field(self):
+        stale = BasicModel.objects.get(pk=self.obj.pk)
+        add_and_save(self.obj, "ts1", 1.0, when=self.now)
+        add_and_save(stale, "ts2", 2.0, when=self.now)
+        fresh = BasicModel.objects.get(pk=self.obj.pk)
+        self.assertEqual([1.0], fresh.ts1.data_points)
+        self.assertEqual([2.0], fresh.ts2.data_points)
+
+    def test_gives_up_after_max_attempts(self):
+        stale = BasicModel.objects.get(pk=self.obj.pk)
+        add_and_save(self.obj, "ts2", 1.0, when=self.now)
+        never_matches = (stale.ts2, {"pk__in": []})
+        with mock.patch(
+            "django_simple_timeseries.concurrency.load_stored", return_value=never_matches
+        ):
+            with self.assertRaises(ConcurrentUpdateError):
+                add_and_save(stale, "ts2", 2.0, when=self.now, max_attempts=3)
+        self.assertEqual([1.0], BasicModel.objects.get(pk=self.obj.pk).ts2.data_points)
+
+    def set_stored_text(self, text):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {BasicModel._meta.db_table} SET ts2 = %s WHERE id = %s",
+                [text, self.obj.pk],
+            )
+        self.obj.refresh_from_db()
+
+    def test_row_in_other_formatting(self):
+        """A row not written by Django's encoder is matched by its stored text."""
+        self.set_stored_text(
+            '{"res":5,"max":3,"data":[1.0],"start":"2021-04-03T00:00:00+00:00","v":1}'
+        )
+        result = add_and_save(
+            self.obj, "ts2", 2.0, when=self.now + timedelta(seconds=5), max_attempts=1
+        )
+        self.assertEqual(Timeseries.RESULT_ADDED, result)
+        self.assertEqual([1.0, 2.0], BasicModel.objects.get(pk=self.obj.pk).ts2.data_points)
+
+    def test_malformed_row(self):
+        """A malformed row, read back as an empty series, is overwritten."""
+        self.set_stored_text('{"v": 99}')
+        self.assertEqual([], self.obj.ts2.data_points)
+        add_and_save(self.obj, "ts2", 1.0, when=self.now)
+        self.assertEqual([1.0], BasicModel.objects.get(pk=self.obj.pk).ts2.data_points)
+
+    def test_requires_saved_instance(self):
+        with self.assertRaises(ValueError):
+            add_and_save(BasicModel(), "ts2", 1.0)
@@ -0,0 +1,196 @@
+import io
+import os
+import tempfile
+from datetime import UTC, datetime, timedelta
+from unittest import mock, skipIf
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from django_simple_timeseries.bulk import iter_decoded, pk_ranges, timeseries_field_names
+from django_simple_timeseries.export import iter_binary_export
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import BasicModel, BinaryModel
+
+
+class ExportTimeseriesCommandTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.objs = []
+        for i in range(3):
+            o = BasicModel()
+            o.ts2.add(float(i), when=self.now)
+            o.ts2.add(float(i) + 0.5, when=self.now + timedelta(seconds=10))
+            o.save()
+            self.objs.append(o)
+
+    def test_csv_to_stdout(self):
+        out = io.StringIO()
+        call_command(
+            "export_timeseries",
+            "tests.BasicModel",
+            "--field",
+            "ts2",
+            stdout=out,
+            stderr=io.StringIO(),
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual("pk,field,time,value", lines[0])
+        pk = self.objs[0].pk
+        self.assertEqual(
+            [
+                f"{pk},ts2,2021-04-03T00:00:00+00:00,0.0",
+                f"{pk},ts2,2021-04-03T00:00:05+00:00,",
+                f"{pk},ts2,2021-04-03T00:00:10+00:00,0.5",
+            ],
+            lines[1:4],
+        )
+        self.assertEqual(1 + 3 * 3, len(lines))
+
+    def test_binary_to_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "export.bin")
+            err = io.StringIO()
+            call_command(
+                "export_timeseries",
+                "tests.BasicModel",
+                "--format=binary",
+                f"--output={path}",
+                "--chunk-size=2",
+                stderr=err,
+            )
+            with open(path, "rb") as f:
+                records = list(iter_binary_export(f))
+        self.assertIn("Exported 6 series", err.getvalue())
+        self.assertEqual(
+            [(str(o.pk), name) for o in self.objs for name in ("ts1", "ts2")],
+            [(pk, name) for pk, name, _ in records],
+        )
+        self.assertEqual(self.objs[2].ts2, records[5][2])
+
+    def test_csv_to_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "export.csv")
+            call_command(
+                "export_timeseries",
+                "tests.BasicModel",
+                "--field=ts2",
+                f"--output={path}",
+                stderr=io.StringIO(),
+            )
+            with open(path, "rb") as f:
+                lines = f.read().split(b"\r\n")
+        self.assertEqual(b"pk,field,time,value", lines[0])
+        self.assertEqual(b"", lines[-1])
+        self.assertEqual(1 + 3 * 3 + 1, len(lines))
+
+    def test_binary_non_numeric(self):
+        """A series that can't be packed fails the export without leaving a truncated file."""
+        o = BasicModel()
+        o.ts2.add("on", when=self.now)
+        o.save()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "export.bin")
+            with self.assertRaisesMessage(CommandError, f"BasicModel.ts2 in row {o.pk}"):
+                call_command(
+                    "export_timeseries",
+                    "tests.BasicModel",
+                    "--format=binary",
+                    f"--output={path}",
+                    stderr=io.StringIO(),
+                )
+            self.assertFalse(os.path.exists(path))
+
+    def test_workers_non_integer_pks(self):
+        with mock.patch(
+            "django_simple_timeseries.management.commands.export_timeseries.pk_ranges",
+            side_effect=TypeError("Can only split integer primary keys, not str"),
+        ):
+            with self.assertRaisesMessage(CommandError, "integer primary keys"):
+                call_command(
+                    "export_timeseries", "tests.BasicModel", "--workers=2", "--output=unused"
+                )
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(CommandError):
+            call_command("export_timeseries", "tests.NoSuchModel")
+        with self.assertRaises(CommandError):
+            call_command("export_timeseries", "tests.BasicModel", "--field=id")
+        with self.assertRaises(CommandError):
+            call_command("export_timeseries", "tests.BasicModel", "--format=binary")
+
+
+@skipIf(
+    connection.vendor == "sqlite" and connection.is_in_memory_db(),
+    "Worker processes can't open an in-memory database",
+)
+class ParallelExportTests(TransactionTestCase):
+    def test_workers(self):
+        objs = [BasicModel.objects.create() for _ in range(5)]
+        for i, o in enumerate(objs):
+            o.ts2.add(float(i), when=datetime(2021, 4, 3, tzinfo=UTC))
+            o.save()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "export.bin")
+            err = io.StringIO()
+            call_command(
+                "export_timeseries",
+                "tests.BasicModel",
+                "--field=ts2",
+                "--format=binary",
+                f"--output={path}",
+                "--workers=2",
+                stderr=err,
+            )
+            self.assertEqual(["export.bin.0", "export.bin.1"], sorted(os.listdir(tmpdir)))
+            records = []
+            for i in range(2):
+                with open(f"{path}.{i}", "rb") as f:
+                    records.extend(iter_binary_export(f))
+        self.assertIn("Exported 5 series", err.getvalue())
+        self.assertEqual([str(o.pk) for o in objs], [pk for pk, _, _ in records])
+        self.assertEqual([[float(i)] for i in range(5)], [s.data_points for _, _, s in records])
+
+
+class BulkHelperTests(TestCase):
+    def test_timeseries_field_names(self):
+        self.assertEqual(["ts1", "ts2"], timeseries_field_names(BasicModel))
+        self.assertEqual(["ts", "legacy"], timeseries_field_names(BinaryModel))
+
+    def test_pk_ranges(self):
+        self.assertEqual([], pk_ranges(BasicModel.objects.all(), 4))
+        pks = [BasicModel.objects.create().pk for _ in range(10)]
+        ranges = pk_ranges(BasicModel.objects.all(), 3)
+        self.assertEqual(3, len(ranges))
+        self.assertEqual(pks[0], ranges[0][0])
+        self.assertEqual(pks[-1], ranges[-1][1])
+        covered = [pk for lo, hi in ranges for pk in range(lo, hi + 1)]
+        self.assertEqual(pks, covered)
+
+    def test_iter_decoded(self):
+        now = datetime(2021, 4, 3, tzinfo=UTC)
+        objs = []
+        for i in range(5):
+            o = BinaryModel()
+            o.ts.add(float(i), when=now)
+            o.legacy.add(i, when=now)
+            o.save()
+            objs.append(o)
+        with self.assertNumQueries(1):
+            decoded = list(iter_decoded(BinaryModel.objects.order_by("-pk"), workers=1))
+        self.assertEqual([o.pk for o in reversed(objs)], [o.pk for o in decoded])
+        self.assertEqual([[4.0], [4]], [decoded[0].ts.data_points, decoded[0].legacy.data_points])
+        self.assertEqual(set(), decoded[0].get_deferred_fields())
+        self.assertFalse(hasattr(decoded[0], "stored_value_0"))
+
+        with mock.patch.object(Timeseries, "from_bytes", wraps=Timeseries.from_bytes) as decode:
+            decoded = list(
+                iter_decoded(BinaryModel.objects.order_by("pk"), ["ts"], workers=2, chunk_size=2)
+            )
+        # Decoded by the workers, not here.
+        self.assertEqual(0, decode.call_count)
+        self.assertEqual([[float(i)] for i in range(5)], [o.ts.data_points for o in decoded])
+        # Other fields are loaded as usual.
+        self.assertEqual([0], decoded[0].legacy.data_points)
@@ -4,7 +4,7 @@ from datetime import UTC, timedelta
 from django.utils.timezone import datetime
 
 from django_simple_timeseries.forms import TimeseriesWidget
-from django_simple_timeseries.timeseries import Timeseries
+from django_simple_timeseries.timeseries import MultiTimeseries, Timeseries
 
 
 class TimeseriesWidgetTests(unittest.TestCase):
@@ -20,6 +20,14 @@ class TimeseriesWidgetTests(unittest.TestCase):
         self.assertIn("Timeseries with 2 points", html)
         self.assertIn("<svg", html)
 
+    def test_render_multi(self):
+        ts = MultiTimeseries(["temp", "hum"], start_time=self.now, resolution_seconds=5)
+        ts.add({"temp": 1.0, "hum": 2.0}, when=self.now)
+        ts.add({"temp": 2.0, "hum": 1.0}, when=self.now + timedelta(seconds=5))
+        html = self.widget.render("readings", ts)
+        self.assertIn("svg-for-readings-temp", html)
+        self.assertIn("svg-for-readings-hum", html)
+
     def test_render_without_value(self):
         """A missing or non-Timeseries value renders a placeholder, not a crash."""
         self.assertIn("No timeseries data", self.widget.render("ts1", None))
@@ -0,0 +1,102 @@
+import io
+import os
+import tempfile
+from datetime import UTC, datetime
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from django_simple_timeseries import signals
+
+from .models import BasicModel, SummaryModel
+
+
+class IngestTimeseriesCommandTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.epoch = int(self.now.timestamp())
+        self.obj = BasicModel.objects.create()
+
+    def ingest(self, text, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command("ingest_timeseries", *args, stdin=io.StringIO(text), stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_ingest(self):
+        pk = self.obj.pk
+        other = BasicModel.objects.create()
+        out, err = self.ingest(
+            f"tests.BasicModel/{pk}/ts2 2.5 {self.epoch + 5}\n"
+            f"tests.BasicModel/{pk}/ts2 1 {self.epoch}\n"
+            "\n"
+            f"tests.BasicModel/{other.pk}/ts1 7 {self.epoch}\n"
+            f"tests.BasicModel/{pk}/ts2 3.5 {self.epoch + 6.5}\n"
+        )
+        self.assertEqual("", err)
+        self.assertIn("Recorded 4 samples with 2 row updates in", out)
+        self.assertIn("samples/s", out)
+        self.obj.refresh_from_db()
+        self.assertEqual(self.now, self.obj.ts2.start_time)
+        self.assertEqual([1, 3.5], self.obj.ts2.data_points)
+        other.refresh_from_db()
+        self.assertEqual([7], other.ts1.data_points)
+
+    def test_sends_buckets_finalized(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append((kwargs["instance"].pk, kwargs["buckets"]))
+
+        signals.buckets_finalized.connect(receiver)
+        self.addCleanup(signals.buckets_finalized.disconnect, receiver)
+        self.ingest(
+            f"tests.BasicModel/{self.obj.pk}/ts2 1 {self.epoch}\n"
+            f"tests.BasicModel/{self.obj.pk}/ts2 2 {self.epoch + 5}\n"
+        )
+        self.assertEqual([(self.obj.pk, [(self.now, 1)])], received)
+
+    def test_batches(self):
+        objs = [BasicModel.objects.create() for _ in range(4)]
+        text = "".join(
+            f"tests.BasicModel/{obj.pk}/ts2 {i} {self.epoch + 5 * i}\n"
+            for obj in objs
+            for i in range(3)
+        )
+        with self.assertNumQueries(8):
+            # Per batch of up to 3 rows: savepoint, locking load, update, release.
+            out, _ = self.ingest(text, "--batch-size", "3")
+        self.assertIn("Recorded 12 samples with 4 row updates", out)
+        for obj in objs:
+            obj.refresh_from_db()
+            self.assertEqual([0, 1, 2], obj.ts2.data_points)
+
+    def test_skipped_lines(self):
+        self.obj.ts2.add(1.0, when=self.now)
+        self.obj.save()
+        out, err = self.ingest(
+            f"tests.BasicModel/{self.obj.pk}/ts2 0.5 {self.epoch - 5}\n"
+            f"tests.BasicModel/{self.obj.pk + 1}/ts2 1 {self.epoch}\n"
+            f"tests.BasicModel/{self.obj.pk}/ts2 nan {self.epoch}\n"
+            f"tests.BasicModel/x/ts2 1 {self.epoch}\n"
+            f"tests.BasicModel/{self.obj.pk}/missing 1 {self.epoch}\n"
+            f"tests.BasicModel/{self.obj.pk}/id 1 {self.epoch}\n"
+            f"tests.Nope/{self.obj.pk}/ts2 1 {self.epoch}\n"
+            "garbage\n"
+        )
+        self.assertEqual(6, len(err.splitlines()))
+        self.assertIn("stdin:8: Expected", err)
+        self.assertIn("Recorded 0 samples with 1 row updates", out)
+        self.assertIn("Skipped 6 invalid lines, 1 samples of rows that don't exist, and 1", out)
+
+    def test_files_and_summaries(self):
+        obj = SummaryModel.objects.create()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "samples.txt")
+            with open(path, "w") as f:
+                f.write(f"tests.SummaryModel/{obj.pk}/ts 4.0 {self.epoch}\n")
+            self.ingest(f"tests.SummaryModel/{obj.pk}/ts 6.0 {self.epoch + 1}\n", path, "-")
+            with self.assertRaises(CommandError):
+                self.ingest("", os.path.join(tmp, "missing.txt"))
+        obj.refresh_from_db()
+        self.assertEqual([6.0], obj.ts.data_points)
+        self.assertEqual(6.0, obj.latest)
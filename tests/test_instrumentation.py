@@ -0,0 +1,65 @@
+from datetime import UTC, datetime
+
+from django.test import TestCase
+
+from django_simple_timeseries import instrumentation, signals
+from django_simple_timeseries.forms import TimeseriesWidget
+from django_simple_timeseries.timeseries import BINARY_HEADER
+
+from .models import BasicModel, BinaryModel
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        instrumentation.reset_stats()
+        self.addCleanup(instrumentation.reset_stats)
+        self.addCleanup(instrumentation.disable)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(instrumentation.is_enabled())
+        o = BasicModel.objects.create()
+        o.ts2.add(1.0, when=self.now)
+        o.save()
+        BasicModel.objects.get(pk=o.pk)
+        self.assertEqual({}, instrumentation.get_stats())
+
+    def test_stats(self):
+        instrumentation.enable()
+        o = BasicModel.objects.create()
+        o.ts2.add(1.0, when=self.now)
+        o.save()
+        BasicModel.objects.get(pk=o.pk)
+        BinaryModel.objects.create()
+        TimeseriesWidget().render("ts2", o.ts2)
+        instrumentation.disable()
+        BasicModel.objects.get(pk=o.pk)
+
+        stats = instrumentation.get_stats()
+        self.assertEqual(2, stats[("tests.BasicModel", "ts2", "encode")]["calls"])
+        self.assertEqual(1, stats[("tests.BasicModel", "ts2", "decode")]["calls"])
+        self.assertEqual(1, stats[("tests.BasicModel", "ts1", "decode")]["calls"])
+        self.assertEqual(1, stats[("tests.BinaryModel", "ts", "encode")]["calls"])
+        self.assertEqual(1, stats[("Timeseries", None, "add")]["calls"])
+        self.assertEqual(0, stats[("Timeseries", None, "add")]["bytes"])
+        self.assertEqual(1, stats[("TimeseriesWidget", None, "render")]["calls"])
+        decoded = stats[("tests.BasicModel", "ts2", "decode")]
+        self.assertGreater(decoded["bytes"], 50)
+        self.assertGreaterEqual(decoded["seconds"], 0)
+        # An empty binary series is just the header.
+        self.assertEqual(BINARY_HEADER.size, stats[("tests.BinaryModel", "ts", "encode")]["bytes"])
+
+        instrumentation.reset_stats()
+        self.assertEqual({}, instrumentation.get_stats())
+
+    def test_signal(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append((sender, kwargs["field_name"], kwargs["operation"], kwargs["size"]))
+
+        signals.measured.connect(receiver)
+        self.addCleanup(signals.measured.disconnect, receiver)
+        instrumentation.enable()
+        BinaryModel.objects.create()
+        self.assertIn((BinaryModel, "ts", "encode", BINARY_HEADER.size), received)
@@ -0,0 +1,116 @@
+import io
+import mmap
+import os
+import tempfile
+import unittest
+from datetime import UTC, timedelta
+from unittest import mock
+
+from django.utils.timezone import datetime
+
+from django_simple_timeseries.mapped import MappedTimeseries
+from django_simple_timeseries.timeseries import Timeseries
+
+
+class MappedTimeseriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 1, 1, 2, 30, tzinfo=UTC)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "series.tsm")
+        self.ts = MappedTimeseries.create(
+            self.path, start_time=self.now, max_points=5, resolution_seconds=5
+        )
+        self.addCleanup(self.ts.close)
+
+    def test_add_matches_timeseries(self):
+        """Every add produces the same result and contents as an in-memory `Timeseries`."""
+        reference = Timeseries(start_time=self.now, max_points=5, resolution_seconds=5)
+        samples = [(0, 1.0), (1, 2.0), (6, 3.0), (21, 4.0), (26, 5.0), (31, None), (41, 6.0)]
+        samples += [(300, 7.0), (305, 8.0)]
+        for offset, value in samples:
+            when = self.now + timedelta(seconds=offset)
+            self.assertEqual(reference.add(value, when=when), self.ts.add(value, when=when))
+            self.assertEqual(reference.data_points, self.ts[:])
+            self.assertEqual(reference.start_time, self.ts.start_time)
+        with self.assertRaises(ValueError):
+            self.ts.add(1.0, when=self.now)
+
+    def test_add_non_numeric(self):
+        for bad in ("1.0", [1], True):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                self.ts.add(bad, when=self.now)
+        self.assertEqual(0, len(self.ts))
+        series = Timeseries(start_time=self.now, data_points=["on"])
+        with self.assertRaises(ValueError):
+            MappedTimeseries.from_timeseries(self.path + ".copy", series)
+
+    def test_persists_across_opens(self):
+        self.ts.add(1.0, when=self.now)
+        self.ts.add(2.0, when=self.now + timedelta(seconds=10))
+        self.ts.close()
+        with MappedTimeseries(self.path, readonly=True) as ts:
+            self.assertEqual(3, len(ts))
+            self.assertEqual([1.0, None, 2.0], ts[:])
+            self.assertEqual(2.0, ts[-1])
+            self.assertEqual([1.0, 2.0], ts[::2])
+            with self.assertRaises(IndexError):
+                ts[3]
+
+    def test_stats_and_export(self):
+        for i in range(7):
+            self.ts.add(float(i), when=self.now + timedelta(seconds=5 * i))
+        self.ts.add(None, when=self.now + timedelta(seconds=35))
+        self.assertEqual(
+            {"count": 4, "min": 3.0, "max": 6.0, "mean": 4.5},
+            self.ts.stats(),
+        )
+        self.assertEqual(
+            self.ts.to_timeseries().stats(),
+            self.ts.stats(),
+        )
+        self.assertEqual(
+            {"count": 2, "min": 4.0, "max": 5.0, "mean": 4.5},
+            self.ts.stats(
+                start=self.now + timedelta(seconds=20), end=self.now + timedelta(seconds=25)
+            ),
+        )
+
+        out = io.StringIO()
+        self.ts.export_csv(out, start=self.now + timedelta(seconds=30))
+        self.assertEqual(
+            "time,value\r\n2020-01-01T02:30:30+00:00,6.0\r\n2020-01-01T02:30:35+00:00,\r\n",
+            out.getvalue(),
+        )
+
+    def test_timeseries_round_trip(self):
+        series = Timeseries(start_time=self.now, max_points=10, resolution_seconds=60)
+        series.add(1.5, when=self.now)
+        series.add(2.5, when=self.now + timedelta(minutes=3))
+        path = os.path.join(os.path.dirname(self.path), "copy.tsm")
+        with MappedTimeseries.from_timeseries(path, series) as mapped:
+            self.assertEqual(series, mapped.to_timeseries())
+            self.assertEqual(list(series.iter_points()), list(mapped.iter_points()))
+
+    def test_open_invalid_file(self):
+        path = os.path.join(os.path.dirname(self.path), "bad.tsm")
+        with open(path, "wb") as f:
+            f.write(b"not a timeseries")
+        with self.assertRaises(ValueError):
+            MappedTimeseries(path)
+        # A file with a valid header but the wrong size is rejected, and unmapped.
+        with open(self.path, "rb") as f:
+            header = f.read(64)
+        with open(path, "wb") as f:
+            f.write(header)
+        maps = []
+        real_mmap = mmap.mmap
+
+        def record_mmap(*args, **kwargs):
+            maps.append(real_mmap(*args, **kwargs))
+            return maps[-1]
+
+        with mock.patch("mmap.mmap", side_effect=record_mmap):
+            with self.assertRaises(ValueError):
+                MappedTimeseries(path)
+        self.assertTrue(maps[0].closed)
@@ -1,14 +1,32 @@
 import json
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 from django.core import serializers
+from django.db.models import F
 from django.test import TestCase
 from freezegun import freeze_time
 
-from django_simple_timeseries.models import TimeseriesField
-from django_simple_timeseries.timeseries import Timeseries
+from django_simple_timeseries import signals
+from django_simple_timeseries.expressions import SeriesValueAt
+from django_simple_timeseries.models import (
+    BinaryTimeseriesField,
+    MultiTimeseriesField,
+    TimeseriesField,
+)
+from django_simple_timeseries.timeseries import (
+    AggregatingTimeseries,
+    QuantileTimeseries,
+    Timeseries,
+)
 
-from .models import BasicModel
+from .models import (
+    AggregateModel,
+    BasicModel,
+    BinaryModel,
+    MultiModel,
+    QuantileModel,
+    SummaryModel,
+)
 
 
 class TimeseriesFieldTests(TestCase):
@@ -183,3 +201,255 @@ class TimeseriesFieldTests(TestCase):
 
         self.assertEqual(datetime(2021, 5, 5, tzinfo=UTC), objects[0].object.ts1.start_time)
         self.assertEqual(datetime(2021, 4, 3, tzinfo=UTC), objects[0].object.ts2.start_time)
+
+
+class TimeseriesTransformTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        # An empty series ends where it starts, at the time it was created.
+        with freeze_time(self.now):
+            self.empty = BasicModel.objects.create()
+        self.short = BasicModel.objects.create()
+        self.short.ts2.add(5.0, when=self.now)
+        self.short.save()
+        self.long = BasicModel.objects.create()
+        for i, v in enumerate((1.0, None, 2.5)):
+            self.long.ts2.add(v, when=self.now + timedelta(seconds=5 * i))
+        self.long.save()
+
+    def test_annotate(self):
+        rows = BasicModel.objects.annotate(
+            length=F("ts2__len"),
+            last=F("ts2__last"),
+            start=F("ts2__start_time"),
+            end=F("ts2__end_time"),
+        ).order_by("pk")
+        self.assertEqual(
+            [
+                (0, None),
+                (1, 5.0),
+                (3, 2.5),
+            ],
+            [(r.length, r.last) for r in rows],
+        )
+        self.assertEqual(self.now, rows[2].start)
+        self.assertEqual(self.now + timedelta(seconds=10), rows[2].end)
+        self.assertEqual(self.now, rows[1].end)
+
+    def test_filter_and_order_by(self):
+        self.assertEqual(
+            [self.short, self.long], list(BasicModel.objects.filter(ts2__len__gt=0).order_by("pk"))
+        )
+        self.assertEqual([self.long], list(BasicModel.objects.filter(ts2__last__lt=3)))
+        self.assertEqual(
+            [self.long],
+            list(BasicModel.objects.filter(ts2__end_time__gt=self.now)),
+        )
+        self.assertEqual(
+            [self.short, self.long],
+            list(BasicModel.objects.filter(ts2__len__gt=0).order_by("-ts2__last")),
+        )
+
+    def test_value_at(self):
+        """The SQL cross-section agrees with the series' buckets, at every offset."""
+        for seconds in range(-5, 20):
+            when = self.now + timedelta(seconds=seconds)
+            expected = {
+                o.pk: dict(o.ts2.iter_points()).get(o.ts2.normalize(when))
+                for o in (self.empty, self.short, self.long)
+            }
+            rows = BasicModel.objects.annotate(value=SeriesValueAt("ts2", when))
+            self.assertEqual(expected, dict(rows.values_list("pk", "value")), msg=seconds)
+
+
+class AggregatingFieldTests(TestCase):
+    def test_save_and_load(self):
+        with freeze_time("2021-04-03"):
+            o = AggregateModel.objects.create()
+            self.assertIsInstance(o.ts, AggregatingTimeseries)
+            o.ts.add(1.0)
+            o.ts.add(3.0)
+            o.save()
+        o = AggregateModel.objects.get(pk=o.pk)
+        self.assertEqual([[2, 4.0, 1.0, 3.0]], o.ts.data_points)
+        self.assertEqual((2.0, 3.0), (o.latest, o.peak))
+
+    def test_deconstruct(self):
+        _, _, _, kwargs = AggregateModel._meta.get_field("ts").deconstruct()
+        self.assertIs(True, kwargs["aggregate"])
+        self.assertNotIn("aggregate", TimeseriesField().deconstruct()[3])
+
+
+class QuantileFieldTests(TestCase):
+    def test_save_and_load(self):
+        with freeze_time("2021-04-03"):
+            o = QuantileModel.objects.create()
+            self.assertIsInstance(o.ts, QuantileTimeseries)
+            for v in (1.0, 2.0, 9.0):
+                o.ts.add(v)
+            o.save()
+        o = QuantileModel.objects.get(pk=o.pk)
+        self.assertEqual(3, o.ts.data_points[0].count)
+        self.assertEqual(9.0, o.ts.quantile(1))
+        self.assertEqual(9.0, o.peak)
+
+    def test_deconstruct_and_check(self):
+        _, _, _, kwargs = QuantileModel._meta.get_field("ts").deconstruct()
+        self.assertIs(True, kwargs["quantiles"])
+        self.assertNotIn("quantiles", TimeseriesField().deconstruct()[3])
+        self.assertEqual([], QuantileModel._meta.get_field("ts")._check_series_kind())
+        field = TimeseriesField(aggregate=True, quantiles=True)
+        self.assertEqual(
+            ["django_simple_timeseries.E003"], [e.id for e in field._check_series_kind()]
+        )
+
+
+class BinaryTimeseriesFieldTests(TestCase):
+    def test_save_and_load(self):
+        with freeze_time("2021-04-03"):
+            o = BinaryModel.objects.create()
+            o.ts.add(1.5)
+            o.save()
+        with freeze_time("2021-04-03T00:00:10"):
+            o.ts.add(2.5)
+            o.save()
+        o = BinaryModel.objects.get(pk=o.pk)
+        self.assertEqual(datetime(2021, 4, 3, tzinfo=UTC), o.ts.start_time)
+        self.assertEqual([1.5, None, 2.5], o.ts.data_points)
+        self.assertEqual(3, o.ts.max_points)
+        self.assertEqual(5, o.ts.resolution.seconds)
+
+    def test_serialization_round_trip(self):
+        with freeze_time("2021-04-03"):
+            o = BinaryModel.objects.create()
+            o.ts.add(1.5)
+            o.save()
+        data = serializers.serialize("json", BinaryModel.objects.all())
+        self.assertIsInstance(json.loads(data)[0]["fields"]["ts"], str)
+        restored = next(serializers.deserialize("json", data)).object
+        self.assertEqual(o.ts, restored.ts)
+
+    def test_malformed_db_value_returns_default(self):
+        field = BinaryModel._meta.get_field("ts")
+        with freeze_time("2021-05-05"):
+            ts = field.from_db_value(b"garbage", None, None)
+        self.assertEqual(datetime(2021, 5, 5, tzinfo=UTC), ts.start_time)
+        self.assertEqual([], ts.data_points)
+
+    def test_deconstruct(self):
+        _, path, _, kwargs = BinaryTimeseriesField(max_points=2).deconstruct()
+        self.assertEqual("django_simple_timeseries.models.BinaryTimeseriesField", path)
+        self.assertEqual({"max_points": 2, "resolution_seconds": 60}, kwargs)
+
+
+class SummaryFieldTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+
+    def test_save_updates_summaries(self):
+        o = SummaryModel.objects.create()
+        self.assertEqual((None, None, None, None), (o.latest, o.latest_time, o.low, o.high))
+        for i, v in enumerate((2.0, 4.0, None)):
+            o.ts.add(v, when=self.now + timedelta(seconds=5 * i))
+        o.save()
+        o = SummaryModel.objects.get(pk=o.pk)
+        self.assertEqual(4.0, o.latest)
+        self.assertEqual(self.now + timedelta(seconds=5), o.latest_time)
+        self.assertEqual((2.0, 4.0), (o.low, o.high))
+        self.assertEqual([o], list(SummaryModel.objects.filter(latest__gt=3).order_by("-high")))
+
+    def test_deconstruct(self):
+        _, _, _, kwargs = SummaryModel._meta.get_field("ts").deconstruct()
+        self.assertEqual("latest", kwargs["last_value_field"])
+        self.assertEqual("high", kwargs["max_field"])
+        _, _, _, kwargs = TimeseriesField().deconstruct()
+        self.assertNotIn("last_value_field", kwargs)
+
+    def test_check_unknown_field(self):
+        field = TimeseriesField(min_field="missing")
+        field.set_attributes_from_name("ts")
+        field.model = SummaryModel
+        errors = field._check_summary_fields()
+        self.assertEqual(["django_simple_timeseries.E001"], [e.id for e in errors])
+        self.assertEqual([], SummaryModel._meta.get_field("ts")._check_summary_fields())
+
+
+class MultiTimeseriesFieldTests(TestCase):
+    def test_save_and_load(self):
+        with freeze_time("2021-04-03"):
+            o = MultiModel.objects.create()
+            self.assertEqual(("temperature", "humidity"), o.readings.channels)
+            o.readings.add({"temperature": 21.5, "humidity": 0.4})
+            o.save()
+        with freeze_time("2021-04-03T00:00:10"):
+            o.readings.add({"temperature": 22.0})
+            o.save()
+        o = MultiModel.objects.get(pk=o.pk)
+        self.assertEqual(datetime(2021, 4, 3, tzinfo=UTC), o.readings.start_time)
+        self.assertEqual(
+            {"temperature": [21.5, None, 22.0], "humidity": [0.4, None, None]},
+            o.readings.data_points,
+        )
+        self.assertEqual(3, o.readings.max_points)
+
+    def test_serialization_round_trip(self):
+        o = MultiModel.objects.create()
+        o.readings.add({"humidity": 0.5})
+        o.save()
+        data = serializers.serialize("json", [o])
+        restored = next(serializers.deserialize("json", data)).object
+        self.assertEqual(o.readings, restored.readings)
+
+    def test_malformed_db_value_returns_default(self):
+        field = MultiModel._meta.get_field("readings")
+        with freeze_time("2021-05-05"):
+            ts = field.from_db_value('{"v": 1}', None, None)
+        self.assertEqual(datetime(2021, 5, 5, tzinfo=UTC), ts.start_time)
+        self.assertEqual({"temperature": [], "humidity": []}, ts.data_points)
+
+    def test_deconstruct(self):
+        _, path, _, kwargs = MultiTimeseriesField(channels=["a"], max_points=2).deconstruct()
+        self.assertEqual("django_simple_timeseries.models.MultiTimeseriesField", path)
+        self.assertEqual({"channels": ["a"], "max_points": 2, "resolution_seconds": 60}, kwargs)
+
+
+class BucketsFinalizedTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.received = []
+
+        def receiver(sender, **kwargs):
+            self.received.append(
+                (sender, kwargs["instance"], kwargs["field_name"], kwargs["buckets"])
+            )
+
+        signals.buckets_finalized.connect(receiver)
+        self.addCleanup(signals.buckets_finalized.disconnect, receiver)
+
+    def test_sent_on_save(self):
+        o = BasicModel.objects.create()
+        o.ts2.add(1, when=self.now)
+        o.ts2.add(2, when=self.now)
+        o.save()
+        self.assertEqual([], self.received)
+
+        o.ts2.add(3, when=self.now + timedelta(seconds=5))
+        o.ts2.add(4, when=self.now + timedelta(seconds=20))
+        o.save()
+        self.assertEqual(
+            [(BasicModel, o, "ts2", [(self.now, 2), (self.now + timedelta(seconds=5), 3)])],
+            self.received,
+        )
+        self.assertEqual([], o.ts2.finalized_buckets)
+        o.save()
+        self.assertEqual(1, len(self.received))
+
+    def test_gaps_and_excluded_fields(self):
+        o = BasicModel.objects.create()
+        o.ts2.add(None, when=self.now)
+        o.ts2.add(1, when=self.now + timedelta(seconds=5))
+        o.save(update_fields=["ts1"])
+        self.assertEqual([], self.received)
+        o.ts2.add(2, when=self.now + timedelta(seconds=10))
+        o.save(update_fields=["ts2"])
+        self.assertEqual([(self.now + timedelta(seconds=5), 1)], self.received[0][3])
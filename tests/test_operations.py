@@ -0,0 +1,126 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from django.db import connection
+from django.db.migrations import Migration
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.operations import AlterField
+from django.db.migrations.optimizer import MigrationOptimizer
+from django.db.migrations.state import ProjectState
+from django.test import TestCase, TransactionTestCase
+
+from django_simple_timeseries.models import TimeseriesField
+from django_simple_timeseries.operations import CopyTimeseriesField, RebucketTimeseriesField
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import BasicModel, BinaryModel
+
+
+class CopyTimeseriesFieldTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.state = ProjectState.from_apps(BinaryModel._meta.apps)
+        self.schema_editor = SimpleNamespace(connection=connection)
+
+    def test_copy_forwards_and_backwards(self):
+        objs = []
+        for i in range(5):
+            legacy = Timeseries(max_points=3, resolution_seconds=5)
+            legacy.add(float(i), when=self.now)
+            objs.append(BinaryModel.objects.create(legacy=legacy))
+
+        operation = CopyTimeseriesField("binarymodel", "legacy", "ts", batch_size=2)
+        operation.database_forwards("tests", self.schema_editor, self.state, self.state)
+        for i, obj in enumerate(objs):
+            obj.refresh_from_db()
+            self.assertEqual([float(i)], obj.ts.data_points)
+            self.assertEqual(obj.legacy, obj.ts)
+
+        BinaryModel.objects.update(legacy=Timeseries(max_points=3, resolution_seconds=5))
+        operation.database_backwards("tests", self.schema_editor, self.state, self.state)
+        for i, obj in enumerate(objs):
+            obj.refresh_from_db()
+            self.assertEqual([float(i)], obj.legacy.data_points)
+
+    def test_deconstruct(self):
+        operation = CopyTimeseriesField("binarymodel", "legacy", "ts")
+        name, args, kwargs = operation.deconstruct()
+        self.assertEqual("CopyTimeseriesField", name)
+        self.assertEqual(("binarymodel", "legacy", "ts"), args)
+        self.assertEqual("Copy timeseries binarymodel.legacy to ts", operation.describe())
+
+
+class RebucketTimeseriesFieldTests(TransactionTestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.executor = MigrationExecutor(connection)
+        self.state = self.executor.loader.project_state(
+            self.executor.loader.graph.leaf_nodes("tests")
+        )
+
+    def make_rows(self, count):
+        objs = []
+        for i in range(count):
+            series = Timeseries(max_points=20, resolution_seconds=1)
+            for second in range(12):
+                series.add(i * 100 + second, when=self.now + timedelta(seconds=second))
+            objs.append(BasicModel.objects.create(ts2=series))
+        return objs
+
+    def make_migration(self, **kwargs):
+        migration = Migration("9999_rebucket", "tests")
+        migration.operations = [
+            RebucketTimeseriesField(
+                "basicmodel", "ts2", TimeseriesField(max_points=2, resolution_seconds=10), **kwargs
+            )
+        ]
+        return migration
+
+    def assert_series(self, objs, resolution_seconds, max_points, data_points):
+        for i, obj in enumerate(objs):
+            obj.refresh_from_db()
+            self.assertEqual(resolution_seconds, obj.ts2.resolution.seconds)
+            self.assertEqual(max_points, obj.ts2.max_points)
+            self.assertEqual(self.now, obj.ts2.start_time)
+            self.assertEqual(
+                [None if v is None else i * 100 + v for v in data_points], obj.ts2.data_points
+            )
+
+    def test_forwards_and_backwards(self):
+        objs = self.make_rows(5)
+        migration = self.make_migration(batch_size=2)
+        with self.assertLogs("django_simple_timeseries.operations", "INFO") as logs:
+            self.executor.apply_migration(self.state.clone(), migration)
+        self.assertIn("5/5 rows, 5 changed", logs.output[-1])
+        self.assert_series(objs, 10, 2, [9, 11])
+        # Untouched fields keep their values.
+        self.assertEqual(1440, objs[0].ts1.max_points)
+
+        # Reversing converts back to the field's configuration before the migration.
+        with self.assertLogs("django_simple_timeseries.operations", "INFO") as logs:
+            self.executor.unapply_migration(self.state.clone(), migration)
+        self.assertIn("5/5 rows, 5 changed", logs.output[-1])
+        self.assert_series(objs, 5, 3, [9, None, 11])
+
+    def test_rebucket_in_parallel(self):
+        objs = self.make_rows(5)
+        migration = self.make_migration(batch_size=2, workers=2)
+        with self.assertLogs("django_simple_timeseries.operations", "INFO"):
+            self.executor.apply_migration(self.state.clone(), migration)
+            self.assert_series(objs, 10, 2, [9, 11])
+            self.executor.unapply_migration(self.state.clone(), migration)
+
+    def test_not_merged_by_optimizer(self):
+        migration = self.make_migration()
+        alter = AlterField("basicmodel", "ts2", TimeseriesField())
+        operations = MigrationOptimizer().optimize([alter, *migration.operations], "tests")
+        self.assertEqual(migration.operations, operations)
+        operations = MigrationOptimizer().optimize([*migration.operations, alter], "tests")
+        self.assertEqual([*migration.operations, alter], operations)
+
+    def test_deconstruct(self):
+        (operation,) = self.make_migration(workers=4).operations
+        name, args, kwargs = operation.deconstruct()
+        self.assertEqual("RebucketTimeseriesField", name)
+        self.assertEqual(("basicmodel", "ts2", operation.field), args)
+        self.assertEqual({"workers": 4}, kwargs)
@@ -0,0 +1,62 @@
+from datetime import UTC, datetime, timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from django_simple_timeseries.sharded import sum_series
+from django_simple_timeseries.timeseries import Timeseries
+
+from .models import ShardedModel, ShardedModelShard
+
+
+class ShardedTimeseriesTests(TestCase):
+    def setUp(self):
+        self.now = datetime(2021, 4, 3, tzinfo=UTC)
+        self.obj = ShardedModel.objects.create()
+
+    def at(self, bucket):
+        return self.now + timedelta(seconds=5 * bucket)
+
+    def test_sum_series(self):
+        a = Timeseries(start_time=self.at(0), data_points=[1, None, 3], resolution_seconds=5)
+        b = Timeseries(start_time=self.at(1), data_points=[None, 10, 20], resolution_seconds=5)
+        empty = Timeseries(resolution_seconds=5)
+        total = sum_series([empty, a, b], max_points=3, resolution_seconds=5)
+        self.assertEqual((self.at(1), [None, 13, 20]), (total.start_time, total.data_points))
+        self.assertEqual([], sum_series([empty], max_points=3, resolution_seconds=5).data_points)
+
+    def test_increment_and_read(self):
+        requests = self.obj.requests
+        self.assertEqual([], requests.to_timeseries().data_points)
+        self.assertEqual(Timeseries.RESULT_SHIFTED, requests.increment(when=self.at(0), shard=0))
+        self.assertEqual(
+            Timeseries.RESULT_REPLACED, requests.increment(2, when=self.at(0), shard=0)
+        )
+        requests.increment(when=self.at(0), shard=1)
+        self.assertEqual(Timeseries.RESULT_ADDED, requests.increment(when=self.at(2), shard=1))
+        self.assertEqual(2, ShardedModelShard.objects.filter(owner=self.obj).count())
+        with self.assertNumQueries(1):
+            series = requests.to_timeseries()
+        self.assertEqual((self.at(0), [4, None, 1]), (series.start_time, series.data_points))
+        self.assertEqual(3, series.max_points)
+        self.assertEqual(
+            [(self.at(0), 4), (self.at(1), None), (self.at(2), 1)], list(requests.iter_points())
+        )
+
+    def test_process_shard(self):
+        with mock.patch("os.getpid", return_value=6):
+            self.assertEqual(2, self.obj.requests.process_shard())
+            self.obj.requests.increment(when=self.at(0))
+        self.assertEqual([2], list(self.obj.request_shards.values_list("shard", flat=True)))
+
+    def test_compact(self):
+        requests = self.obj.requests
+        self.assertEqual(0, requests.compact())
+        for shard in range(3):
+            requests.increment(shard + 1, when=self.at(shard), shard=shard)
+        before = requests.to_timeseries()
+        self.assertEqual(2, requests.compact())
+        self.assertEqual([0], list(self.obj.request_shards.values_list("shard", flat=True)))
+        self.assertEqual(before, requests.to_timeseries())
+        requests.increment(when=self.at(2), shard=3)
+        self.assertEqual([1, 2, 4], requests.to_timeseries().data_points)
@@ -0,0 +1,64 @@
+import json
+import random
+import unittest
+
+from django_simple_timeseries.sketch import QuantileSketch, merged
+
+
+class QuantileSketchTestCase(unittest.TestCase):
+    def assertClose(self, expected, actual, relative=0.01):
+        self.assertLessEqual(abs(actual - expected), abs(expected) * relative, (expected, actual))
+
+    def test_quantiles(self):
+        values = [random.Random(1).lognormvariate(0, 2) for _ in range(10000)]
+        sketch = QuantileSketch()
+        for v in values:
+            sketch.add(v)
+        values.sort()
+        for q in (0, 0.5, 0.9, 0.99, 1):
+            self.assertClose(values[round(q * (len(values) - 1))], sketch.quantile(q))
+        self.assertEqual((values[0], values[-1]), (sketch.quantile(0), sketch.quantile(1)))
+        self.assertLess(len(json.dumps(sketch.to_object())), 4000)
+
+    def test_negative_and_zero(self):
+        sketch = QuantileSketch()
+        for v in (-100, -10, 0, 0, 10):
+            sketch.add(v)
+        self.assertClose(-100, sketch.quantile(0))
+        self.assertClose(-10, sketch.quantile(0.25))
+        self.assertEqual(0, sketch.quantile(0.5))
+        self.assertClose(10, sketch.quantile(1))
+        self.assertEqual(-20, sketch.mean)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+    def test_merge(self):
+        low, high = QuantileSketch(), QuantileSketch()
+        for v in range(1, 101):
+            (low if v <= 50 else high).add(float(v))
+        both = merged([low, high])
+        self.assertEqual(100, both.count)
+        self.assertClose(50, both.quantile(0.5))
+        self.assertEqual(50, low.count)
+        with self.assertRaises(ValueError):
+            both.merge(QuantileSketch(relative_accuracy=0.05))
+        self.assertEqual(QuantileSketch(0.05), merged([], relative_accuracy=0.05))
+
+    def test_bounded_bins(self):
+        sketch = QuantileSketch()
+        for exponent in range(-300, 300):
+            sketch.add(10.0**exponent)
+        self.assertLessEqual(len(sketch.positive), QuantileSketch.MAX_BINS)
+        self.assertClose(1e299, sketch.quantile(1))
+        self.assertClose(1e295, sketch.quantile(595 / 599))
+
+    def test_to_from_object(self):
+        sketch = QuantileSketch(relative_accuracy=0.02)
+        for v in (-3, 0, 2.5, 2.5, 700):
+            sketch.add(v)
+        o = json.loads(json.dumps(sketch.to_object()))
+        self.assertEqual(sketch, QuantileSketch.from_object(o, relative_accuracy=0.02))
+        for bad in ([], {**o, "n": 6}, {**o, "pos": [1, "a"]}, {"n": 0}):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                QuantileSketch.from_object(bad)
@@ -1,10 +1,19 @@
+import copy
 import json
+import math
+import pickle
 import unittest
 from datetime import UTC, timedelta, timezone
 
 from django.utils.timezone import datetime
 
-from django_simple_timeseries.timeseries import Timeseries
+from django_simple_timeseries.timeseries import (
+    BINARY_HEADER,
+    AggregatingTimeseries,
+    MultiTimeseries,
+    QuantileTimeseries,
+    Timeseries,
+)
 
 
 class TimeseriesTestCase(unittest.TestCase):
@@ -169,6 +178,70 @@ class TimeseriesTestCase(unittest.TestCase):
             Timeseries.from_json_string(json_str).to_object(),
         )
 
+    def test_to_from_bytes(self):
+        self.ts.add(1.5, when=self.now)
+        self.ts.add(2, when=self.now + timedelta(seconds=15))
+        b = self.ts.to_bytes()
+        self.assertEqual(b"ts", b[:2])
+        self.assertEqual(self.ts, Timeseries.from_bytes(b))
+        self.assertEqual([1.5, None, None, 2.0], Timeseries.from_bytes(memoryview(b)).data_points)
+
+    def test_to_from_bytes_ints(self):
+        """A series of ints round-trips as ints rather than becoming floats."""
+        for i in range(3):
+            self.ts.add(i * 10, when=self.now + timedelta(seconds=i * 10))
+        restored = Timeseries.from_bytes(self.ts.to_bytes())
+        self.assertEqual([0, None, 10, None, 20], restored.data_points)
+        self.assertIsInstance(restored[0], int)
+        self.assertEqual([], Timeseries.from_bytes(Timeseries().to_bytes()).data_points)
+
+    def test_to_from_bytes_runs(self):
+        """Sparse and repetitive series are stored as runs, and round-trip exactly."""
+        dense = Timeseries(start_time=self.now, data_points=[1.5, 2.5, None, 3.5], max_points=10)
+        self.assertEqual(Timeseries.BINARY_VERSION, dense.to_bytes()[2])
+        for data_points in (
+            [None] * 50 + [1.5] + [None] * 50,
+            [7] * 20 + [None, 8, 8],
+            [0.0] * 10 + [-0.0] * 10 + [None] * 10 + [0.0] * 10,
+            [None] * 100,
+        ):
+            ts = Timeseries(start_time=self.now, data_points=data_points, max_points=200)
+            b = ts.to_bytes()
+            self.assertEqual(Timeseries.BINARY_RUNS_VERSION, b[2])
+            self.assertLess(len(b), 100)
+            restored = Timeseries.from_bytes(b)
+            self.assertEqual(ts, restored)
+            self.assertEqual(
+                [math.copysign(1, v) if v is not None else None for v in data_points],
+                [math.copysign(1, v) if v is not None else None for v in restored.data_points],
+            )
+        self.assertIsInstance(
+            Timeseries.from_bytes(Timeseries(data_points=[7] * 20).to_bytes())[0], int
+        )
+        b = Timeseries(start_time=self.now, data_points=[None] * 50 + [1.5]).to_bytes()
+        for bad in (b[:-1], b[: BINARY_HEADER.size + 2], b[:28] + b"\xff" + b[29:]):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                Timeseries.from_bytes(bad)
+
+    def test_to_bytes_unsupported_values(self):
+        for bad in ("1.0", [1], True, 2**64):
+            ts = Timeseries(start_time=self.now, data_points=[1, bad])
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                ts.to_bytes()
+        # Ints that a double can't hold exactly can't be mixed with floats.
+        Timeseries(start_time=self.now, data_points=[1.5, 2**53]).to_bytes()
+        with self.assertRaises(ValueError):
+            Timeseries(start_time=self.now, data_points=[1.5, 2**53 + 1]).to_bytes()
+        with self.assertRaises(ValueError):
+            Timeseries(start_time=self.now, max_points=2**32).to_bytes()
+
+    def test_from_bytes_malformed(self):
+        good = self.ts.to_bytes()
+        self.ts.add(1.0, when=self.now)
+        for bad in (b"", b"xx" + good[2:], good[:2] + b"\x09" + good[3:], self.ts.to_bytes()[:-1]):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                Timeseries.from_bytes(bad)
+
     def test_has_a_current_sample(self):
         """Ensure datetimes are downsampled to appropriate bucket."""
         self.ts.add(1.23, when=self.now)
@@ -187,6 +260,138 @@ class TimeseriesTestCase(unittest.TestCase):
             list(self.ts.iter_points()),
         )
 
+    def test_resample(self):
+        for i in range(5):
+            self.ts.add(float(i), when=self.now + timedelta(seconds=5 * i))
+        coarse = self.ts.resample(resolution_seconds=10)
+        self.assertEqual(10, coarse.resolution.seconds)
+        self.assertEqual(5, coarse.max_points)
+        self.assertEqual([1.0, 3.0, 4.0], coarse.data_points)
+        self.assertEqual(self.now, coarse.start_time)
+
+        trimmed = self.ts.resample(max_points=2)
+        self.assertEqual([3.0, 4.0], trimmed.data_points)
+        self.assertEqual(self.now + timedelta(seconds=15), trimmed.start_time)
+        self.assertEqual([0.0, 1.0, 2.0, 3.0, 4.0], self.ts.data_points)
+
+    def test_trim(self):
+        for i in range(3):
+            self.ts.add(float(i), when=self.now + timedelta(seconds=5 * i))
+        self.assertEqual(0, self.ts.trim(self.now + timedelta(seconds=20)))
+        self.assertEqual(2, self.ts.trim(self.now + timedelta(seconds=30)))
+        self.assertEqual([2.0], self.ts.data_points)
+        self.assertEqual(self.now + timedelta(seconds=10), self.ts.start_time)
+        self.assertEqual(1, self.ts.trim(self.now + timedelta(days=1)))
+        self.assertEqual([], self.ts.data_points)
+        self.assertEqual(self.now + timedelta(seconds=15), self.ts.start_time)
+
+    def test_stats(self):
+        self.assertEqual({"count": 0, "min": None, "max": None, "mean": None}, self.ts.stats())
+        self.ts.add(1.0, when=self.now)
+        self.ts.add(3.0, when=self.now + timedelta(seconds=10))
+        self.assertEqual({"count": 2, "min": 1.0, "max": 3.0, "mean": 2.0}, self.ts.stats())
+
+    def test_rolling(self):
+        """The single-pass aggregates agree with aggregating each window separately."""
+        data_points = [4, None, 1, 3, 3, None, None, 7, 2, None, 5, 0]
+        ts = Timeseries(start_time=self.now, data_points=data_points, max_points=20)
+        for window in (1, 2, 3, 5, 20):
+            for min_periods in (1, 2):
+                windows = [
+                    [v for v in data_points[max(i - window + 1, 0) : i + 1] if v is not None]
+                    for i in range(len(data_points))
+                ]
+                rolling = ts.rolling(window, min_periods=min_periods)
+                msg = (window, min_periods)
+                for aggregate, fn in (
+                    (rolling.sum(), sum),
+                    (rolling.mean(), lambda w: sum(w) / len(w)),
+                    (rolling.min(), min),
+                    (rolling.max(), max),
+                ):
+                    self.assertEqual(
+                        [fn(w) if len(w) >= min_periods else None for w in windows],
+                        aggregate.data_points,
+                        msg=msg,
+                    )
+                    self.assertEqual(ts.start_time, aggregate.start_time)
+                    self.assertEqual(ts.resolution, aggregate.resolution)
+        self.assertEqual([4, None], ts.data_points[:2])
+        with self.assertRaises(ValueError):
+            ts.rolling(0)
+
+    def test_ewm(self):
+        ts = Timeseries(start_time=self.now, data_points=[2.0, 4.0, None, 1.0], max_points=20)
+        # After the gap, the previous average has decayed for two buckets: weight 0.25.
+        self.assertEqual([2.0, 3.0, None, (0.25 * 3.0 + 0.5 * 1.0) / 0.75], ts.ewm(0.5).data_points)
+        self.assertEqual(ts.data_points, ts.ewm(1).data_points)
+        with self.assertRaises(ValueError):
+            ts.ewm(0)
+
+    def test_copy_on_write(self):
+        ts = Timeseries(start_time=self.now, data_points=[1.0, 2.0], max_points=3)
+        snapshot = copy.deepcopy(ts)
+        self.assertIs(ts._data_points, snapshot._data_points)
+        self.assertEqual(ts, snapshot)
+        ts.add(3.0, when=self.now + timedelta(seconds=600))
+        self.assertEqual([1.0, 2.0, 3.0], ts.data_points)
+        self.assertEqual([1.0, 2.0], snapshot.data_points)
+
+        shallow = copy.copy(snapshot)
+        shallow.data_points.append(4.0)
+        self.assertEqual([1.0, 2.0], snapshot.data_points)
+        self.assertEqual(2, copy.copy(ts).trim(when=self.now + timedelta(seconds=1200)))
+        self.assertEqual(3, len(ts))
+
+    def test_pickle(self):
+        for data_points in ([1.5, None, 2.5], [1, None, 2**40], [], [1, 2.5], ["on", None]):
+            ts = Timeseries(start_time=self.now, data_points=data_points, max_points=20)
+            restored = pickle.loads(pickle.dumps(ts))
+            self.assertEqual(ts, restored)
+            self.assertEqual([type(v) for v in data_points], [type(v) for v in restored])
+        ts = Timeseries(start_time=self.now, data_points=[None] * 400 + [20.5] * 80)
+        self.assertLess(len(pickle.dumps(ts)), 300)
+        ts = Timeseries(start_time=self.now, data_points=list(range(100)) * 4)
+        self.assertLess(len(pickle.dumps(ts)), 1000)
+
+    def test_align(self):
+        step = timedelta(seconds=300)
+        a = Timeseries(start_time=self.now, data_points=[1, 2, 3], max_points=3)
+        b = Timeseries(start_time=self.now + 2 * step, data_points=[10, None, 30], max_points=4)
+        aligned_a, aligned_b = a.align(b)
+        self.assertEqual([1, 2, 3, None, None], aligned_a.data_points)
+        self.assertEqual([None, None, 10, None, 30], aligned_b.data_points)
+        self.assertEqual((self.now, 5), (aligned_b.start_time, aligned_b.max_points))
+        self.assertEqual([1, 2, 3], a.data_points)
+
+        empty = Timeseries(start_time=self.now + timedelta(seconds=7))
+        self.assertEqual([None] * 3, a.align(empty)[1].data_points)
+        self.assertEqual(([], []), tuple(s.data_points for s in empty.align(empty)))
+        for other in (
+            Timeseries(start_time=self.now, data_points=[1], resolution_seconds=60),
+            Timeseries(start_time=self.now + timedelta(seconds=7), data_points=[1]),
+        ):
+            with self.assertRaises(ValueError):
+                a.align(other)
+
+    def test_arithmetic(self):
+        step = timedelta(seconds=300)
+        voltage = Timeseries(start_time=self.now, data_points=[230.0, None, 240.0, 0.0])
+        current = Timeseries(start_time=self.now + step, data_points=[2.0, 3.0, 0.0, 1.0])
+        self.assertEqual([None, None, 720.0, 0.0, None], (voltage * current).data_points)
+        self.assertEqual([None, None, 80.0, None, None], (voltage / current).data_points)
+        self.assertEqual([None, None, 243.0, 0.0, None], (voltage + current).data_points)
+        self.assertEqual([None, None, 237.0, 0.0, None], (voltage - current).data_points)
+        self.assertEqual([0.23, None, 0.24, 0.0], (voltage / 1000).data_points)
+        self.assertEqual([-229.0, None, -239.0, 1.0], (1 - voltage).data_points)
+        self.assertEqual([2.0, 2.0, None, 2.0], (2 * current / current).data_points)
+        self.assertEqual([460.0, None, 480.0, 0.0], (voltage + voltage).data_points)
+        self.assertEqual([0.5, 1 / 3, None, 1.0], (1 / current).data_points)
+        with self.assertRaises(TypeError):
+            voltage + "1"
+        with self.assertRaises(TypeError):
+            AggregatingTimeseries(data_points=[[1, 2, 2, 2]]) * 2
+
     def test_get_normalized_points(self):
         self.ts.add(1.23, when=self.now)
         self.ts.add(1.23, when=self.now + timedelta(seconds=5))
@@ -203,3 +408,155 @@ class TimeseriesTestCase(unittest.TestCase):
             ),
             self.ts.get_normalized_points(),
         )
+
+
+class MultiTimeseriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 1, 1, 2, 30, tzinfo=UTC)
+        self.ts = MultiTimeseries(
+            ["temp", "hum"], start_time=self.now, max_points=3, resolution_seconds=5
+        )
+
+    def at(self, bucket):
+        return self.now + timedelta(seconds=5 * bucket)
+
+    def test_add_matches_timeseries(self):
+        """Each channel moves exactly as a `Timeseries` recording the same samples would."""
+        single = Timeseries(start_time=self.now, max_points=3, resolution_seconds=5)
+        for bucket, temp in ((0, 1.0), (0, 1.5), (1, 2.0), (3, 4.0), (5, 6.0), (12, 9.0)):
+            result = self.ts.add({"temp": temp, "hum": temp / 10}, when=self.at(bucket))
+            self.assertEqual(single.add(temp, when=self.at(bucket)), result, msg=bucket)
+            self.assertEqual(single, self.ts.channel("temp"), msg=bucket)
+            self.assertEqual(len(single), len(self.ts))
+        self.assertEqual([0.9], self.ts.data_points["hum"])
+
+    def test_missing_channels(self):
+        self.ts.add({"temp": 1.0, "hum": 0.5}, when=self.at(0))
+        self.ts.add({"hum": 0.6}, when=self.at(0))
+        self.ts.add({"temp": 2.0}, when=self.at(2))
+        self.assertEqual({"temp": [1.0, None, 2.0], "hum": [0.6, None, None]}, self.ts.data_points)
+        self.assertEqual(
+            [(self.at(0), {"temp": 1.0, "hum": 0.6}), (self.at(1), {"temp": None, "hum": None})],
+            list(self.ts.iter_points())[:2],
+        )
+        with self.assertRaises(ValueError):
+            self.ts.add({"power": 1.0}, when=self.at(2))
+        with self.assertRaises(ValueError):
+            self.ts.add({"temp": 1.0}, when=self.at(1))
+
+    def test_to_from_object(self):
+        self.ts.add({"temp": 1.0, "hum": 0.5}, when=self.at(0))
+        o = json.loads(json.dumps(self.ts.to_object()))
+        self.assertEqual(self.ts, MultiTimeseries.from_object(o))
+        for bad in (None, {}, {**o, "v": 2}, {**o, "channels": []}, {**o, "channels": {}}):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                MultiTimeseries.from_object(bad)
+        with self.assertRaises(ValueError):
+            MultiTimeseries.from_object({**o, "channels": {"temp": [1.0], "hum": []}})
+
+
+class AggregatingTimeseriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 1, 1, 2, 30, tzinfo=UTC)
+        self.ts = AggregatingTimeseries(start_time=self.now, max_points=3, resolution_seconds=5)
+
+    def at(self, seconds):
+        return self.now + timedelta(seconds=seconds)
+
+    def test_add(self):
+        self.assertEqual(Timeseries.RESULT_SHIFTED, self.ts.add(2.0, when=self.at(0)))
+        self.assertEqual(Timeseries.RESULT_REPLACED, self.ts.add(6.0, when=self.at(1)))
+        self.assertEqual(Timeseries.RESULT_REPLACED, self.ts.add(None, when=self.at(2)))
+        self.assertEqual(Timeseries.RESULT_REPLACED, self.ts.add(1.0, when=self.at(4)))
+        self.assertEqual(Timeseries.RESULT_ADDED, self.ts.add(5, when=self.at(10)))
+        self.assertEqual([[3, 9.0, 1.0, 6.0], None, [1, 5, 5, 5]], self.ts.data_points)
+        self.assertEqual([3.0, None, 5.0], self.ts.to_timeseries().data_points)
+        self.assertEqual([1.0, None, 5], self.ts.to_timeseries("min").data_points)
+        self.assertEqual({"count": 4, "min": 1.0, "max": 6.0, "mean": 3.5}, self.ts.stats())
+        with self.assertRaises(ValueError):
+            self.ts.to_timeseries("median")
+
+    def test_to_from_object(self):
+        self.ts.add(2.0, when=self.at(0))
+        o = json.loads(json.dumps(self.ts.to_object()))
+        self.assertEqual("aggregate", o["kind"])
+        restored = Timeseries.from_object(o)
+        self.assertIsInstance(restored, AggregatingTimeseries)
+        self.assertEqual(self.ts, restored)
+        self.assertNotEqual(self.ts, Timeseries.from_object({**o, "kind": None, "data": [2.0]}))
+        for bad in ({**o, "kind": "other"}, {**o, "data": [[1, 2]]}):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                Timeseries.from_object(bad)
+        with self.assertRaises(ValueError):
+            AggregatingTimeseries.from_object({**o, "kind": None})
+
+    def test_resample_merges_buckets(self):
+        for seconds, value in ((0, 1.0), (5, 4.0), (10, 2.0)):
+            self.ts.add(value, when=self.at(seconds))
+        resampled = self.ts.resample(resolution_seconds=10)
+        self.assertEqual([[2, 5.0, 1.0, 4.0], [1, 2.0, 2.0, 2.0]], resampled.data_points)
+        self.assertEqual([1, 1.0, 1.0, 1.0], self.ts.data_points[0])
+
+
+class QuantileTimeseriesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2020, 1, 1, 2, 30, tzinfo=UTC)
+        self.ts = QuantileTimeseries(start_time=self.now, max_points=3, resolution_seconds=5)
+
+    def at(self, seconds):
+        return self.now + timedelta(seconds=seconds)
+
+    def test_add(self):
+        self.assertEqual(Timeseries.RESULT_SHIFTED, self.ts.add(1.0, when=self.at(0)))
+        for v in range(2, 101):
+            self.assertEqual(Timeseries.RESULT_REPLACED, self.ts.add(float(v), when=self.at(1)))
+        self.ts.add(None, when=self.at(2))
+        self.assertEqual(Timeseries.RESULT_ADDED, self.ts.add(1000.0, when=self.at(10)))
+        self.assertIsNone(self.ts.data_points[1])
+        self.assertEqual(100, self.ts.data_points[0].count)
+        self.assertAlmostEqual(99, self.ts.quantile(0.99, end=self.at(5)), delta=1)
+        self.assertEqual(1000.0, self.ts.quantile(0.5, start=self.at(6)))
+        self.assertIsNone(self.ts.quantile(0.5, start=self.at(15)))
+        self.assertEqual(101, self.ts.sketch().count)
+        self.assertEqual([50.5, None, 1000.0], self.ts.to_timeseries("mean").data_points)
+        self.assertEqual([100.0, None, 1000.0], self.ts.to_timeseries("max").data_points)
+        self.assertAlmostEqual(50, self.ts.to_timeseries(0.5).data_points[0], delta=1)
+        self.assertEqual(
+            {"count": 101, "min": 1.0, "max": 1000.0, "mean": 6050 / 101}, self.ts.stats()
+        )
+        with self.assertRaises(ValueError):
+            self.ts.to_timeseries("median")
+
+    def test_to_from_object(self):
+        self.ts = QuantileTimeseries(start_time=self.now, relative_accuracy=0.05)
+        self.ts.add(2.0, when=self.at(0))
+        self.ts.add(3.0, when=self.at(1))
+        o = json.loads(json.dumps(self.ts.to_object()))
+        self.assertEqual(("quantile", 0.05), (o["kind"], o["acc"]))
+        restored = Timeseries.from_object(o)
+        self.assertIsInstance(restored, QuantileTimeseries)
+        self.assertEqual(0.05, restored.relative_accuracy)
+        self.assertEqual(self.ts, restored)
+        for bad in ({**o, "acc": None}, {**o, "data": [[1, 2]]}):
+            with self.assertRaises(ValueError, msg=repr(bad)):
+                Timeseries.from_object(bad)
+        with self.assertRaises(ValueError):
+            QuantileTimeseries.from_object({**o, "kind": None})
+        with self.assertRaises(ValueError):
+            self.ts.to_bytes()
+
+    def test_resample_merges_buckets(self):
+        for seconds, value in ((0, 1.0), (5, 4.0), (10, 2.0)):
+            self.ts.add(value, when=self.at(seconds))
+        resampled = self.ts.resample(resolution_seconds=10)
+        self.assertEqual([2, 1], [sketch.count for sketch in resampled.data_points])
+        self.assertEqual(1, self.ts.data_points[0].count)
+
+    def test_copy_and_pickle(self):
+        self.ts = QuantileTimeseries(start_time=self.now, relative_accuracy=0.05)
+        self.ts.add(1.0, when=self.now)
+        snapshot = copy.copy(self.ts)
+        self.ts.add(2.0, when=self.now)
+        self.assertEqual(1, snapshot.data_points[0].count)
+        restored = pickle.loads(pickle.dumps(self.ts))
+        self.assertEqual((self.ts, 0.05), (restored, restored.relative_accuracy))